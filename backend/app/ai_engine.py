@@ -1,16 +1,13 @@
-import os
-from groq import Groq
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Initialize Groq client
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
-# Check if we're in demo mode
-DEMO_MODE = os.getenv("DEMO_MODE", "true").lower() == "true"
-CALENDLY_LINK = os.getenv("CALENDLY_LINK", "https://calendly.com/solisa-demo/30min")
+try:
+    from .settings import LLM_DEMO_MODE, CALENDLY_LINK
+    from .providers import get_provider
+    from .message_templates import render_template
+    from .metrics import span
+except ImportError:
+    from settings import LLM_DEMO_MODE, CALENDLY_LINK
+    from providers import get_provider
+    from message_templates import render_template
+    from metrics import span
 
 
 def generate_personalized_sms(lead_info: dict) -> str:
@@ -29,8 +26,15 @@ def generate_personalized_sms(lead_info: dict) -> str:
     savings = lead_info.get("estimated_savings", 500)
     
     # In demo mode, return a quick template
-    if DEMO_MODE:
-        return f"Hi {first_name}! 👋 Noticed you're with {current_provider} for {insurance_type.lower()}. We could save you ${savings}/yr. Book a quick chat? {CALENDLY_LINK} - Alex @ Solisa"
+    if LLM_DEMO_MODE:
+        return render_template(
+            "outreach.sms.demo",
+            first_name=first_name,
+            current_provider=current_provider,
+            insurance_type_lower=insurance_type.lower(),
+            savings=savings,
+            calendly_link=CALENDLY_LINK
+        )
     
     # Use Groq Llama to generate personalized SMS
     try:
@@ -55,11 +59,16 @@ Requirements:
 
 Generate only the SMS text, no quotes or explanations."""
 
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            max_tokens=200,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        client = get_provider("groq")
+        if not client:
+            raise Exception("Groq client not initialized. Check GROQ_API_KEY.")
+        
+        with span("llm", "generate_personalized_sms"):
+            response = client.chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                max_tokens=200,
+                messages=[{"role": "user", "content": prompt}]
+            )
         
         sms_text = response.choices[0].message.content.strip()
         
@@ -72,7 +81,13 @@ Generate only the SMS text, no quotes or explanations."""
     except Exception as e:
         print(f"Error generating SMS with Groq: {e}")
         # Fallback message
-        return f"Hi {first_name}! We can save you ${savings}/yr on {insurance_type.lower()}. Book a chat? {CALENDLY_LINK} - Alex @ Solisa"
+        return render_template(
+            "outreach.sms.fallback",
+            first_name=first_name,
+            insurance_type_lower=insurance_type.lower(),
+            savings=savings,
+            calendly_link=CALENDLY_LINK
+        )
 
 
 def generate_personalized_email(lead_info: dict) -> dict:
@@ -95,30 +110,22 @@ def generate_personalized_email(lead_info: dict) -> dict:
     renewal_date = lead_info.get("renewal_date", "soon")
     
     # In demo mode, return a template email
-    if DEMO_MODE:
-        subject = f"{first_name}, save ${savings}/year on your {insurance_type} insurance"
+    if LLM_DEMO_MODE:
+        subject = render_template("outreach.email.subject", first_name=first_name, savings=savings, insurance_type=insurance_type)
         
         pain_points_text = "\n".join([f"• {point}" for point in pain_points[:2]]) if pain_points else "• High premiums\n• Poor customer service"
         
-        body = f"""Hi {full_name},
-
-I noticed you're currently with {current_provider} for your {insurance_type.lower()} insurance. As a {life_stage.lower()}, you deserve coverage that actually works for you.
-
-Here's what caught my attention:
-{pain_points_text}
-
-The good news? We can likely save you ${savings} per year while addressing these concerns. With your renewal coming up in {renewal_date}, now's the perfect time to explore better options.
-
-I'd love to show you a personalized quote that fits your needs. It takes just 15 minutes, and there's zero pressure.
-
-Book a quick call: {CALENDLY_LINK}
-
-Looking forward to helping you get the coverage you deserve!
-
-Best,
-Alex
-Solisa Insurance
-alex@solisa.com"""
+        body = render_template(
+            "outreach.email.demo",
+            full_name=full_name,
+            current_provider=current_provider,
+            insurance_type_lower=insurance_type.lower(),
+            life_stage_lower=life_stage.lower(),
+            pain_points_text=pain_points_text,
+            savings=savings,
+            renewal_date=renewal_date,
+            calendly_link=CALENDLY_LINK
+        )
         
         return {"subject": subject, "body": body}
     
@@ -159,11 +166,16 @@ BODY:
 
 Do not include any other text or explanations."""
 
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            max_tokens=800,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        client = get_provider("groq")
+        if not client:
+            raise Exception("Groq client not initialized. Check GROQ_API_KEY.")
+        
+        with span("llm", "generate_personalized_email"):
+            response = client.chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                max_tokens=800,
+                messages=[{"role": "user", "content": prompt}]
+            )
         
         email_text = response.choices[0].message.content.strip()
         
@@ -183,18 +195,15 @@ Do not include any other text or explanations."""
     except Exception as e:
         print(f"Error generating email with Groq: {e}")
         # Fallback email
-        subject = f"{first_name}, save ${savings}/year on your {insurance_type} insurance"
-        body = f"""Hi {full_name},
-
-I noticed you're with {current_provider} for {insurance_type.lower()} insurance. We can save you ${savings}/year with better coverage.
-
-Your renewal is coming up in {renewal_date} - let's chat about your options.
-
-Book a quick call: {CALENDLY_LINK}
-
-Best,
-Alex
-Solisa Insurance
-alex@solisa.com"""
+        subject = render_template("outreach.email.subject", first_name=first_name, savings=savings, insurance_type=insurance_type)
+        body = render_template(
+            "outreach.email.fallback",
+            full_name=full_name,
+            current_provider=current_provider,
+            insurance_type_lower=insurance_type.lower(),
+            savings=savings,
+            renewal_date=renewal_date,
+            calendly_link=CALENDLY_LINK
+        )
         
         return {"subject": subject, "body": body}
@@ -0,0 +1,87 @@
+import os
+import requests
+
+try:
+    from .enrichment import EnrichmentProvider
+    from .metrics import span
+except ImportError:
+    from enrichment import EnrichmentProvider
+    from metrics import span
+
+APOLLO_API_KEY = os.getenv("APOLLO_API_KEY")
+APOLLO_BASE_URL = os.getenv("APOLLO_BASE_URL", "https://api.apollo.io/api/v1")
+APOLLO_TIMEOUT_SECONDS = float(os.getenv("APOLLO_TIMEOUT_SECONDS", "5"))
+
+
+class ApolloEnrichmentProvider(EnrichmentProvider):
+    """
+    Apollo.io people/organization enrichment.
+
+    One pooled HTTP session is shared by all lookups (requests.Session is safe
+    for the concurrent GET/POSTs the cache layer issues).
+    """
+    name = "apollo"
+
+    def __init__(self, api_key: str = None, base_url: str = None, timeout: float = None):
+        self.api_key = api_key or APOLLO_API_KEY
+        if not self.api_key:
+            raise Exception("Apollo credentials not configured")
+
+        self.base_url = (base_url or APOLLO_BASE_URL).rstrip("/")
+        self.timeout = timeout or APOLLO_TIMEOUT_SECONDS
+        self.session = requests.Session()
+        self.session.headers.update({
+            "X-Api-Key": self.api_key,
+            "Content-Type": "application/json",
+            "Cache-Control": "no-cache"
+        })
+
+    def fetch_person(self, email: str) -> dict:
+        """
+        Match a person by email
+        """
+        with span("apollo", "people_match"):
+            response = self.session.post(
+                f"{self.base_url}/people/match",
+                json={"email": email, "reveal_personal_emails": False},
+                timeout=self.timeout
+            )
+        response.raise_for_status()
+
+        person = response.json().get("person")
+        if not person:
+            return None
+
+        return {
+            key: value for key, value in {
+                "job_title": person.get("title"),
+                "seniority": person.get("seniority"),
+                "city": person.get("city"),
+                "state": person.get("state"),
+                "linkedin_url": person.get("linkedin_url"),
+            }.items() if value
+        }
+
+    def fetch_company(self, domain: str) -> dict:
+        """
+        Enrich an organization by its email domain
+        """
+        with span("apollo", "organization_enrich"):
+            response = self.session.get(
+                f"{self.base_url}/organizations/enrich",
+                params={"domain": domain},
+                timeout=self.timeout
+            )
+        response.raise_for_status()
+
+        organization = response.json().get("organization")
+        if not organization:
+            return None
+
+        return {
+            key: value for key, value in {
+                "company": organization.get("name"),
+                "industry": organization.get("industry"),
+                "company_size": organization.get("estimated_num_employees"),
+            }.items() if value
+        }
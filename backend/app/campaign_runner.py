@@ -0,0 +1,463 @@
+import os
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select, insert, func
+
+try:
+    from .database import SessionLocal
+    from .models import Lead, Touchpoint, LifeEvent, PolicyHealth, Occasion, Campaign
+    from .message_templates import get_template
+    from .communications import dispatch_followup_action, DISPATCH_MAX_WORKERS
+    from .retention_engine import calculate_policy_health_score
+    from .engagement_calendar import roll_forward
+    from .retention_worklist import refresh_latest_health
+    from .shared_state import RateLimiter, get_rate_limiter, get_lease
+except ImportError:
+    from database import SessionLocal
+    from models import Lead, Touchpoint, LifeEvent, PolicyHealth, Occasion, Campaign
+    from message_templates import get_template
+    from communications import dispatch_followup_action, DISPATCH_MAX_WORKERS
+    from retention_engine import calculate_policy_health_score
+    from engagement_calendar import roll_forward
+    from retention_worklist import refresh_latest_health
+    from shared_state import RateLimiter, get_rate_limiter, get_lease
+
+# Leads rendered, inserted and sent per batch (one transaction each)
+CAMPAIGN_BATCH_SIZE = int(os.getenv("CAMPAIGN_BATCH_SIZE", "500"))
+
+# Default send throttle (messages per second) - keeps under Twilio/SendGrid rate limits
+CAMPAIGN_SEND_RATE = float(os.getenv("CAMPAIGN_SEND_RATE", "10"))
+
+# Concurrent policy health calculations in the deferred pass (LLM calls outside demo mode)
+CAMPAIGN_HEALTH_WORKERS = int(os.getenv("CAMPAIGN_HEALTH_WORKERS", "4"))
+
+# Campaigns in these states can be (re)started
+RUNNABLE_STATUSES = ("draft", "paused", "failed")
+
+# How long a run (or health pass) holds its campaign lease without renewing it -
+# renewed every batch, and at least twice as long as a batch's throttled sends
+CAMPAIGN_LEASE_SECONDS = float(os.getenv("CAMPAIGN_LEASE_SECONDS", "120"))
+
+
+def segment_filters(segment: dict) -> list:
+    """
+    SQL conditions for a campaign segment.
+
+    Supported keys: insurance_types, statuses, min_tenure_days, lead_ids
+    """
+    segment = segment or {}
+    filters = []
+
+    if segment.get("insurance_types"):
+        filters.append(Lead.insurance_type.in_(segment["insurance_types"]))
+    if segment.get("statuses"):
+        filters.append(Lead.status.in_(segment["statuses"]))
+    if segment.get("min_tenure_days"):
+        filters.append(Lead.created_at <= datetime.utcnow() - timedelta(days=int(segment["min_tenure_days"])))
+    if segment.get("lead_ids"):
+        filters.append(Lead.id.in_(segment["lead_ids"]))
+
+    return filters
+
+
+def campaign_run_lease(campaign_id: int):
+    """Lease held by the one run of a campaign (a new handle with its own owner)"""
+    return get_lease(f"campaign-run:{campaign_id}")
+
+
+def campaign_health_lease(campaign_id: int):
+    """Lease held by the one policy health pass of a campaign (a new handle with its own owner)"""
+    return get_lease(f"campaign-health:{campaign_id}")
+
+
+def lease_seconds(batch_size: int, send_rate: float = None) -> float:
+    """Lease TTL for a run: CAMPAIGN_LEASE_SECONDS, or longer when a batch's sends take longer"""
+    if send_rate and send_rate > 0:
+        return max(CAMPAIGN_LEASE_SECONDS, 2 * batch_size / send_rate)
+    return CAMPAIGN_LEASE_SECONDS
+
+
+def count_segment(db, segment: dict) -> int:
+    return db.execute(select(func.count(Lead.id)).where(*segment_filters(segment))).scalar() or 0
+
+
+def render_campaign_rows(campaign, leads: list, now: datetime) -> list:
+    """
+    Occasion rows for a batch of leads - the template is looked up once and
+    only the message is rendered per lead.
+    """
+    template = get_template(f"occasion.{campaign.occasion_type}", default="occasion.default")
+    metadata = template.metadata
+
+    rows = []
+    for lead in leads:
+        first_name = lead.full_name.split()[0] if lead.full_name else "there"
+        years = max(1, (now - lead.created_at).days // 365) if lead.created_at else 1
+
+        rows.append({
+            "lead_id": lead.id,
+            "campaign_id": campaign.id,
+            "occasion_type": campaign.occasion_type,
+            "occasion_date": now,
+            "description": campaign.name,
+            "offer_type": metadata["offer_type"],
+            "offer_value": metadata["offer_value"],
+            "offer_description": metadata["offer_description"],
+            "action_taken": False,
+            "action_type": campaign.channel,
+            "action_content": template.render(first_name=first_name, years=years, days_until=30),
+            "outcome": "queued",
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    return rows
+
+
+def send_queued_occasions(db, campaign, limiter: RateLimiter, batch_size: int = CAMPAIGN_BATCH_SIZE) -> int:
+    """
+    Send a batch of the campaign's queued occasions, throttled, and record the outcomes.
+
+    Returns:
+        Number of occasions handled (0 when nothing is queued)
+    """
+    rows = db.execute(
+        select(Occasion.id, Occasion.action_content, Occasion.offer_description, Lead.phone, Lead.email, Lead.insurance_type)
+        .join(Lead, Lead.id == Occasion.lead_id)
+        .where(Occasion.campaign_id == campaign.id, Occasion.outcome == "queued")
+        .order_by(Occasion.id.asc())
+        .limit(batch_size)
+    ).all()
+
+    if not rows:
+        return 0
+
+    # Committed before anything is sent: a run that dies mid-batch leaves these
+    # as "sending", and they are not sent again (settle_interrupted_sends)
+    db.query(Occasion).filter(Occasion.id.in_([row.id for row in rows])).update(
+        {"outcome": "sending", "updated_at": datetime.utcnow()}, synchronize_session=False
+    )
+    db.commit()
+
+    def send(row):
+        limiter.acquire()
+        content = row.action_content
+        if campaign.channel == "email":
+            content = f"Subject: {row.offer_description}\n{content}"
+        try:
+            return dispatch_followup_action(
+                campaign.channel,
+                content,
+                {"phone": row.phone, "email": row.email, "insurance_type": row.insurance_type}
+            )
+        except Exception as e:
+            print(f"❌ Error sending campaign {campaign.id} message: {e}")
+            return {"success": False, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=min(DISPATCH_MAX_WORKERS, len(rows))) as executor:
+        results = list(executor.map(send, rows))
+
+    now = datetime.utcnow()
+    updates = []
+    sent = 0
+    for row, result in zip(rows, results):
+        success = not (result is None or result.get("success") is False)
+        sent += success
+        updates.append({
+            "id": row.id,
+            "action_taken": success,
+            "outcome": "pending" if success else "failed",
+            "updated_at": now
+        })
+
+    db.bulk_update_mappings(Occasion, updates)
+    campaign.processed = (campaign.processed or 0) + len(rows)
+    campaign.sent = (campaign.sent or 0) + sent
+    campaign.failed = (campaign.failed or 0) + len(rows) - sent
+    db.commit()
+
+    return len(rows)
+
+
+def settle_interrupted_sends(db, campaign) -> int:
+    """
+    Mark occasions a stopped run was sending when it stopped as "interrupted".
+
+    Whether their message went out is unknown, so they are counted as failed
+    rather than sent again. Only call this while holding the campaign's run
+    lease - then no live run can still be sending them.
+
+    Returns:
+        Number of occasions settled
+    """
+    interrupted = db.query(Occasion).filter(
+        Occasion.campaign_id == campaign.id,
+        Occasion.outcome == "sending"
+    ).update({"outcome": "interrupted", "updated_at": datetime.utcnow()}, synchronize_session=False)
+
+    if interrupted:
+        campaign.processed = (campaign.processed or 0) + interrupted
+        campaign.failed = (campaign.failed or 0) + interrupted
+        print(f"⚠️  Campaign {campaign.id}: {interrupted} sends interrupted by the last run are not retried")
+    db.commit()
+
+    return interrupted
+
+
+def run_campaign(campaign_id: int, session_factory=SessionLocal, batch_size: int = CAMPAIGN_BATCH_SIZE, lease=None) -> dict:
+    """
+    Run (or resume) a campaign over its whole segment.
+
+    Each batch is one keyset-paged segment query, one bulk render, one batched
+    Occasion insert that also advances the resume cursor, then throttled sends.
+    Occasions inserted but not yet sent when a run stops are sent first on
+    resume. A batch is marked "sending" before its sends start, and occasions a
+    crashed run left in that state are settled as "interrupted" instead of
+    being sent again - delivery is at-most-once, so nobody is messaged twice.
+    The policy health pass runs once all sends are done.
+
+    Only one run per campaign works at a time: it holds the campaign's run
+    lease, renewed every batch, and a run that can't take the lease (another
+    is still finishing its batch after a pause) returns without doing anything.
+
+    Args:
+        lease: Run lease already acquired by the caller (taken here if None)
+
+    Returns:
+        The campaign's final state
+    """
+    if lease is None:
+        lease = campaign_run_lease(campaign_id)
+        acquired = lease.acquire(lease_seconds(batch_size))
+    else:
+        acquired = True
+
+    db = session_factory()
+    try:
+        if not acquired:
+            print(f"⏭️  Campaign {campaign_id} is already being run")
+            campaign = db.get(Campaign, campaign_id)
+            return campaign.to_dict() if campaign else None
+
+        claimed = db.query(Campaign).filter(
+            Campaign.id == campaign_id,
+            Campaign.status.in_(RUNNABLE_STATUSES)
+        ).update({"status": "running", "error": None}, synchronize_session=False)
+        db.commit()
+
+        campaign = db.get(Campaign, campaign_id)
+        if not claimed:
+            return campaign.to_dict() if campaign else None
+
+        if not campaign.started_at:
+            campaign.started_at = datetime.utcnow()
+            campaign.total_targets = count_segment(db, campaign.segment)
+            db.commit()
+
+        print(f"\n📣 Running campaign {campaign.id} ({campaign.name}): {campaign.total_targets} targets")
+
+        send_rate = campaign.send_rate if campaign.send_rate is not None else CAMPAIGN_SEND_RATE
+        limiter = get_rate_limiter(f"campaign:{campaign.id}", send_rate)
+        filters = segment_filters(campaign.segment)
+        ttl = lease_seconds(batch_size, send_rate)
+
+        def keep_lease() -> bool:
+            if lease.acquire(ttl):
+                return True
+            print(f"⚠️  Campaign {campaign.id}: run lease lost, stopping")
+            return False
+
+        # Finish anything queued by an interrupted run
+        settle_interrupted_sends(db, campaign)
+        while keep_lease() and send_queued_occasions(db, campaign, limiter, batch_size):
+            pass
+
+        while True:
+            if not keep_lease():
+                return campaign.to_dict()
+            db.refresh(campaign, ["status"])
+            if campaign.status != "running":
+                print(f"⏸️  Campaign {campaign.id} {campaign.status} at lead {campaign.last_lead_id}")
+                return campaign.to_dict()
+
+            leads = db.execute(
+                select(Lead.id, Lead.full_name, Lead.created_at)
+                .where(Lead.id > (campaign.last_lead_id or 0), *filters)
+                .order_by(Lead.id.asc())
+                .limit(batch_size)
+            ).all()
+
+            if not leads:
+                break
+
+            now = datetime.utcnow()
+            rows = render_campaign_rows(campaign, leads, now)
+            db.execute(insert(Occasion), rows)
+            roll_forward(db, [lead.id for lead in leads], campaign.occasion_type, now.date())
+            campaign.last_lead_id = leads[-1].id
+            db.commit()
+
+            send_queued_occasions(db, campaign, limiter, batch_size)
+            print(f"📣 Campaign {campaign.id}: {campaign.processed}/{campaign.total_targets} processed")
+
+        campaign.status = "completed"
+        campaign.completed_at = datetime.utcnow()
+        campaign.health_status = "pending"
+        db.commit()
+
+        print(f"✅ Campaign {campaign.id} completed: {campaign.sent} sent, {campaign.failed} failed")
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Campaign {campaign_id} failed: {e}")
+        db.query(Campaign).filter(Campaign.id == campaign_id).update(
+            {"status": "failed", "error": str(e)}, synchronize_session=False
+        )
+        db.commit()
+        return db.get(Campaign, campaign_id).to_dict()
+    finally:
+        db.close()
+        if acquired:
+            lease.release()
+
+    recalculate_campaign_health(campaign_id, session_factory, batch_size)
+
+    db = session_factory()
+    try:
+        return db.get(Campaign, campaign_id).to_dict()
+    finally:
+        db.close()
+
+
+def recalculate_campaign_health(campaign_id: int, session_factory=SessionLocal, batch_size: int = CAMPAIGN_BATCH_SIZE, lease=None) -> int:
+    """
+    Deferred policy health pass over every lead the campaign reached.
+
+    Per batch, leads, touchpoints and life events are loaded with three IN
+    queries, scores are calculated concurrently and the PolicyHealth rows are
+    inserted together. The pass holds the campaign's health lease, so two
+    passes never share a cursor.
+
+    Args:
+        lease: Health lease already acquired by the caller (taken here if None)
+
+    Returns:
+        Number of leads rescored (0 if another pass was running)
+    """
+    if lease is None:
+        lease = campaign_health_lease(campaign_id)
+        if not lease.acquire(CAMPAIGN_LEASE_SECONDS):
+            print(f"⏭️  Policy health pass for campaign {campaign_id} is already running")
+            return 0
+
+    db = session_factory()
+    try:
+        campaign = db.get(Campaign, campaign_id)
+        if not campaign:
+            return 0
+
+        # A completed pass starts over; an interrupted one resumes from its cursor
+        if campaign.health_status == "completed":
+            campaign.health_recalculated = 0
+            campaign.health_last_lead_id = 0
+        campaign.health_status = "running"
+        db.commit()
+
+        rescored = campaign.health_recalculated or 0
+        last_lead_id = campaign.health_last_lead_id or 0
+        while lease.acquire(CAMPAIGN_LEASE_SECONDS):
+            lead_ids = db.execute(
+                select(Occasion.lead_id)
+                .where(Occasion.campaign_id == campaign_id, Occasion.action_taken.is_(True), Occasion.lead_id > last_lead_id)
+                .group_by(Occasion.lead_id)
+                .order_by(Occasion.lead_id.asc())
+                .limit(batch_size)
+            ).scalars().all()
+
+            if not lead_ids:
+                break
+
+            leads = db.query(Lead).filter(Lead.id.in_(lead_ids)).all()
+            touchpoints = {}
+            for touchpoint in db.query(Touchpoint).filter(Touchpoint.lead_id.in_(lead_ids)).order_by(Touchpoint.created_at.asc()):
+                touchpoints.setdefault(touchpoint.lead_id, []).append(touchpoint.to_dict())
+            life_events = {}
+            for event in db.query(LifeEvent).filter(LifeEvent.lead_id.in_(lead_ids)):
+                life_events.setdefault(event.lead_id, []).append(event.to_dict())
+
+            def score(lead_data):
+                return calculate_policy_health_score(
+                    lead_data,
+                    touchpoints.get(lead_data["id"], []),
+                    life_events.get(lead_data["id"], [])
+                )
+
+            lead_dicts = [lead.to_dict() for lead in leads]
+            with ThreadPoolExecutor(max_workers=min(CAMPAIGN_HEALTH_WORKERS, len(lead_dicts))) as executor:
+                scores = list(executor.map(score, lead_dicts))
+
+            now = datetime.utcnow()
+            db.bulk_insert_mappings(PolicyHealth, [
+                {
+                    "lead_id": lead_data["id"],
+                    "health_score": data["health_score"],
+                    "churn_risk": data["churn_risk"],
+                    "churn_probability": data.get("churn_probability", 35),
+                    "days_to_predicted_churn": data.get("days_to_predicted_churn", 90),
+                    "engagement_score": data.get("engagement_score"),
+                    "satisfaction_score": data.get("satisfaction_score"),
+                    "usage_score": data.get("usage_score"),
+                    "payment_score": data.get("payment_score"),
+                    "retention_actions": data.get("retention_actions"),
+                    "reasoning": data.get("reasoning"),
+                    "priority": data.get("priority", "medium"),
+                    "calculated_at": now,
+                }
+                for lead_data, data in zip(lead_dicts, scores)
+            ])
+            # Bulk inserts skip mapper events, so refresh the latest-health rows here
+            refresh_latest_health(db, lead_ids)
+
+            rescored += len(lead_ids)
+            last_lead_id = lead_ids[-1]
+            campaign.health_recalculated = rescored
+            campaign.health_last_lead_id = last_lead_id
+            db.commit()
+        else:
+            print(f"⚠️  Campaign {campaign_id}: health lease lost, stopping")
+            return rescored
+
+        campaign.health_status = "completed"
+        campaign.health_recalculated_at = datetime.utcnow()
+        db.commit()
+
+        print(f"💾 Campaign {campaign_id}: policy health recalculated for {rescored} leads")
+        return rescored
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Policy health pass for campaign {campaign_id} failed: {e}")
+        db.query(Campaign).filter(Campaign.id == campaign_id).update(
+            {"health_status": "failed"}, synchronize_session=False
+        )
+        db.commit()
+        return 0
+    finally:
+        db.close()
+        lease.release()
+
+
+def pause_interrupted_campaigns(db) -> int:
+    """
+    Campaigns still marked running at startup were cut off by a restart; mark
+    them paused so they can be resumed from their cursor.
+    """
+    count = db.query(Campaign).filter(Campaign.status == "running").update(
+        {"status": "paused"}, synchronize_session=False
+    )
+    db.commit()
+
+    if count:
+        print(f"⏸️  Paused {count} campaign(s) interrupted by a restart")
+
+    return count
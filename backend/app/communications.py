@@ -1,33 +1,17 @@
 import os
-from twilio.rest import Client
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 
-# Load environment variables
-load_dotenv()
+try:
+    from .settings import DEMO_MODE, TWILIO_PHONE_NUMBER, SENDGRID_FROM_EMAIL
+    from .providers import get_provider
+    from .metrics import span
+except ImportError:
+    from settings import DEMO_MODE, TWILIO_PHONE_NUMBER, SENDGRID_FROM_EMAIL
+    from providers import get_provider
+    from metrics import span
 
-# Check if we're in demo mode
-DEMO_MODE = os.getenv("DEMO_MODE", "true").lower() == "true"
-
-# Initialize Twilio client
-twilio_account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-twilio_auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-twilio_phone_number = os.getenv("TWILIO_PHONE_NUMBER")
-
-if not DEMO_MODE and twilio_account_sid and twilio_auth_token:
-    twilio_client = Client(twilio_account_sid, twilio_auth_token)
-else:
-    twilio_client = None
-
-# Initialize SendGrid client
-sendgrid_api_key = os.getenv("SENDGRID_API_KEY")
-sendgrid_from_email = os.getenv("SENDGRID_FROM_EMAIL", "alex@solisa.com")
-
-if not DEMO_MODE and sendgrid_api_key:
-    sendgrid_client = SendGridAPIClient(sendgrid_api_key)
-else:
-    sendgrid_client = None
+# Concurrent sends for bulk follow-up execution
+DISPATCH_MAX_WORKERS = int(os.getenv("DISPATCH_MAX_WORKERS", "8"))
 
 
 def send_sms(to_phone: str, message: str) -> dict:
@@ -56,14 +40,16 @@ def send_sms(to_phone: str, message: str) -> dict:
     
     # Send actual SMS via Twilio
     try:
+        twilio_client = get_provider("twilio")
         if not twilio_client:
             raise Exception("Twilio client not initialized. Check your credentials.")
         
-        message_obj = twilio_client.messages.create(
-            body=message,
-            from_=twilio_phone_number,
-            to=to_phone
-        )
+        with span("twilio", "send_sms"):
+            message_obj = twilio_client.messages.create(
+                body=message,
+                from_=TWILIO_PHONE_NUMBER,
+                to=to_phone
+            )
         
         print(f"✅ SMS sent successfully to {to_phone}")
         return {
@@ -109,20 +95,23 @@ def send_email(to_email: str, subject: str, body: str) -> dict:
     
     # Send actual email via SendGrid
     try:
+        sendgrid_client = get_provider("sendgrid")
         if not sendgrid_client:
             raise Exception("SendGrid client not initialized. Check your API key.")
+        from sendgrid.helpers.mail import Mail
         
         # Convert plain text to HTML (replace newlines with <br>)
         html_body = body.replace("\n", "<br>")
         
         message = Mail(
-            from_email=sendgrid_from_email,
+            from_email=SENDGRID_FROM_EMAIL,
             to_emails=to_email,
             subject=subject,
             html_content=f"<html><body><pre style='font-family: Arial, sans-serif; white-space: pre-wrap;'>{html_body}</pre></body></html>"
         )
         
-        response = sendgrid_client.send(message)
+        with span("sendgrid", "send_email"):
+            response = sendgrid_client.send(message)
         
         print(f"✅ Email sent successfully to {to_email}")
         return {
@@ -137,3 +126,75 @@ def send_email(to_email: str, subject: str, body: str) -> dict:
             "success": False,
             "error": str(e)
         }
+
+
+def dispatch_followup_action(action_type: str, content: str, lead_data: dict, reasoning: str = None) -> dict:
+    """
+    Carry out a follow-up action through the right channel.
+    
+    Args:
+        action_type: sms, email, call or escalate
+        content: Message body, email (optionally starting with "Subject:") or call script
+        lead_data: Lead information (phone, email, insurance_type)
+        reasoning: Why the action was recommended (passed along on escalations)
+    
+    Returns:
+        Channel result dict (None for unknown action types)
+    """
+    if action_type == "sms":
+        return send_sms(lead_data.get("phone"), content)
+    
+    if action_type == "email":
+        # Extract subject from content (first line or generate one)
+        lines = content.split('\n')
+        
+        # Check if first line has "Subject:" prefix
+        if lines[0].lower().startswith("subject:"):
+            subject = lines[0].replace("Subject:", "").replace("subject:", "").strip()
+            body = '\n'.join(lines[1:]).strip()
+        else:
+            # If no subject line, use a default and treat all content as body
+            subject = f"Follow-up: {lead_data.get('insurance_type')} Insurance Quote"
+            body = content.strip()
+        
+        return send_email(lead_data.get("email"), subject, body)
+    
+    if action_type == "call":
+        # For call scripts, just mark as ready
+        return {"status": "script_ready", "message": "Call script prepared"}
+    
+    if action_type == "escalate":
+        # Create escalation record
+        return {"escalated": True, "to": "human_agent", "reason": reasoning}
+    
+    return None
+
+
+def dispatch_followup_actions(jobs: list, max_workers: int = None) -> list:
+    """
+    Dispatch many follow-up actions concurrently.
+    
+    Args:
+        jobs: List of dicts with action_type, content, lead_data and optional reasoning
+        max_workers: Thread pool size (defaults to DISPATCH_MAX_WORKERS)
+    
+    Returns:
+        Results in the same order as jobs; a send that raises yields {"success": False, "error": ...}
+    """
+    def run(job):
+        try:
+            return dispatch_followup_action(
+                job["action_type"],
+                job["content"],
+                job["lead_data"],
+                job.get("reasoning")
+            )
+        except Exception as e:
+            print(f"❌ Error dispatching {job['action_type']} action: {e}")
+            return {"success": False, "error": str(e)}
+    
+    if not jobs:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers or DISPATCH_MAX_WORKERS, len(jobs))) as executor:
+        return list(executor.map(run, jobs))
@@ -1,14 +1,11 @@
-import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-# Get database URL from environment
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./solisa.db")
+try:
+    from .settings import DATABASE_URL
+except ImportError:
+    from settings import DATABASE_URL
 
 # Create database engine
 engine = create_engine(
@@ -35,3 +32,41 @@ def get_db():
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    migrate_db()
+
+
+def migrate_db():
+    """
+    Bring existing tables up to date with the models.
+    
+    create_all() only creates missing tables, so columns and indexes added to
+    models after a database was created are added here. New columns must be nullable.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                    print(f"🛠️  Added column {table.name}.{column.name}")
+            
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+# Run migrations as an explicit step: python database.py (or python -m app.database)
+if __name__ == "__main__":
+    # Go through the importable module so the models register on the same Base
+    try:
+        from . import models  # noqa: F401
+        from .database import init_db as run_migrations
+    except ImportError:
+        import models  # noqa: F401
+        from database import init_db as run_migrations
+    run_migrations()
+    print(f"✅ Database is up to date ({DATABASE_URL})")
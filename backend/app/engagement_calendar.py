@@ -0,0 +1,214 @@
+import threading
+from datetime import date, datetime, timedelta
+from sqlalchemy import event, select, insert, delete, inspect, exists
+
+try:
+    from .models import Lead, EngagementSchedule
+    from .occasions_engine import anniversary_in_year, first_anniversary_on_or_after, next_renewal
+except ImportError:
+    from models import Lead, EngagementSchedule
+    from occasions_engine import anniversary_in_year, first_anniversary_on_or_after, next_renewal
+
+# Occasion types with a per-lead date
+SCHEDULED_OCCASION_TYPES = ("policy_anniversary", "policy_renewal")
+
+# Day this process last advanced the schedule (advance_engagements_daily)
+_advanced_on = None
+_advance_lock = threading.Lock()
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def add_years(day: date, years: int = 1) -> date:
+    """Same day `years` later (Feb 29 -> Feb 28 in non-leap years)"""
+    return anniversary_in_year(day, day.year + years)
+
+
+def next_engagement_dates(created_at, renewal_on, today: date = None) -> dict:
+    """
+    Next date per scheduled occasion type for a lead.
+
+    Args:
+        created_at: Policy start (drives anniversaries)
+        renewal_on: Renewal date; one in the past rolls forward a year at a time
+        today: Reference date (defaults to today)
+
+    Returns:
+        Dict of occasion_type -> date (types without a date are left out)
+    """
+    today = today or date.today()
+    dates = {}
+
+    if created_at:
+        dates["policy_anniversary"] = first_anniversary_on_or_after(created_at, today)
+
+    if renewal_on:
+        dates["policy_renewal"] = next_renewal(_as_date(renewal_on), today)
+
+    return dates
+
+
+def _schedule_rows(lead_id: int, dates: dict, now: datetime) -> list:
+    return [
+        {"lead_id": lead_id, "occasion_type": occasion_type, "next_date": next_date, "updated_at": now}
+        for occasion_type, next_date in dates.items()
+    ]
+
+
+def _write_schedule(connection, lead):
+    """Replace a lead's schedule rows (runs inside the lead's flush)"""
+    connection.execute(delete(EngagementSchedule).where(EngagementSchedule.lead_id == lead.id))
+    rows = _schedule_rows(lead.id, next_engagement_dates(lead.created_at, lead.renewal_on), datetime.utcnow())
+    if rows:
+        connection.execute(insert(EngagementSchedule), rows)
+
+
+@event.listens_for(Lead, "after_insert")
+def _schedule_new_lead(mapper, connection, lead):
+    _write_schedule(connection, lead)
+
+
+@event.listens_for(Lead, "after_update")
+def _reschedule_lead(mapper, connection, lead):
+    state = inspect(lead)
+    if state.attrs.created_at.history.has_changes() or state.attrs.renewal_on.history.has_changes():
+        _write_schedule(connection, lead)
+
+
+def roll_forward(db, lead_ids, occasion_type: str, fired_on: date = None) -> int:
+    """
+    Move the schedule past an occasion that just fired, for one or many leads.
+
+    The next date becomes the following year's occurrence after both the date
+    that was due and fired_on, so early and late sends both advance one cycle.
+
+    Returns:
+        Number of schedule rows moved
+    """
+    if occasion_type not in SCHEDULED_OCCASION_TYPES:
+        return 0
+
+    if isinstance(lead_ids, int):
+        lead_ids = [lead_ids]
+    fired_on = fired_on or date.today()
+
+    rows = db.query(EngagementSchedule, Lead.created_at).join(
+        Lead, Lead.id == EngagementSchedule.lead_id
+    ).filter(
+        EngagementSchedule.lead_id.in_(lead_ids),
+        EngagementSchedule.occasion_type == occasion_type
+    ).all()
+
+    for schedule, created_at in rows:
+        if occasion_type == "policy_anniversary" and created_at:
+            schedule.next_date = first_anniversary_on_or_after(created_at, max(fired_on, schedule.next_date) + timedelta(days=1))
+        else:
+            next_date = add_years(schedule.next_date)
+            while next_date <= fired_on:
+                next_date = add_years(next_date)
+            schedule.next_date = next_date
+        schedule.last_fired_on = fired_on
+
+    return len(rows)
+
+
+def advance_past_engagements(db, today: date = None, batch_size: int = 5000) -> int:
+    """
+    Move schedule rows whose date passed without the occasion firing to their
+    next occurrence (a range scan on next_date < today - normally empty).
+
+    Returns:
+        Number of rows advanced
+    """
+    today = today or date.today()
+    advanced = 0
+
+    while True:
+        rows = db.query(EngagementSchedule, Lead.created_at, Lead.renewal_on).join(
+            Lead, Lead.id == EngagementSchedule.lead_id
+        ).filter(
+            EngagementSchedule.next_date < today
+        ).order_by(EngagementSchedule.next_date.asc()).limit(batch_size).all()
+
+        if not rows:
+            break
+
+        for schedule, created_at, renewal_on in rows:
+            dates = next_engagement_dates(created_at, schedule.next_date if schedule.occasion_type == "policy_renewal" else renewal_on, today)
+            if schedule.occasion_type in dates:
+                schedule.next_date = dates[schedule.occasion_type]
+            else:
+                db.delete(schedule)
+        db.commit()
+
+        advanced += len(rows)
+
+    return advanced
+
+
+def advance_engagements_daily(db) -> int:
+    """
+    advance_past_engagements at most once a day per process.
+
+    Called by startup maintenance, by readers of the schedule before they
+    read it and by the follow-up scheduler, so dates that passed roll
+    forward whether or not the scheduler is enabled. Dates only go stale
+    when the day changes, so once a day is enough.
+
+    Returns:
+        Number of rows advanced (0 if already done today)
+    """
+    global _advanced_on
+    today = date.today()
+    if _advanced_on == today:
+        return 0
+
+    with _advance_lock:
+        if _advanced_on == today:
+            return 0
+        advanced = advance_past_engagements(db, today)
+        _advanced_on = today
+
+    return advanced
+
+
+def backfill_engagement_schedule(db, batch_size: int = 5000, today: date = None) -> int:
+    """
+    Create schedule rows for leads that have none (leads created before the
+    table existed, or bulk-loaded without going through the ORM).
+
+    Returns:
+        Number of leads scheduled
+    """
+    scheduled = 0
+    last_id = 0
+    has_schedule = exists().where(EngagementSchedule.lead_id == Lead.id)
+
+    while True:
+        leads = db.execute(
+            select(Lead.id, Lead.created_at, Lead.renewal_on)
+            .where(Lead.id > last_id, ~has_schedule)
+            .order_by(Lead.id.asc())
+            .limit(batch_size)
+        ).all()
+
+        if not leads:
+            break
+
+        now = datetime.utcnow()
+        rows = []
+        for lead_id, created_at, renewal_on in leads:
+            rows.extend(_schedule_rows(lead_id, next_engagement_dates(created_at, renewal_on, today), now))
+        if rows:
+            db.execute(insert(EngagementSchedule), rows)
+        db.commit()
+
+        scheduled += len(leads)
+        last_id = leads[-1].id
+
+    if scheduled:
+        print(f"🛠️  Built engagement schedule for {scheduled} leads")
+
+    return scheduled
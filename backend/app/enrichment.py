@@ -1,6 +1,36 @@
+import os
 import random
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 
+try:
+    from .settings import DEMO_MODE
+    from .providers import register_provider, get_provider
+    from .shared_state import get_cache
+except ImportError:
+    from settings import DEMO_MODE
+    from providers import register_provider, get_provider
+    from shared_state import get_cache
+
+# "apollo" for real lookups; anything else (or demo mode) uses the local provider
+ENRICHMENT_PROVIDER = os.getenv("ENRICHMENT_PROVIDER", "local").lower()
+
+# How long a person/company lookup is reused
+ENRICHMENT_CACHE_TTL_SECONDS = int(os.getenv("ENRICHMENT_CACHE_TTL_SECONDS", "86400"))
+
+# Simulated provider latency for the local provider (load tests)
+LOCAL_ENRICHMENT_LATENCY_MS = int(os.getenv("LOCAL_ENRICHMENT_LATENCY_MS", "0"))
+
+# Consumer mail domains have no company worth looking up
+FREE_MAIL_DOMAINS = {
+    "gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "icloud.com",
+    "aol.com", "live.com", "msn.com", "proton.me", "protonmail.com", "example.com"
+}
+
 # Life stages for different insurance types
 LIFE_STAGES = {
     "Auto": [
@@ -81,9 +111,158 @@ PROVIDERS = {
 AGE_RANGES = ["25-35", "35-45", "45-55", "55+"]
 
 
+class EnrichmentProvider(ABC):
+    """
+    Source of person and company data for lead enrichment.
+
+    Implementations return a dict of attributes, or None when the provider has
+    no record. Errors should be raised - the cache layer handles them.
+    """
+    name = "base"
+
+    @abstractmethod
+    def fetch_person(self, email: str) -> dict:
+        """Attributes of the person with this email (job title, ...)"""
+
+    @abstractmethod
+    def fetch_company(self, domain: str) -> dict:
+        """Attributes of the company with this email domain (name, industry, size, ...)"""
+
+
+class LocalEnrichmentProvider(EnrichmentProvider):
+    """
+    Stand-in provider for demo mode and tests: deterministic per email/domain,
+    no network, optional simulated latency.
+    """
+    name = "local"
+
+    JOB_TITLES = ["Software Engineer", "Nurse", "Teacher", "Sales Manager", "Accountant", "Small Business Owner", "Consultant"]
+    INDUSTRIES = ["Technology", "Healthcare", "Education", "Retail", "Financial Services", "Construction"]
+
+    def __init__(self, latency_ms: int = None):
+        self.latency_ms = LOCAL_ENRICHMENT_LATENCY_MS if latency_ms is None else latency_ms
+        self.calls = 0
+
+    def _rng(self, key: str) -> random.Random:
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return random.Random(hashlib.sha256(key.encode()).hexdigest())
+
+    def fetch_person(self, email: str) -> dict:
+        rng = self._rng(f"person:{email}")
+        return {"job_title": rng.choice(self.JOB_TITLES)}
+
+    def fetch_company(self, domain: str) -> dict:
+        rng = self._rng(f"company:{domain}")
+        return {
+            "company": domain.split(".")[0].title(),
+            "industry": rng.choice(self.INDUSTRIES),
+            "company_size": rng.choice(["1-10", "11-50", "51-200", "201-1000", "1000+"])
+        }
+
+
+# Cache miss marker (None is a valid cached "no data" result)
+_MISSING = object()
+
+
+class CachedEnrichmentClient:
+    """
+    TTL cache and request coalescing in front of an EnrichmentProvider.
+
+    Person results are cached per email and company results per domain, in the
+    "enrichment" cache of the configured state backend (shared across workers
+    with STATE_BACKEND=sqlite). Concurrent lookups of the same key in a process
+    share one in-flight provider call.
+    Provider errors are logged and treated as "no data" (not cached), so
+    enrichment never blocks lead intake.
+    """
+
+    def __init__(self, provider: EnrichmentProvider, ttl_seconds: int = None, cache=None):
+        self.provider = provider
+        self.ttl_seconds = ENRICHMENT_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.cache = get_cache("enrichment") if cache is None else cache
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str, fetch, *args) -> dict:
+        with self._lock:
+            cached = self.cache.get(key, _MISSING)
+            if cached is not _MISSING:
+                return cached
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not owner:
+            return future.result()
+
+        result, cacheable = None, False
+        try:
+            result, cacheable = fetch(*args), True
+        except Exception as e:
+            print(f"⚠️  Enrichment lookup failed ({self.provider.name} {key}): {e}")
+        finally:
+            with self._lock:
+                if cacheable:
+                    self.cache.set(key, result, self.ttl_seconds)
+                del self._in_flight[key]
+            future.set_result(result)
+
+        return result
+
+    def person(self, email: str) -> dict:
+        email = (email or "").strip().lower()
+        if not email:
+            return None
+        return self._get(f"person:{email}", self.provider.fetch_person, email)
+
+    def company(self, domain: str) -> dict:
+        domain = (domain or "").strip().lower()
+        if not domain or domain in FREE_MAIL_DOMAINS:
+            return None
+        return self._get(f"company:{domain}", self.provider.fetch_company, domain)
+
+    def lookup(self, email: str) -> dict:
+        """Merged person + company attributes for an email ({} if nothing is known)"""
+        domain = email.rpartition("@")[2] if email and "@" in email else None
+        return {**(self.company(domain) or {}), **(self.person(email) or {})}
+
+    def clear(self):
+        self.cache.clear()
+
+
+def create_enrichment_provider(name: str = None) -> EnrichmentProvider:
+    """Provider named by ENRICHMENT_PROVIDER (local in demo mode or without credentials)"""
+    name = (name or ENRICHMENT_PROVIDER).lower()
+
+    if name == "apollo" and not DEMO_MODE:
+        try:
+            from .apollo_integration import ApolloEnrichmentProvider, APOLLO_API_KEY
+        except ImportError:
+            from apollo_integration import ApolloEnrichmentProvider, APOLLO_API_KEY
+
+        if APOLLO_API_KEY:
+            return ApolloEnrichmentProvider()
+        print("⚠️  APOLLO_API_KEY not set - using local enrichment provider")
+
+    return LocalEnrichmentProvider()
+
+
+register_provider("enrichment", lambda: CachedEnrichmentClient(create_enrichment_provider()))
+
+
+def get_enrichment_client() -> CachedEnrichmentClient:
+    """Process-wide cached client (created on first use)"""
+    return get_provider("enrichment")
+
+
 def enrich_lead(lead_data: dict) -> dict:
     """
-    Enrich lead data with mock information for demo purposes.
+    Enrich lead data with provider attributes plus mock insurance details for demo purposes.
     
     Args:
         lead_data: Dictionary with basic lead info (full_name, email, phone, insurance_type, current_provider)
@@ -91,6 +270,8 @@ def enrich_lead(lead_data: dict) -> dict:
     Returns:
         Dictionary with enriched lead data
     """
+    profile = get_enrichment_client().lookup(lead_data.get("email"))
+
     insurance_type = lead_data.get("insurance_type", "Auto")
     
     # Select appropriate life stage
@@ -106,7 +287,8 @@ def enrich_lead(lead_data: dict) -> dict:
     
     # Generate renewal date (1-12 months in the future)
     months_ahead = random.randint(1, 12)
-    renewal_date = (datetime.now() + timedelta(days=30 * months_ahead)).strftime("%B %Y")
+    renewal_on = (datetime.now() + timedelta(days=30 * months_ahead)).date()
+    renewal_date = renewal_on.strftime("%B %Y")
     
     # Select 2 random pain points
     pain_points = random.sample(PAIN_POINTS.get(insurance_type, PAIN_POINTS["Auto"]), 2)
@@ -114,15 +296,18 @@ def enrich_lead(lead_data: dict) -> dict:
     # Calculate estimated savings ($200-$800/year)
     estimated_savings = random.randint(200, 800)
     
-    # Return enriched data
+    # Return enriched data (provider attributes are kept on the lead as its profile)
     enriched = {
         **lead_data,
+        "profile": profile or None,
         "life_stage": life_stage,
         "estimated_age_range": age_range,
         "current_provider": current_provider,
         "renewal_date": renewal_date,
+        "renewal_on": renewal_on,
         "pain_points": pain_points,
         "estimated_savings": estimated_savings
     }
     
     return enriched
+
@@ -1,19 +1,42 @@
 import os
+import re
 import json
-from groq import Groq
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 
-load_dotenv()
+try:
+    from .settings import LLM_DEMO_MODE
+    from .providers import get_provider
+    from .message_templates import get_template
+    from .metrics import span
+except ImportError:
+    from settings import LLM_DEMO_MODE
+    from providers import get_provider
+    from message_templates import get_template
+    from metrics import span
 
-# Check if we're in demo mode
-DEMO_MODE = os.getenv("DEMO_MODE", "true").lower() == "true"
+# Transcript chunking - content above this many (estimated) tokens is analyzed in parallel chunks
+TRANSCRIPT_CHUNK_TOKENS = int(os.getenv("TRANSCRIPT_CHUNK_TOKENS", "3000"))
+TRANSCRIPT_MAX_WORKERS = int(os.getenv("TRANSCRIPT_MAX_WORKERS", "4"))
+MAX_MERGED_KEY_POINTS = 10
+
+# "Name: text" at the start of a line marks a new speaker turn
+SPEAKER_LINE = re.compile(r"^[^:\n]{1,40}:\s")
+
+# Intent progression levels (lower = earlier stage, higher = closer to conversion)
+INTENT_LEVELS = {
+    "browsing": 1,
+    "interested": 2,
+    "interested_but_objecting": 2.5,
+    "objecting": 2,
+    "ready": 3,
+    "lost": 0
+}
+
+URGENCY_LEVELS = {"low": 0, "medium": 1, "high": 2}
+
+# Demo-mode actions, in the order they are recommended
+DEMO_FOLLOWUP_TEMPLATES = ("followup.sms.demo", "followup.email.demo", "followup.call.demo")
 
-# Initialize Groq client
-groq_api_key = os.getenv("GROQ_API_KEY")
-if not DEMO_MODE and groq_api_key:
-    client = Groq(api_key=groq_api_key)
-else:
-    client = None
 
 
 def analyze_touchpoint(content: str, lead_data: dict) -> dict:
@@ -23,7 +46,7 @@ def analyze_touchpoint(content: str, lead_data: dict) -> dict:
     """
     
     # Demo mode - return mock analysis
-    if DEMO_MODE or not client:
+    if LLM_DEMO_MODE or not get_provider("groq"):
         print("\n🎭 DEMO MODE - Using mock conversation analysis")
         return {
             "sentiment": "neutral",
@@ -39,15 +62,37 @@ def analyze_touchpoint(content: str, lead_data: dict) -> dict:
             "urgency": "medium"
         }
     
+    # Long transcripts are split into chunks and analyzed in parallel
+    if estimate_tokens(content) > TRANSCRIPT_CHUNK_TOKENS:
+        return analyze_touchpoint_chunked(content, lead_data)
+    
     # Real AI analysis
     try:
-        prompt = f"""Analyze this conversation with an insurance prospect:
+        analysis = _analyze_content(content, lead_data)
+        print(f"✅ AI analyzed conversation: {analysis['intent']}")
+        
+        return analysis
+    
+    except Exception as e:
+        print(f"❌ Error analyzing touchpoint: {e}")
+        # Fallback to demo mode
+        return _fallback_analysis()
+
+
+def _analyze_content(content: str, lead_data: dict, part: str = None) -> dict:
+    """
+    Run a single analysis call over content (a whole touchpoint or one chunk of it).
+    Raises on API or JSON errors so callers can decide how to fall back.
+    """
+    part_note = f"\nThis is {part} of a longer conversation. Analyze only this part.\n" if part else ""
+    
+    prompt = f"""Analyze this conversation with an insurance prospect:
 
 PROSPECT INFO:
 - Name: {lead_data.get('full_name', 'Unknown')}
 - Insurance Type: {lead_data.get('insurance_type', 'Unknown')}
 - Current Provider: {lead_data.get('current_provider', 'Unknown')}
-
+{part_note}
 CONVERSATION:
 {content}
 
@@ -62,28 +107,194 @@ Analyze and return ONLY valid JSON with these exact fields:
 
 Return ONLY the JSON, no other text."""
 
-        response = client.chat.completions.create(
+    with span("llm", "analyze_touchpoint"):
+        response = get_provider("groq").chat.completions.create(
             model="llama-3.3-70b-versatile",
             max_tokens=1000,
             messages=[{"role": "user", "content": prompt}]
         )
+    
+    # Parse JSON response
+    return json.loads(response.choices[0].message.content)
+
+
+def _fallback_analysis() -> dict:
+    """Neutral analysis used when the AI call fails"""
+    return {
+        "sentiment": "neutral",
+        "intent": "interested",
+        "objections": [],
+        "key_points": [],
+        "urgency": "medium"
+    }
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token estimate for budgeting prompts (~4 characters per token).
+    """
+    return len(text) // 4 + 1
+
+
+def split_speaker_turns(content: str) -> list:
+    """
+    Split a transcript into speaker turns.
+    
+    A turn starts at a line that looks like "Speaker: text" (the format produced by
+    format_zoom_transcript); continuation lines stay with the current turn.
+    """
+    turns = []
+    current = []
+    
+    for line in content.split('\n'):
+        stripped = line.strip()
+        if not stripped:
+            continue
         
-        # Parse JSON response
-        analysis = json.loads(response.choices[0].message.content)
-        print(f"✅ AI analyzed conversation: {analysis['intent']}")
+        if SPEAKER_LINE.match(stripped) and current:
+            turns.append('\n'.join(current))
+            current = []
+        current.append(stripped)
+    
+    if current:
+        turns.append('\n'.join(current))
+    
+    return turns
+
+
+def chunk_transcript(content: str, max_tokens: int = None) -> list:
+    """
+    Pack speaker turns into chunks that fit within a token budget.
+    
+    Turns are never split across chunks unless a single turn is larger than the
+    budget on its own, in which case it is cut on character boundaries.
+    
+    Args:
+        content: Full transcript text
+        max_tokens: Token budget per chunk (defaults to TRANSCRIPT_CHUNK_TOKENS)
+    
+    Returns:
+        List of chunk strings in conversation order
+    """
+    max_tokens = max_tokens or TRANSCRIPT_CHUNK_TOKENS
+    max_chars = max_tokens * 4
+    
+    chunks = []
+    current = []
+    current_tokens = 0
+    
+    for turn in split_speaker_turns(content):
+        turn_tokens = estimate_tokens(turn)
         
-        return analysis
+        if turn_tokens > max_tokens:
+            # Oversized turn - flush what we have and hard-split the turn
+            if current:
+                chunks.append('\n'.join(current))
+                current, current_tokens = [], 0
+            for start in range(0, len(turn), max_chars):
+                chunks.append(turn[start:start + max_chars])
+            continue
+        
+        if current and current_tokens + turn_tokens > max_tokens:
+            chunks.append('\n'.join(current))
+            current, current_tokens = [], 0
+        
+        current.append(turn)
+        current_tokens += turn_tokens
     
-    except Exception as e:
-        print(f"❌ Error analyzing touchpoint: {e}")
-        # Fallback to demo mode
-        return {
-            "sentiment": "neutral",
-            "intent": "interested",
-            "objections": [],
-            "key_points": [],
-            "urgency": "medium"
+    if current:
+        chunks.append('\n'.join(current))
+    
+    return chunks
+
+
+def analyze_touchpoint_chunked(content: str, lead_data: dict) -> dict:
+    """
+    Map-reduce analysis for long transcripts.
+    
+    Chunks are analyzed in parallel (map) and the per-chunk results are merged into
+    a single analysis with the same schema as analyze_touchpoint (reduce).
+    """
+    chunks = chunk_transcript(content)
+    print(f"\n✂️ Long transcript (~{estimate_tokens(content)} tokens) - analyzing {len(chunks)} chunks")
+    
+    results = [None] * len(chunks)
+    with ThreadPoolExecutor(max_workers=min(TRANSCRIPT_MAX_WORKERS, len(chunks))) as executor:
+        futures = {
+            executor.submit(_analyze_content, chunk, lead_data, f"part {i + 1} of {len(chunks)}"): i
+            for i, chunk in enumerate(chunks)
         }
+        for future, i in futures.items():
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                print(f"❌ Error analyzing chunk {i + 1}/{len(chunks)}: {e}")
+    
+    analyses = [r for r in results if r]
+    if not analyses:
+        return _fallback_analysis()
+    
+    analysis = merge_touchpoint_analyses(analyses)
+    print(f"✅ AI analyzed conversation ({len(analyses)}/{len(chunks)} chunks): {analysis['intent']}")
+    
+    return analysis
+
+
+def merge_touchpoint_analyses(analyses: list) -> dict:
+    """
+    Reduce per-chunk analyses (in conversation order) into one analysis.
+    
+    - sentiment: most common across chunks, ties go to the later chunk
+    - intent: the last chunk that reported one (where the conversation ended up)
+    - objections / key_points: de-duplicated union, in order of first mention
+    - urgency: the highest reported
+    """
+    sentiment_counts = {}
+    for a in analyses:
+        if a.get('sentiment'):
+            sentiment_counts[a['sentiment']] = sentiment_counts.get(a['sentiment'], 0) + 1
+    sentiment = 'neutral'
+    best = 0
+    for a in analyses:
+        s = a.get('sentiment')
+        if s and sentiment_counts[s] >= best:
+            sentiment, best = s, sentiment_counts[s]
+    
+    intent = "interested"
+    for a in analyses:
+        if a.get('intent'):
+            intent = a['intent']
+    
+    urgency = 'low'
+    for a in analyses:
+        if URGENCY_LEVELS.get(a.get('urgency'), -1) > URGENCY_LEVELS[urgency]:
+            urgency = a['urgency']
+    
+    return {
+        "sentiment": sentiment,
+        "intent": intent,
+        "objections": _merge_unique(a.get('objections') for a in analyses),
+        "key_points": _merge_unique(a.get('key_points') for a in analyses)[:MAX_MERGED_KEY_POINTS],
+        "urgency": urgency
+    }
+
+
+def _merge_unique(lists) -> list:
+    """Union of string lists, case-insensitively de-duplicated, in first-seen order."""
+    seen = set()
+    merged = []
+    for items in lists:
+        for item in items or []:
+            key = str(item).strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(item)
+    return merged
+
+
+def intent_level(intent: str) -> float:
+    """Position of an intent on the path to conversion (unknown intents count as browsing)"""
+    return INTENT_LEVELS.get(intent, 1)
 
 
 def detect_intent_shift(previous_touchpoints: list, current_intent: str) -> dict:
@@ -98,14 +309,7 @@ def detect_intent_shift(previous_touchpoints: list, current_intent: str) -> dict
         Dict with shift_detected, previous_intent, current_intent, shift_type, significance
     """
     if not previous_touchpoints or len(previous_touchpoints) == 0:
-        return {
-            "shift_detected": False,
-            "previous_intent": None,
-            "current_intent": current_intent,
-            "shift_type": "initial",
-            "significance": "low",
-            "message": "First touchpoint - establishing baseline intent"
-        }
+        return detect_intent_shift_from_state(None, current_intent)
     
     # Get the most recent previous intent
     previous_intent = None
@@ -124,6 +328,30 @@ def detect_intent_shift(previous_touchpoints: list, current_intent: str) -> dict
             "message": "No previous intent data available"
         }
     
+    return detect_intent_shift_from_state(previous_intent, current_intent)
+
+
+def detect_intent_shift_from_state(previous_intent: str, current_intent: str) -> dict:
+    """
+    Detect an intent shift from the lead's last known intent (O(1), no history needed).
+    
+    Args:
+        previous_intent: Most recent non-null intent for the lead (None if there is none yet)
+        current_intent: Current intent from latest analysis
+    
+    Returns:
+        Same dict as detect_intent_shift
+    """
+    if not previous_intent:
+        return {
+            "shift_detected": False,
+            "previous_intent": None,
+            "current_intent": current_intent,
+            "shift_type": "initial",
+            "significance": "low",
+            "message": "First touchpoint - establishing baseline intent"
+        }
+    
     # Check if intent has changed
     if previous_intent == current_intent:
         return {
@@ -135,18 +363,8 @@ def detect_intent_shift(previous_touchpoints: list, current_intent: str) -> dict
             "message": f"Intent remains stable: {current_intent}"
         }
     
-    # Define intent progression levels (lower = earlier stage, higher = closer to conversion)
-    intent_levels = {
-        "browsing": 1,
-        "interested": 2,
-        "interested_but_objecting": 2.5,
-        "objecting": 2,
-        "ready": 3,
-        "lost": 0
-    }
-    
-    prev_level = intent_levels.get(previous_intent, 1)
-    curr_level = intent_levels.get(current_intent, 1)
+    prev_level = intent_level(previous_intent)
+    curr_level = intent_level(current_intent)
     
     # Determine shift type and significance
     if curr_level > prev_level:
@@ -194,85 +412,27 @@ def generate_followup_actions(lead_data: dict, touchpoint_data: dict, analysis:
     """
     
     # Demo mode - return mock actions
-    if DEMO_MODE or not client:
+    if LLM_DEMO_MODE or not get_provider("groq"):
         print("\n🎭 DEMO MODE - Generating mock follow-up actions")
         
-        actions = []
-        
-        # Action 1: SMS
-        actions.append({
-            "action_type": "sms",
-            "priority": "high",
-            "content": f"Hi {lead_data.get('full_name', 'there').split()[0]}! Quick follow-up - I found a way to get you closer to your current rate. Can we chat for 5 mins tomorrow? 📞 - Alex @ Solisa",
-            "reasoning": "Prospect mentioned price as main objection. Quick SMS shows we're addressing their concern.",
-            "timing": "immediate"
-        })
-        
-        # Action 2: Email
-        calendly_link = lead_data.get('calendly_link', 'https://calendly.com/solisa-demo/30min')
-        email_content = f"""Subject: Accident Forgiveness: Worth the Extra $40?
-
-Hi {lead_data.get('full_name', 'there').split()[0]},
-
-Great talking with you today! I know the $40/month difference gave you pause.
-
-Here's something to consider: With your clean driving record, you're a perfect candidate for accident forgiveness. Here's what that means:
-
-• One accident won't raise your rates
-• Average rate increase after accident: $500-$1,200/year
-• Your protection: $0 increase
-
-So that $40/month ($480/year) could save you $500-$1,200 if something happens.
-
-Plus, I'm working on getting you a better rate. Let's schedule a quick 15-minute call to discuss your options:
-
-📅 Book your call here: {calendly_link}
-
-Looking forward to finding you the best coverage!
-
-Best,
-Alex
-Solisa Insurance"""
-        
-        actions.append({
-            "action_type": "email",
-            "priority": "medium",
-            "content": email_content,
-            "reasoning": "Provide ROI case study addressing price objection with concrete numbers.",
-            "timing": "1hour"
-        })
-        
-        # Action 3: Call script
-        call_script = f"""CALL SCRIPT - Follow-up with {lead_data.get('full_name', 'Prospect')}
-
-OBJECTIVE: Address price objection, present revised quote
-
-OPENING:
-"Hi {lead_data.get('full_name', 'there').split()[0]}, it's Alex from Solisa. Do you have 5 minutes? I found some options that might work better for you."
-
-KEY POINTS TO COVER:
-1. Acknowledge their concern about the $40 difference
-2. Present revised quote (aim for $200-210/month)
-3. Emphasize accident forgiveness value with their clean record
-4. Offer flexible payment options
-
-OBJECTION HANDLING:
-- If still too expensive: "What monthly rate would work for your budget?"
-- If needs time: "I understand. Can I check back next week?"
-- If comparing: "What would make this an easy yes for you?"
-
-CLOSE:
-"Does this feel more in line with what you're looking for?"
-
-NEXT STEP: Book follow-up or close deal"""
+        first_name = lead_data.get('full_name', 'there').split()[0]
+        values = {
+            "first_name": first_name,
+            "full_name": lead_data.get('full_name', 'Prospect'),
+            "calendly_link": lead_data.get('calendly_link', 'https://calendly.com/solisa-demo/30min')
+        }
         
-        actions.append({
-            "action_type": "call",
-            "priority": "medium",
-            "content": call_script,
-            "reasoning": "Prepare for tomorrow's call with specific talking points addressing their objections.",
-            "timing": "1day"
-        })
+        # SMS, ROI email and call script
+        actions = []
+        for name in DEMO_FOLLOWUP_TEMPLATES:
+            template = get_template(name)
+            actions.append({
+                "action_type": template.metadata["action_type"],
+                "priority": template.metadata["priority"],
+                "content": template.render(**values),
+                "reasoning": template.metadata["reasoning"],
+                "timing": template.metadata["timing"]
+            })
         
         return actions
     
@@ -296,6 +456,11 @@ INTENT SHIFT DETECTED:
         
         calendly_link = lead_data.get('calendly_link', 'https://calendly.com/solisa-demo/30min')
         
+        # Long transcripts are already summarized by the analysis - only send the end of the call
+        conversation = touchpoint_data.get('content', '')
+        if estimate_tokens(conversation) > TRANSCRIPT_CHUNK_TOKENS:
+            conversation = "[...earlier conversation summarized in ANALYSIS above...]\n" + chunk_transcript(conversation)[-1]
+        
         prompt = f"""Based on this conversation analysis, recommend 2-3 specific follow-up actions:
 
 LEAD INFO:
@@ -313,7 +478,7 @@ ANALYSIS:
 - Urgency: {analysis.get('urgency', 'medium')}
 {intent_shift_context}
 CONVERSATION:
-{touchpoint_data.get('content', '')}
+{conversation}
 
 Generate specific, actionable follow-ups. Return ONLY valid JSON array:
 [
@@ -330,11 +495,12 @@ IMPORTANT: For email actions, ALWAYS include the Calendly booking link ({calendl
 Make messages personal, natural, and address their specific objections.
 Return ONLY the JSON array, no other text."""
 
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        with span("llm", "generate_followup_actions"):
+            response = get_provider("groq").chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                max_tokens=2000,
+                messages=[{"role": "user", "content": prompt}]
+            )
         
         # Parse JSON response
         actions = json.loads(response.choices[0].message.content)
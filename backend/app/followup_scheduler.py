@@ -0,0 +1,382 @@
+import os
+import re
+import heapq
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import or_, update
+
+try:
+    from .database import SessionLocal
+    from .models import Lead, FollowUpAction
+    from .communications import dispatch_followup_actions
+    from .shared_state import get_lease, SHARED as SHARED_STATE
+    from .engagement_calendar import advance_engagements_daily
+except ImportError:
+    from database import SessionLocal
+    from models import Lead, FollowUpAction
+    from communications import dispatch_followup_actions
+    from shared_state import get_lease, SHARED as SHARED_STATE
+    from engagement_calendar import advance_engagements_daily
+
+# The scheduler sends real messages on its own, so it is opt-in
+SCHEDULER_ENABLED = os.getenv("FOLLOWUP_SCHEDULER_ENABLED", "false").lower() == "true"
+
+# Longest the worker sleeps before re-checking the queue
+SCHEDULER_POLL_SECONDS = float(os.getenv("FOLLOWUP_SCHEDULER_POLL_SECONDS", "30"))
+
+# Only the worker holding the scheduler lease executes actions; it renews the
+# lease every wake-up, and another worker takes over once it lapses
+SCHEDULER_LEASE_SECONDS = float(os.getenv("FOLLOWUP_SCHEDULER_LEASE_SECONDS", str(max(60.0, 3 * SCHEDULER_POLL_SECONDS))))
+
+# Max actions executed per wake-up (one DB round trip for actions, one for leads)
+SCHEDULER_BATCH_SIZE = int(os.getenv("FOLLOWUP_SCHEDULER_BATCH_SIZE", "100"))
+
+# An action claimed (in_progress) for longer than this was left by a worker that
+# died mid-send and goes back to pending. Sends interrupted after the provider
+# accepted them but before the result was saved are retried: at-least-once.
+CLAIM_TIMEOUT_SECONDS = float(os.getenv("FOLLOWUP_CLAIM_TIMEOUT_SECONDS", "600"))
+
+# Ids per claim UPDATE (under SQLite's bound parameter limit)
+CLAIM_CHUNK = 500
+
+# Only channel sends are automated - call scripts and escalations need a human
+AUTO_EXECUTE_TYPES = ("sms", "email")
+
+TIMING_DELAYS = {
+    "immediate": timedelta(0),
+    "1hour": timedelta(hours=1),
+    "1day": timedelta(days=1),
+}
+
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+# Free-text timings from the LLM like "2 hours" or "3days"
+TIMING_PATTERN = re.compile(r"^\s*(\d+)\s*(minute|min|hour|hr|day)s?\s*$", re.IGNORECASE)
+TIMING_UNITS = {"minute": "minutes", "min": "minutes", "hour": "hours", "hr": "hours", "day": "days"}
+
+
+def timing_delay(timing: str) -> timedelta:
+    """
+    Convert an action's timing ("immediate", "1hour", "1day", "2 hours"...) to a delay.
+    Unknown or missing timings run immediately.
+    """
+    if not timing:
+        return timedelta(0)
+
+    key = timing.strip().lower()
+    if key in TIMING_DELAYS:
+        return TIMING_DELAYS[key]
+
+    match = TIMING_PATTERN.match(key)
+    if match:
+        return timedelta(**{TIMING_UNITS[match.group(2).lower()]: int(match.group(1))})
+
+    return timedelta(0)
+
+
+def claim_actions(db, action_ids: list) -> list:
+    """
+    Claim actions for sending with a conditional pending -> in_progress update,
+    and commit. Actions that aren't pending (already sent, failed, or claimed
+    by the scheduler or another request) are left alone.
+
+    Returns:
+        IDs of the actions this caller claimed, in the order given
+    """
+    action_ids = list(dict.fromkeys(action_ids))
+    claimed = set()
+    claimed_at = datetime.utcnow()
+    for start in range(0, len(action_ids), CLAIM_CHUNK):
+        claimed.update(db.execute(
+            update(FollowUpAction)
+            .where(FollowUpAction.id.in_(action_ids[start:start + CLAIM_CHUNK]), FollowUpAction.status == "pending")
+            .values(status="in_progress", claimed_at=claimed_at)
+            .returning(FollowUpAction.id)
+        ).scalars().all())
+    db.commit()
+    return [action_id for action_id in action_ids if action_id in claimed]
+
+
+def dispatch_succeeded(result) -> bool:
+    """
+    Whether a dispatch result counts as done. Failed sends return
+    {"success": False, ...}; action types with nothing to send return no result.
+    """
+    if not result:
+        return True
+    return result.get("success") is not False
+
+
+class FollowUpScheduler:
+    """
+    In-process scheduler for pending FollowUpAction rows.
+
+    Actions sit in a heap keyed on (due time, priority rank, id), so the next
+    due action is always at the top. A worker thread sleeps until then, pops all
+    due actions and executes them through the communications layer. Pending
+    actions are rehydrated from the database on startup, along with actions
+    whose claim went stale because the process died while sending them.
+
+    With several workers, only the holder of the "followup-scheduler" lease
+    executes; the others drop their due entries. With a shared state backend
+    the holder also rehydrates every wake-up to pick up actions queued by the
+    other workers. The conditional claim in execute() means an action is never
+    sent twice even if two workers did run it.
+
+    The lease holder also moves engagement schedule dates that passed without
+    the occasion firing on to their next occurrence, once a day.
+    """
+
+    def __init__(self, session_factory=SessionLocal, batch_size: int = SCHEDULER_BATCH_SIZE):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self._heap = []
+        self._queued = set()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._lease = get_lease("followup-scheduler")
+        self._leader = False
+
+    def schedule(self, action_id: int, priority: str, timing: str, created_at: datetime = None):
+        """Queue an action (no-op if it is already queued)"""
+        due = (created_at or datetime.utcnow()) + timing_delay(timing)
+
+        with self._cond:
+            if action_id in self._queued:
+                return
+            self._queued.add(action_id)
+            heapq.heappush(self._heap, (due, PRIORITY_RANK.get(priority, 1), action_id))
+            # Wake the worker in case this action is due before its current sleep ends
+            self._cond.notify()
+
+    def schedule_action(self, action):
+        """Queue a FollowUpAction ORM object if it is an automated channel send"""
+        if action.action_type in AUTO_EXECUTE_TYPES and action.status == "pending":
+            self.schedule(action.id, action.priority, action.timing, action.created_at)
+
+    def release_stale_claims(self, now: datetime = None) -> int:
+        """
+        Put actions claimed more than CLAIM_TIMEOUT_SECONDS ago back to pending.
+
+        Returns:
+            Number of actions released
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=CLAIM_TIMEOUT_SECONDS)
+        db = self.session_factory()
+        try:
+            released = db.query(FollowUpAction).filter(
+                FollowUpAction.status == "in_progress",
+                or_(FollowUpAction.claimed_at.is_(None), FollowUpAction.claimed_at < cutoff)
+            ).update({"status": "pending", "claimed_at": None}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+        if released:
+            print(f"♻️  Released {released} follow-up actions left in progress")
+        return released
+
+    def rehydrate(self, quiet: bool = False) -> int:
+        """
+        Release stale claims, then load all pending automated actions from the
+        database (one indexed query).
+
+        Args:
+            quiet: Skip the log line (periodic rehydration by the lease holder)
+
+        Returns:
+            Number of actions queued
+        """
+        self.release_stale_claims()
+
+        db = self.session_factory()
+        try:
+            rows = db.query(
+                FollowUpAction.id,
+                FollowUpAction.priority,
+                FollowUpAction.timing,
+                FollowUpAction.created_at
+            ).filter(
+                FollowUpAction.status == "pending",
+                FollowUpAction.action_type.in_(AUTO_EXECUTE_TYPES)
+            ).all()
+        finally:
+            db.close()
+
+        for action_id, priority, timing, created_at in rows:
+            self.schedule(action_id, priority, timing, created_at)
+
+        if not quiet:
+            print(f"⏰ Follow-up scheduler rehydrated {len(rows)} pending actions")
+        return len(rows)
+
+    def pop_due(self, now: datetime = None) -> list:
+        """Remove and return up to batch_size action ids that are due"""
+        now = now or datetime.utcnow()
+        due_ids = []
+
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now and len(due_ids) < self.batch_size:
+                _, _, action_id = heapq.heappop(self._heap)
+                self._queued.discard(action_id)
+                due_ids.append(action_id)
+
+        return due_ids
+
+    def run_due(self, now: datetime = None) -> list:
+        """
+        Execute every action that is due.
+
+        Returns:
+            List of {"action_id", "status", "result"} dicts
+        """
+        results = []
+        while True:
+            due_ids = self.pop_due(now)
+            if not due_ids:
+                return results
+            results.extend(self.execute(due_ids))
+
+    def execute(self, action_ids: list) -> list:
+        """
+        Execute a batch of actions.
+
+        Each action is claimed first (claim_actions), so an action executed manually
+        in the meantime (or claimed elsewhere) is skipped.
+        """
+        db = self.session_factory()
+        results = []
+        try:
+            claimed = claim_actions(db, action_ids)
+            if not claimed:
+                return results
+
+            actions = db.query(FollowUpAction).filter(FollowUpAction.id.in_(claimed)).all()
+            lead_ids = {a.lead_id for a in actions}
+            leads = {l.id: l for l in db.query(Lead).filter(Lead.id.in_(lead_ids)).all()}
+
+            runnable = []
+            for action in actions:
+                if action.lead_id in leads:
+                    runnable.append(action)
+                else:
+                    action.status = "skipped"
+                    results.append({"action_id": action.id, "status": action.status, "result": None})
+
+            print(f"\n⏰ Executing {len(runnable)} scheduled follow-up actions")
+
+            dispatch_results = dispatch_followup_actions([
+                {
+                    "action_type": action.action_type,
+                    "content": action.content,
+                    "lead_data": {
+                        "phone": leads[action.lead_id].phone,
+                        "email": leads[action.lead_id].email,
+                        "insurance_type": leads[action.lead_id].insurance_type
+                    },
+                    "reasoning": action.reasoning
+                }
+                for action in runnable
+            ])
+
+            for action, result in zip(runnable, dispatch_results):
+                if dispatch_succeeded(result):
+                    action.status = "completed"
+                    action.completed_at = datetime.utcnow()
+                else:
+                    action.status = "failed"
+
+                results.append({"action_id": action.id, "status": action.status, "result": result})
+
+            db.commit()
+        finally:
+            db.close()
+
+        return results
+
+    def status(self) -> dict:
+        """Queue size and next due time"""
+        with self._cond:
+            next_due = self._heap[0][0].isoformat() if self._heap else None
+            return {
+                "enabled": SCHEDULER_ENABLED,
+                "running": bool(self._thread and self._thread.is_alive()),
+                "leader": self._leader,
+                "queued": len(self._heap),
+                "next_due": next_due
+            }
+
+    def start(self):
+        """Start the background worker thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="followup-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker thread (pending actions stay in the DB for the next start)"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+        # Let another worker take over without waiting for the lease to lapse
+        if self._leader:
+            self._lease.release()
+            self._leader = False
+
+    def advance_engagements(self) -> int:
+        """Roll stale engagement schedule rows forward (at most once per day)"""
+        db = self.session_factory()
+        try:
+            return advance_engagements_daily(db)
+        finally:
+            db.close()
+
+    def run_as_leader(self) -> list:
+        """
+        One wake-up: take or renew the lease, then run what is due.
+
+        Returns:
+            Results of the executed actions ([] when another worker holds the lease)
+        """
+        self._leader = self._lease.acquire(SCHEDULER_LEASE_SECONDS)
+        if not self._leader:
+            # The lease holder finds these in the database
+            while self.pop_due():
+                pass
+            return []
+
+        # Other workers' actions, and actions whose claim went stale, are only in the database
+        if SHARED_STATE or self.release_stale_claims():
+            self.rehydrate(quiet=True)
+        self.advance_engagements()
+        return self.run_due()
+
+    def _run(self):
+        next_poll = datetime.utcnow()
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+
+                now = datetime.utcnow()
+                # With shared state, actions queued by other workers only show up by polling
+                wait = (next_poll - now).total_seconds() if SHARED_STATE else SCHEDULER_POLL_SECONDS
+                if self._heap:
+                    wait = min(wait, (self._heap[0][0] - now).total_seconds())
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+
+            next_poll = datetime.utcnow() + timedelta(seconds=SCHEDULER_POLL_SECONDS)
+            try:
+                self.run_as_leader()
+            except Exception as e:
+                print(f"❌ Follow-up scheduler error: {e}")
+
+
+# Shared scheduler for the app process
+scheduler = FollowUpScheduler()
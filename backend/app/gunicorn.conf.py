@@ -0,0 +1,36 @@
+"""
+gunicorn settings for serving the API with uvicorn workers.
+
+    cd backend/app
+    gunicorn -c gunicorn.conf.py main:app
+
+WEB_CONCURRENCY sets the worker count and BIND the address. Migrations and
+startup maintenance run once in a separate process before workers start (see
+serve.py), so the gunicorn master never imports the app and forked workers
+start clean.
+"""
+import os
+import sys
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, APP_DIR)
+
+from serve import WEB_CONCURRENCY, configure_workers  # noqa: E402
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Campaign sends and scheduled follow-ups run in worker threads; let them finish a batch on shutdown
+graceful_timeout = 30
+
+configure_workers(workers)
+
+
+def on_starting(server):
+    subprocess.run([sys.executable, "serve.py", "--prepare-only", "--workers", str(workers)],
+                   cwd=APP_DIR, check=True)
+    # Workers inherit the master's environment
+    os.environ["AUTO_MIGRATE"] = "false"
+    os.environ["STARTUP_MAINTENANCE"] = "false"
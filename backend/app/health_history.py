@@ -0,0 +1,251 @@
+"""
+Policy health history compaction.
+
+Every response, life event and occasion appends a full PolicyHealth record.
+compact_policy_health() keeps the newest HEALTH_KEEP_LATEST records per lead
+as they are and folds older ones into PolicyHealthHistory score points - one
+per day for the last HEALTH_DAILY_DAYS days, one per week (starting Monday)
+before that - then deletes them. Daily points that age past the window are
+rolled up into weekly ones on later runs.
+
+It runs with the startup maintenance; on a long-running deployment run it
+from cron as well:
+
+    python health_history.py
+"""
+import os
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, delete, func
+
+try:
+    from .models import PolicyHealth, PolicyHealthHistory
+except ImportError:
+    from models import PolicyHealth, PolicyHealthHistory
+
+# Detailed records kept per lead (0 keeps everything)
+HEALTH_KEEP_LATEST = int(os.getenv("HEALTH_KEEP_LATEST", "10"))
+
+# Older records become daily points for this many days, weekly points after
+HEALTH_DAILY_DAYS = int(os.getenv("HEALTH_DAILY_DAYS", "90"))
+
+# Ids per DELETE (under SQLite's bound parameter limit)
+_DELETE_CHUNK = 500
+
+
+def period_of(day: date, cutoff: date) -> tuple:
+    """(granularity, period_start) of a day: itself from the cutoff on, its week's Monday before"""
+    if day >= cutoff:
+        return "day", day
+    return "week", day - timedelta(days=day.weekday())
+
+
+def _merge(target: PolicyHealthHistory, point: PolicyHealthHistory):
+    """Fold one point's samples into another point of the same period"""
+    samples = target.samples + point.samples
+    target.health_score = (target.health_score * target.samples + point.health_score * point.samples) / samples
+    target.samples = samples
+    target.min_score = min(target.min_score, point.min_score)
+    target.max_score = max(target.max_score, point.max_score)
+    if point.last_calculated_at >= target.last_calculated_at:
+        target.churn_risk = point.churn_risk
+        target.churn_probability = point.churn_probability
+        target.last_calculated_at = point.last_calculated_at
+
+
+def _save_points(db, lead_ids: list, points: dict):
+    """Merge (lead_id, granularity, period_start) -> point into the stored history"""
+    stored = {
+        (row.lead_id, row.granularity, row.period_start): row
+        for row in db.query(PolicyHealthHistory).filter(PolicyHealthHistory.lead_id.in_(lead_ids))
+    }
+    for key, point in points.items():
+        if key in stored:
+            _merge(stored[key], point)
+        else:
+            db.add(point)
+
+
+def _delete_ids(db, model, ids: list):
+    for start in range(0, len(ids), _DELETE_CHUNK):
+        db.execute(delete(model).where(model.id.in_(ids[start:start + _DELETE_CHUNK])))
+
+
+def _compact_records(db, lead_ids: list, keep_latest: int, cutoff: date) -> int:
+    """Fold all but each lead's newest records into history points and delete them"""
+    ranked = select(
+        PolicyHealth.id, PolicyHealth.lead_id, PolicyHealth.health_score, PolicyHealth.churn_risk,
+        PolicyHealth.churn_probability, PolicyHealth.calculated_at,
+        func.row_number().over(
+            partition_by=PolicyHealth.lead_id,
+            order_by=(PolicyHealth.calculated_at.desc(), PolicyHealth.id.desc())
+        ).label("recency")
+    ).where(PolicyHealth.lead_id.in_(lead_ids)).subquery()
+
+    records = db.execute(
+        select(ranked).where(ranked.c.recency > keep_latest, ranked.c.calculated_at.isnot(None))
+    ).all()
+
+    points = {}
+    for record in records:
+        granularity, period_start = period_of(record.calculated_at.date(), cutoff)
+        point = PolicyHealthHistory(
+            lead_id=record.lead_id, granularity=granularity, period_start=period_start,
+            health_score=float(record.health_score), min_score=record.health_score, max_score=record.health_score,
+            samples=1, churn_risk=record.churn_risk, churn_probability=record.churn_probability,
+            last_calculated_at=record.calculated_at
+        )
+        key = (record.lead_id, granularity, period_start)
+        if key in points:
+            _merge(points[key], point)
+        else:
+            points[key] = point
+
+    _save_points(db, lead_ids, points)
+    _delete_ids(db, PolicyHealth, [record.id for record in records])
+    return len(records)
+
+
+def _roll_up_days(db, lead_ids: list, cutoff: date) -> int:
+    """Merge daily points from before the cutoff into their weekly points"""
+    days = db.query(PolicyHealthHistory).filter(
+        PolicyHealthHistory.lead_id.in_(lead_ids),
+        PolicyHealthHistory.granularity == "day",
+        PolicyHealthHistory.period_start < cutoff
+    ).all()
+
+    weeks = {}
+    for day in days:
+        week_start = period_of(day.period_start, cutoff)[1]
+        point = PolicyHealthHistory(
+            lead_id=day.lead_id, granularity="week", period_start=week_start,
+            health_score=day.health_score, min_score=day.min_score, max_score=day.max_score, samples=day.samples,
+            churn_risk=day.churn_risk, churn_probability=day.churn_probability, last_calculated_at=day.last_calculated_at
+        )
+        key = (day.lead_id, "week", week_start)
+        if key in weeks:
+            _merge(weeks[key], point)
+        else:
+            weeks[key] = point
+
+    for day in days:
+        db.delete(day)
+    db.flush()
+    _save_points(db, lead_ids, weeks)
+    return len(days)
+
+
+def compact_policy_health(db, keep_latest: int = None, daily_days: int = None, batch_size: int = 500,
+                          today: date = None) -> dict:
+    """
+    Compact PolicyHealth history, a batch of leads per transaction.
+
+    Args:
+        keep_latest: Detailed records kept per lead (HEALTH_KEEP_LATEST by default; 0 keeps everything)
+        daily_days: Days of daily points before weekly ones (HEALTH_DAILY_DAYS by default)
+        today: Reference date (defaults to today)
+
+    Returns:
+        Dict with records compacted into points and daily points rolled up into weeks
+    """
+    keep_latest = HEALTH_KEEP_LATEST if keep_latest is None else keep_latest
+    daily_days = HEALTH_DAILY_DAYS if daily_days is None else daily_days
+    cutoff = (today or date.today()) - timedelta(days=daily_days)
+    result = {"records_compacted": 0, "days_rolled_up": 0}
+
+    if keep_latest > 0:
+        last_id = 0
+        while True:
+            lead_ids = db.execute(
+                select(PolicyHealth.lead_id)
+                .where(PolicyHealth.lead_id > last_id)
+                .group_by(PolicyHealth.lead_id)
+                .having(func.count(PolicyHealth.id) > keep_latest)
+                .order_by(PolicyHealth.lead_id.asc())
+                .limit(batch_size)
+            ).scalars().all()
+
+            if not lead_ids:
+                break
+
+            result["records_compacted"] += _compact_records(db, lead_ids, keep_latest, cutoff)
+            db.commit()
+            last_id = lead_ids[-1]
+
+    last_id = 0
+    while True:
+        lead_ids = db.execute(
+            select(PolicyHealthHistory.lead_id)
+            .where(PolicyHealthHistory.granularity == "day", PolicyHealthHistory.period_start < cutoff,
+                   PolicyHealthHistory.lead_id > last_id)
+            .group_by(PolicyHealthHistory.lead_id)
+            .order_by(PolicyHealthHistory.lead_id.asc())
+            .limit(batch_size)
+        ).scalars().all()
+
+        if not lead_ids:
+            break
+
+        result["days_rolled_up"] += _roll_up_days(db, lead_ids, cutoff)
+        db.commit()
+        last_id = lead_ids[-1]
+
+    if result["records_compacted"] or result["days_rolled_up"]:
+        print(f"🗜️  Compacted {result['records_compacted']} policy health records, "
+              f"rolled {result['days_rolled_up']} daily points into weeks")
+
+    return result
+
+
+def health_trend(db, lead_id: int, since: date = None) -> list:
+    """
+    A lead's health score over time, oldest first: compacted weekly and daily
+    points from the history table, then the detailed records still kept.
+
+    Every point has granularity (week, day or record), period_start,
+    health_score (the mean for compacted points), min/max_score, samples,
+    churn_risk and churn_probability.
+    """
+    history = select(PolicyHealthHistory).where(PolicyHealthHistory.lead_id == lead_id)
+    records = select(
+        PolicyHealth.health_score, PolicyHealth.churn_risk, PolicyHealth.churn_probability, PolicyHealth.calculated_at
+    ).where(PolicyHealth.lead_id == lead_id)
+    if since:
+        # A week that starts before `since` but has samples from it on is kept
+        since_at = datetime.combine(since, datetime.min.time())
+        history = history.where(PolicyHealthHistory.last_calculated_at >= since_at)
+        records = records.where(PolicyHealth.calculated_at >= since_at)
+
+    points = []
+    for point in db.execute(history.order_by(PolicyHealthHistory.period_start.asc())).scalars():
+        point_dict = point.to_dict()
+        del point_dict["id"], point_dict["lead_id"], point_dict["last_calculated_at"]
+        points.append(point_dict)
+
+    for record in db.execute(records.order_by(PolicyHealth.calculated_at.asc(), PolicyHealth.id.asc())):
+        points.append({
+            "granularity": "record",
+            "period_start": record.calculated_at.isoformat() if record.calculated_at else None,
+            "health_score": record.health_score,
+            "min_score": record.health_score,
+            "max_score": record.health_score,
+            "samples": 1,
+            "churn_risk": record.churn_risk,
+            "churn_probability": record.churn_probability,
+        })
+
+    return points
+
+
+# Run the compaction on its own: python health_history.py (or python -m app.health_history)
+if __name__ == "__main__":
+    try:
+        from .database import SessionLocal
+    except ImportError:
+        from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        result = compact_policy_health(db)
+        print(f"✅ Policy health history compacted: {result}")
+    finally:
+        db.close()
@@ -0,0 +1,189 @@
+import os
+import math
+import threading
+from datetime import datetime
+from sqlalchemy import select
+
+try:
+    from .models import Touchpoint
+    from .followup_engine import INTENT_LEVELS, intent_level
+    from .shared_state import get_cache
+except ImportError:
+    from models import Touchpoint
+    from followup_engine import INTENT_LEVELS, intent_level
+    from shared_state import get_cache
+
+# How long computed trajectories are served from cache
+INTENT_ANALYTICS_TTL_SECONDS = int(os.getenv("INTENT_ANALYTICS_TTL_SECONDS", "300"))
+
+# A lead sitting in the same (non-lost) stage for this long counts as stalled
+STALL_DAYS = int(os.getenv("INTENT_STALL_DAYS", "14"))
+
+# Rows fetched per round trip while streaming the touchpoints table
+STREAM_BATCH_SIZE = 5000
+
+# Computed trajectories (shared across workers with STATE_BACKEND=sqlite)
+_cache = get_cache("intent_analytics")
+
+# One computation at a time per process
+_cache_lock = threading.Lock()
+
+
+def compute_intent_trajectories(db, now: datetime = None) -> dict:
+    """
+    Compute intent trajectory analytics across all leads in one pass over touchpoints.
+
+    Touchpoints with an intent are streamed ordered by (lead_id, created_at), so each
+    lead's history is contiguous and only one lead's running state is held at a time.
+    A "stage" is a run of consecutive touchpoints with the same intent.
+
+    Args:
+        db: Database session
+        now: Reference time for open stages (defaults to utcnow)
+
+    Returns:
+        Dict with columnar (list-per-field) transition matrix, time-in-stage
+        distributions and per-lead velocity
+    """
+    now = now or datetime.utcnow()
+
+    transitions = {}      # (from_intent, to_intent) -> count
+    stage_hours = {}      # intent -> [completed stage durations in hours]
+    open_stages = {}      # intent -> number of leads currently in it
+    stalled_stages = {}   # intent -> number of stalled leads in it
+
+    leads = {
+        "lead_id": [],
+        "touchpoints": [],
+        "transitions": [],
+        "first_intent": [],
+        "current_intent": [],
+        "current_level": [],
+        "days_in_current_stage": [],
+        "velocity_per_day": [],
+        "stalled": [],
+    }
+
+    stmt = (
+        select(Touchpoint.lead_id, Touchpoint.intent, Touchpoint.created_at)
+        .where(Touchpoint.intent.isnot(None))
+        .order_by(Touchpoint.lead_id, Touchpoint.created_at, Touchpoint.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+
+    state = None
+
+    def close_lead(s):
+        # Open stage runs until now
+        days_in_stage = (now - s["stage_start"]).total_seconds() / 86400
+        span_days = (s["last_at"] - s["first_at"]).total_seconds() / 86400
+        level_change = intent_level(s["intent"]) - intent_level(s["first_intent"])
+        stalled = days_in_stage >= STALL_DAYS and s["intent"] != "lost"
+
+        open_stages[s["intent"]] = open_stages.get(s["intent"], 0) + 1
+        if stalled:
+            stalled_stages[s["intent"]] = stalled_stages.get(s["intent"], 0) + 1
+
+        leads["lead_id"].append(s["lead_id"])
+        leads["touchpoints"].append(s["count"])
+        leads["transitions"].append(s["transitions"])
+        leads["first_intent"].append(s["first_intent"])
+        leads["current_intent"].append(s["intent"])
+        leads["current_level"].append(intent_level(s["intent"]))
+        leads["days_in_current_stage"].append(round(days_in_stage, 2))
+        leads["velocity_per_day"].append(round(level_change / span_days, 4) if span_days > 0 else None)
+        leads["stalled"].append(stalled)
+
+    for lead_id, intent, created_at in db.execute(stmt):
+        created_at = created_at or now
+
+        if state is None or state["lead_id"] != lead_id:
+            if state is not None:
+                close_lead(state)
+            state = {
+                "lead_id": lead_id,
+                "first_intent": intent,
+                "first_at": created_at,
+                "intent": intent,
+                "stage_start": created_at,
+                "last_at": created_at,
+                "count": 1,
+                "transitions": 0,
+            }
+            continue
+
+        state["count"] += 1
+        state["last_at"] = created_at
+
+        if intent != state["intent"]:
+            key = (state["intent"], intent)
+            transitions[key] = transitions.get(key, 0) + 1
+            hours = (created_at - state["stage_start"]).total_seconds() / 3600
+            stage_hours.setdefault(state["intent"], []).append(hours)
+            state["intent"] = intent
+            state["stage_start"] = created_at
+            state["transitions"] += 1
+
+    if state is not None:
+        close_lead(state)
+
+    # Known stages in funnel order, then any intents the model invented
+    seen = set(INTENT_LEVELS) | {i for pair in transitions for i in pair} | set(open_stages)
+    stages = sorted(seen, key=lambda i: (intent_level(i), i))
+
+    time_in_stage = {
+        "stage": stages,
+        "completed": [],
+        "mean_hours": [],
+        "p50_hours": [],
+        "p90_hours": [],
+        "max_hours": [],
+        "current_leads": [],
+        "stalled_leads": [],
+    }
+    for stage in stages:
+        durations = sorted(stage_hours.get(stage, []))
+        time_in_stage["completed"].append(len(durations))
+        time_in_stage["mean_hours"].append(round(sum(durations) / len(durations), 2) if durations else None)
+        time_in_stage["p50_hours"].append(_percentile(durations, 0.5))
+        time_in_stage["p90_hours"].append(_percentile(durations, 0.9))
+        time_in_stage["max_hours"].append(round(durations[-1], 2) if durations else None)
+        time_in_stage["current_leads"].append(open_stages.get(stage, 0))
+        time_in_stage["stalled_leads"].append(stalled_stages.get(stage, 0))
+
+    return {
+        "generated_at": now.isoformat(),
+        "lead_count": len(leads["lead_id"]),
+        "stall_days": STALL_DAYS,
+        "transition_matrix": {
+            "stages": stages,
+            "counts": [[transitions.get((src, dst), 0) for dst in stages] for src in stages],
+        },
+        "time_in_stage": time_in_stage,
+        "leads": leads,
+    }
+
+
+def get_intent_trajectories(db, refresh: bool = False) -> dict:
+    """
+    Cached wrapper around compute_intent_trajectories.
+
+    Results are reused for INTENT_ANALYTICS_TTL_SECONDS unless refresh is requested.
+    """
+    with _cache_lock:
+        cached = None if refresh else _cache.get("trajectories")
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        result = compute_intent_trajectories(db)
+        _cache.set("trajectories", result, INTENT_ANALYTICS_TTL_SECONDS)
+
+        return {**result, "cached": False}
+
+
+def _percentile(sorted_values: list, q: float):
+    """Nearest-rank percentile of an already sorted list (None if empty)"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return round(sorted_values[index], 2)
@@ -0,0 +1,297 @@
+import os
+import re
+from datetime import datetime
+from difflib import SequenceMatcher
+from sqlalchemy import select
+
+try:
+    from .models import Lead
+    from .lead_resolution import normalize_email, find_lead_by_email
+except ImportError:
+    from models import Lead
+    from lead_resolution import normalize_email, find_lead_by_email
+
+# Country code assumed for national-format numbers
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_PHONE_COUNTRY_CODE", "1")
+
+# Name similarity needed when the phone number matches. Households share
+# phones, so the match is also rejected when the emails or insurance types differ
+PHONE_NAME_THRESHOLD = 0.85
+
+# Name similarity needed for a fuzzy match without an exact email/phone match
+FUZZY_NAME_THRESHOLD = 0.92
+FUZZY_EMAIL_LOCAL_THRESHOLD = 0.8
+
+# Max candidates pulled from one name block
+CANDIDATE_LIMIT = 50
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def normalize_phone(phone: str, default_country_code: str = None) -> str:
+    """
+    Best-effort E.164 form of a phone number (+15551234567).
+
+    National numbers get the default country code; returns None if the input
+    doesn't contain a plausible number.
+    """
+    if not phone:
+        return None
+
+    digits = re.sub(r"\D", "", phone)
+    country_code = default_country_code or DEFAULT_COUNTRY_CODE
+
+    if phone.strip().startswith("+"):
+        pass
+    elif phone.strip().startswith("00"):
+        digits = digits[2:]
+    elif country_code == "1" and len(digits) == 11 and digits.startswith("1"):
+        pass
+    elif len(digits) == 10:
+        digits = country_code + digits
+
+    if not 8 <= len(digits) <= 15:
+        return None
+
+    return f"+{digits}"
+
+
+def normalize_name(name: str) -> str:
+    """Lower-cased name with punctuation removed and whitespace collapsed"""
+    if not name:
+        return ""
+    return " ".join(re.sub(r"[^\w\s]", " ", name.lower()).split())
+
+
+def soundex(word: str) -> str:
+    """American Soundex code (R163 for Robert/Rupert) - tolerant of small spelling differences"""
+    word = re.sub(r"[^a-z]", "", word.lower())
+    if not word:
+        return ""
+
+    code = word[0].upper()
+    previous = SOUNDEX_CODES.get(word[0], "")
+    for char in word[1:]:
+        digit = SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w don't separate letters with the same code
+        if char not in "hw":
+            previous = digit
+
+    return code.ljust(4, "0")
+
+
+def name_block_key(name: str) -> str:
+    """
+    Blocking key for fuzzy name matching: Soundex of the last name plus the first
+    initial ("D000|j" for Jane Doe). Only leads sharing a key are compared.
+    """
+    parts = normalize_name(name).split()
+    if not parts:
+        return None
+    return f"{soundex(parts[-1])}|{parts[0][0]}"
+
+
+def name_similarity(a: str, b: str) -> float:
+    """0-1 similarity of two names after normalization"""
+    a, b = normalize_name(a), normalize_name(b)
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def dedup_keys(lead_data: dict) -> dict:
+    """Lookup keys stored on a lead for duplicate detection"""
+    return {
+        "email_normalized": normalize_email(lead_data.get("email")),
+        "phone_normalized": normalize_phone(lead_data.get("phone")),
+        "name_key": name_block_key(lead_data.get("full_name")),
+    }
+
+
+def _email_domain(email_normalized: str) -> str:
+    return email_normalized.rpartition("@")[2] if email_normalized else ""
+
+
+def find_duplicate_lead(db, lead_data: dict):
+    """
+    Find an existing lead that this submission duplicates.
+
+    Checked most certain first, each with its own indexed lookup:
+    1. Normalized email - exact match on the unique index
+    2. E.164 phone - exact match, confirmed by name similarity, with the same
+       insurance type and no conflicting email (family members share phones)
+    3. Name block (Soundex of last name + first initial) with the same insurance
+       type and email domain - a similarity pass that also requires a
+       near-identical email local part and no conflicting phone number
+
+    The exact lookups are not limited, so a large name block can never hide an
+    existing email (which would otherwise fail on the unique index at insert).
+
+    Returns:
+        (lead, reason, score) or None
+    """
+    full_name = lead_data.get("full_name")
+    keys = dedup_keys(lead_data)
+
+    lead = find_lead_by_email(db, lead_data.get("email"))
+    if lead:
+        return lead, "email", 1.0
+
+    matcher = _name_matcher(full_name)
+
+    if keys["phone_normalized"]:
+        best = None
+        for candidate in db.execute(
+            select(Lead.id, Lead.full_name, Lead.email_normalized, Lead.insurance_type)
+            .where(Lead.phone_normalized == keys["phone_normalized"])
+        ):
+            if candidate.insurance_type != lead_data.get("insurance_type"):
+                continue
+            if keys["email_normalized"] and candidate.email_normalized and candidate.email_normalized != keys["email_normalized"]:
+                continue
+            score = _score_name(matcher, candidate.full_name)
+            if best is None or score > best[1]:
+                best = (candidate.id, score)
+        if best and best[1] >= PHONE_NAME_THRESHOLD:
+            return db.get(Lead, best[0]), "phone", best[1]
+
+    # A fuzzy match needs an email to compare and the same domain (different
+    # people share names, and a near-identical local part on another domain is
+    # someone else)
+    domain = _email_domain(keys["email_normalized"])
+    if not keys["name_key"] or not domain:
+        return None
+
+    candidates = db.execute(
+        select(Lead.id, Lead.full_name, Lead.email_normalized, Lead.phone_normalized)
+        .where(
+            Lead.name_key == keys["name_key"],
+            Lead.insurance_type == lead_data.get("insurance_type"),
+            Lead.email_normalized.like(f"%@{domain}")
+        )
+        .order_by(Lead.id.asc())
+        .limit(CANDIDATE_LIMIT)
+    ).all()
+
+    local_part = keys["email_normalized"].rpartition("@")[0]
+    for candidate in candidates:
+        if _email_domain(candidate.email_normalized) != domain:  # LIKE treats "_" as a wildcard
+            continue
+        if keys["phone_normalized"] and candidate.phone_normalized and candidate.phone_normalized != keys["phone_normalized"]:
+            continue
+        score = _score_name(matcher, candidate.full_name, FUZZY_NAME_THRESHOLD)
+        if score < FUZZY_NAME_THRESHOLD:
+            continue
+        candidate_local = candidate.email_normalized.rpartition("@")[0]
+        if SequenceMatcher(None, local_part, candidate_local).ratio() >= FUZZY_EMAIL_LOCAL_THRESHOLD:
+            return db.get(Lead, candidate.id), "fuzzy_name", score
+
+    return None
+
+
+# Fields of a duplicate-submission response that come from the submission, not
+# the matched lead (a fuzzy match must not reveal someone else's contact details
+# or the messages sent to them)
+SUBMITTED_FIELDS = ("full_name", "email", "phone")
+PRIVATE_FIELDS = ("sms_content", "email_subject", "email_content")
+
+
+def duplicate_response(lead, lead_data: dict) -> dict:
+    """The matched lead as returned to the submitter of a repeat submission"""
+    response = lead.to_dict()
+    for field in SUBMITTED_FIELDS:
+        response[field] = lead_data.get(field)
+    for field in PRIVATE_FIELDS:
+        response[field] = None
+    return response
+
+
+def merge_lead_submission(lead, lead_data: dict):
+    """
+    Fold a repeat submission into the existing lead.
+
+    Only fills fields the lead is missing - enrichment and outreach history
+    are kept as they are.
+    """
+    if lead_data.get("current_provider") and not lead.current_provider:
+        lead.current_provider = lead_data["current_provider"]
+
+    if lead_data.get("phone") and not lead.phone_normalized:
+        phone_normalized = normalize_phone(lead_data["phone"])
+        if phone_normalized:
+            lead.phone = lead_data["phone"]
+            lead.phone_normalized = phone_normalized
+
+    lead.submission_count = (lead.submission_count or 1) + 1
+    lead.last_submitted_at = datetime.utcnow()
+
+
+def backfill_dedup_keys(db, batch_size: int = 5000) -> int:
+    """
+    Fill phone_normalized and name_key for leads created before dedup existed.
+
+    Returns:
+        Number of leads updated
+    """
+    updated = 0
+    last_id = 0
+
+    while True:
+        rows = db.query(Lead.id, Lead.phone, Lead.full_name).filter(
+            Lead.id > last_id,
+            Lead.name_key.is_(None)
+        ).order_by(Lead.id.asc()).limit(batch_size).all()
+
+        if not rows:
+            break
+
+        db.bulk_update_mappings(Lead, [
+            {
+                "id": lead_id,
+                "phone_normalized": normalize_phone(phone),
+                "name_key": name_block_key(full_name) or "",
+            }
+            for lead_id, phone, full_name in rows
+        ])
+        db.commit()
+
+        updated += len(rows)
+        last_id = rows[-1][0]
+
+    if updated:
+        print(f"🛠️  Backfilled dedup keys for {updated} leads")
+
+    return updated
+
+
+def _name_matcher(full_name: str) -> SequenceMatcher:
+    """SequenceMatcher with the incoming name as seq2 (difflib caches its analysis across candidates)"""
+    matcher = SequenceMatcher(None)
+    matcher.set_seq2(normalize_name(full_name))
+    return matcher
+
+
+def _score_name(matcher: SequenceMatcher, candidate_name: str, threshold: float = 0.0) -> float:
+    """
+    Similarity of a candidate name to the matcher's name.
+    The cheap upper bounds skip the full ratio() for candidates that can't reach threshold.
+    """
+    candidate = normalize_name(candidate_name)
+    if not candidate or not matcher.b:
+        return 0.0
+
+    matcher.set_seq1(candidate)
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        return 0.0
+    return matcher.ratio()
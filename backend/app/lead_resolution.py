@@ -0,0 +1,167 @@
+import os
+from sqlalchemy import or_
+
+try:
+    from .models import Lead
+except ImportError:
+    from models import Lead
+
+# Treat jane+quotes@example.com as jane@example.com. Stored addresses are
+# re-normalized at startup when this changes (renormalize_emails)
+EMAIL_STRIP_PLUS_TAGS = os.getenv("EMAIL_STRIP_PLUS_TAGS", "false").lower() == "true"
+
+# Max values per IN (...) probe - keeps under SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+def normalize_email(email: str, strip_plus_tags: bool = None) -> str:
+    """
+    Canonical form of an email address for lookups: trimmed, lower-cased and
+    (optionally) with any +tag removed from the local part.
+
+    Returns None for empty input.
+    """
+    if not email:
+        return None
+
+    email = email.strip().lower()
+    if not email:
+        return None
+
+    if strip_plus_tags is None:
+        strip_plus_tags = EMAIL_STRIP_PLUS_TAGS
+
+    if strip_plus_tags and "@" in email:
+        local, _, domain = email.rpartition("@")
+        local = local.split("+", 1)[0]
+        email = f"{local}@{domain}"
+
+    return email
+
+
+def find_lead_by_email(db, email: str):
+    """
+    Resolve a lead from any form of its email address (one probe on the unique
+    email_normalized index). Returns None if no lead owns the address.
+    """
+    normalized = normalize_email(email)
+    if not normalized:
+        return None
+
+    return db.query(Lead).filter(Lead.email_normalized == normalized).first()
+
+
+def find_leads_by_emails(db, emails) -> dict:
+    """
+    Resolve many emails at once.
+
+    Returns:
+        Dict of normalized email -> Lead for the addresses that matched
+    """
+    normalized = sorted({n for n in (normalize_email(e) for e in emails) if n})
+
+    leads = {}
+    for start in range(0, len(normalized), LOOKUP_CHUNK_SIZE):
+        chunk = normalized[start:start + LOOKUP_CHUNK_SIZE]
+        for lead in db.query(Lead).filter(Lead.email_normalized.in_(chunk)).all():
+            leads[lead.email_normalized] = lead
+
+    return leads
+
+
+def backfill_normalized_emails(db) -> int:
+    """
+    Fill email_normalized for leads that have none (created before the column
+    existed, or released by renormalize_emails).
+
+    When several leads share an address, the oldest one owns it; the others
+    keep NULL and record the owner in email_duplicate_of, so the unique index
+    holds and they aren't scanned again.
+
+    Returns:
+        Number of leads updated
+    """
+    rows = db.query(Lead.id, Lead.email).filter(
+        Lead.email_normalized.is_(None),
+        Lead.email_duplicate_of.is_(None)
+    ).order_by(Lead.id.asc()).all()
+
+    if not rows:
+        return 0
+
+    candidates = {}
+    duplicates = []
+    for lead_id, email in rows:
+        normalized = normalize_email(email)
+        if not normalized:
+            continue
+        if normalized in candidates:
+            duplicates.append((lead_id, normalized))
+        else:
+            candidates[normalized] = lead_id
+
+    owners = {normalized: lead.id for normalized, lead in find_leads_by_emails(db, candidates.keys()).items()}
+
+    updated = 0
+    for normalized, lead_id in candidates.items():
+        if normalized in owners:
+            duplicates.append((lead_id, normalized))
+            continue
+        db.query(Lead).filter(Lead.id == lead_id).update(
+            {"email_normalized": normalized}, synchronize_session=False
+        )
+        owners[normalized] = lead_id
+        updated += 1
+
+    for lead_id, normalized in duplicates:
+        db.query(Lead).filter(Lead.id == lead_id).update(
+            {"email_duplicate_of": owners[normalized]}, synchronize_session=False
+        )
+
+    db.commit()
+
+    if updated or duplicates:
+        print(f"🛠️  Backfilled normalized email for {updated} leads ({len(duplicates)} share an address with an older lead)")
+
+    return updated
+
+
+def renormalize_emails(db) -> int:
+    """
+    Bring stored normalized emails in line with the current rule (after
+    EMAIL_STRIP_PLUS_TAGS changed).
+
+    Only +tagged addresses depend on the rule. Rows whose stored value is stale
+    are released (email_normalized and email_duplicate_of cleared) for
+    backfill_normalized_emails to assign again, oldest first.
+
+    Returns:
+        Number of leads released
+    """
+    rows = db.query(Lead.id, Lead.email, Lead.email_normalized, Lead.email_duplicate_of).filter(
+        Lead.email.contains("+")
+    ).all()
+    if not rows:
+        return 0
+
+    owner_ids = {row.email_duplicate_of for row in rows if row.email_duplicate_of}
+    owned = dict(db.query(Lead.id, Lead.email_normalized).filter(Lead.id.in_(owner_ids)).all()) if owner_ids else {}
+
+    stale = []
+    for lead_id, email, normalized, duplicate_of in rows:
+        current = owned.get(duplicate_of) if duplicate_of else normalized
+        if current != normalize_email(email):
+            stale.append(lead_id)
+
+    for start in range(0, len(stale), LOOKUP_CHUNK_SIZE):
+        chunk = stale[start:start + LOOKUP_CHUNK_SIZE]
+        # Leads whose address a released lead owned are re-assigned with it
+        db.query(Lead).filter(or_(Lead.id.in_(chunk), Lead.email_duplicate_of.in_(chunk))).update(
+            {"email_normalized": None, "email_duplicate_of": None}, synchronize_session=False
+        )
+    db.commit()
+
+    if stale:
+        print(f"🛠️  Released {len(stale)} normalized emails for re-normalization")
+
+    return len(stale)
@@ -1,37 +1,62 @@
-import os
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from typing import List, Optional
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel, EmailStr
-from dotenv import load_dotenv
 
 # Import local modules
 try:
-    from .database import get_db, init_db
-    from .models import Lead, Touchpoint, FollowUpAction, LifeEvent, PolicyHealth, Occasion
+    from .settings import DEMO_MODE, AUTO_MIGRATE, STARTUP_MAINTENANCE, CALENDLY_LINK
+    from .database import get_db, init_db, SessionLocal, engine
+    from .models import Lead, Touchpoint, FollowUpAction, LifeEvent, PolicyHealth, Occasion, Campaign, LEAD_360_LOADERS
     from .enrichment import enrich_lead
     from .ai_engine import generate_personalized_sms, generate_personalized_email
-    from .communications import send_sms, send_email
-    from .followup_engine import analyze_touchpoint, generate_followup_actions, detect_intent_shift
+    from .communications import send_sms, send_email, dispatch_followup_action, dispatch_followup_actions
+    from .followup_engine import analyze_touchpoint, generate_followup_actions, detect_intent_shift_from_state, intent_level
     from .retention_engine import calculate_policy_health_score, analyze_life_event, generate_retention_action, process_customer_response
     from .occasions_engine import detect_occasions, generate_occasion_message, analyze_usage_patterns, generate_occasion_action
+    from .intent_analytics import get_intent_trajectories
+    from .followup_scheduler import scheduler as followup_scheduler, SCHEDULER_ENABLED, claim_actions, dispatch_succeeded
+    from .webhook_inbox import record_webhook_event, drain_calendly_inbox
+    from .lead_resolution import backfill_normalized_emails, renormalize_emails
+    from .lead_dedup import find_duplicate_lead, merge_lead_submission, duplicate_response, dedup_keys, backfill_dedup_keys
+    from .occasion_worklist import get_occasion_worklist, backfill_occasion_dates, OCCASION_TYPES
+    from .engagement_calendar import roll_forward, advance_engagements_daily, backfill_engagement_schedule
+    from .retention_worklist import retention_worklist, backfill_latest_health, WORKLIST_SORTS, CHURN_RISKS, PRIORITIES
+    from .health_history import compact_policy_health, health_trend
+    from .campaign_runner import run_campaign, recalculate_campaign_health, pause_interrupted_campaigns, RUNNABLE_STATUSES
+    from .campaign_runner import campaign_run_lease, campaign_health_lease, lease_seconds, CAMPAIGN_BATCH_SIZE, CAMPAIGN_LEASE_SECONDS
+    from .metrics import MetricsMiddleware, instrument_engine, render_metrics, METRICS_ENABLED, CONTENT_TYPE as METRICS_CONTENT_TYPE
+    from .query_accounting import QueryAccountingMiddleware, instrument_queries
+    from .serialization import FastJSONResponse, lead_list, life_event_list, occasion_list
+    from .shared_state import purge_expired_cache, SHARED as SHARED_STATE
 except ImportError:
-    from database import get_db, init_db
-    from models import Lead, Touchpoint, FollowUpAction, LifeEvent, PolicyHealth, Occasion
+    from settings import DEMO_MODE, AUTO_MIGRATE, STARTUP_MAINTENANCE, CALENDLY_LINK
+    from database import get_db, init_db, SessionLocal, engine
+    from models import Lead, Touchpoint, FollowUpAction, LifeEvent, PolicyHealth, Occasion, Campaign, LEAD_360_LOADERS
     from enrichment import enrich_lead
     from ai_engine import generate_personalized_sms, generate_personalized_email
-    from communications import send_sms, send_email
-    from followup_engine import analyze_touchpoint, generate_followup_actions, detect_intent_shift
+    from communications import send_sms, send_email, dispatch_followup_action, dispatch_followup_actions
+    from followup_engine import analyze_touchpoint, generate_followup_actions, detect_intent_shift_from_state, intent_level
     from retention_engine import calculate_policy_health_score, analyze_life_event, generate_retention_action, process_customer_response
     from occasions_engine import detect_occasions, generate_occasion_message, analyze_usage_patterns, generate_occasion_action
-
-# Load environment variables
-load_dotenv()
-
-# Initialize database
-init_db()
+    from intent_analytics import get_intent_trajectories
+    from followup_scheduler import scheduler as followup_scheduler, SCHEDULER_ENABLED, claim_actions, dispatch_succeeded
+    from webhook_inbox import record_webhook_event, drain_calendly_inbox
+    from lead_resolution import backfill_normalized_emails, renormalize_emails
+    from lead_dedup import find_duplicate_lead, merge_lead_submission, duplicate_response, dedup_keys, backfill_dedup_keys
+    from occasion_worklist import get_occasion_worklist, backfill_occasion_dates, OCCASION_TYPES
+    from engagement_calendar import roll_forward, advance_engagements_daily, backfill_engagement_schedule
+    from retention_worklist import retention_worklist, backfill_latest_health, WORKLIST_SORTS, CHURN_RISKS, PRIORITIES
+    from health_history import compact_policy_health, health_trend
+    from campaign_runner import run_campaign, recalculate_campaign_health, pause_interrupted_campaigns, RUNNABLE_STATUSES
+    from campaign_runner import campaign_run_lease, campaign_health_lease, lease_seconds, CAMPAIGN_BATCH_SIZE, CAMPAIGN_LEASE_SECONDS
+    from metrics import MetricsMiddleware, instrument_engine, render_metrics, METRICS_ENABLED, CONTENT_TYPE as METRICS_CONTENT_TYPE
+    from query_accounting import QueryAccountingMiddleware, instrument_queries
+    from serialization import FastJSONResponse, lead_list, life_event_list, occasion_list
+    from shared_state import purge_expired_cache, SHARED as SHARED_STATE
 
 # Create FastAPI app
 app = FastAPI(
@@ -49,6 +74,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route and per-dependency latency metrics, served on /metrics
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
+# Per-request query count and DB time (headers with QUERY_DEBUG=true) and the slow-query log
+app.add_middleware(QueryAccountingMiddleware)
+instrument_queries(engine)
+
+def run_startup_maintenance():
+    """
+    Backfill lookup keys, roll engagements forward, pause campaigns interrupted by
+    the last shutdown, apply webhook events left over from the last run and
+    clear expired entries out of the shared cache.
+
+    Runs once per deployment: in the app's startup for a single process, or in
+    serve.py / gunicorn.conf.py before workers start (a worker restarting later
+    must not pause a campaign another worker is running).
+    """
+    db = SessionLocal()
+    try:
+        renormalize_emails(db)
+        backfill_normalized_emails(db)
+        backfill_dedup_keys(db)
+        backfill_occasion_dates(db)
+        backfill_engagement_schedule(db)
+        backfill_latest_health(db)
+        compact_policy_health(db)
+        advance_engagements_daily(db)
+        pause_interrupted_campaigns(db)
+    finally:
+        db.close()
+    
+    drain_calendly_inbox()
+    
+    if SHARED_STATE:
+        purge_expired_cache()
+
+
+@app.on_event("startup")
+def start_background_workers():
+    """Create/upgrade tables, run startup maintenance and start the follow-up scheduler"""
+    if AUTO_MIGRATE:
+        init_db()
+    
+    if STARTUP_MAINTENANCE:
+        run_startup_maintenance()
+    
+    if SCHEDULER_ENABLED:
+        followup_scheduler.rehydrate()
+        followup_scheduler.start()
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    """Stop the follow-up scheduler"""
+    if SCHEDULER_ENABLED:
+        followup_scheduler.stop()
+
+
 # Pydantic models for request/response
 class LeadCreate(BaseModel):
     full_name: str
@@ -69,6 +153,7 @@ class LeadResponse(BaseModel):
     pain_points: Optional[list]
     estimated_savings: Optional[int]
     renewal_date: Optional[str]
+    profile: Optional[dict] = None
     sms_sent: bool
     sms_sent_at: Optional[str]
     sms_content: Optional[str]
@@ -102,10 +187,30 @@ def root():
         "status": "online",
         "service": "Solisa AI SDR API",
         "version": "1.0.0",
-        "demo_mode": os.getenv("DEMO_MODE", "true").lower() == "true"
+        "demo_mode": DEMO_MODE
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Request and dependency latency metrics in the Prometheus text format"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=false)")
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+def _merge_duplicate_submission(db: Session, duplicate: tuple, lead_dict: dict) -> dict:
+    """Fold a repeat submission into the lead it matched and build the response"""
+    existing_lead, reason, score = duplicate
+    merge_lead_submission(existing_lead, lead_dict)
+    db.commit()
+    db.refresh(existing_lead)
+    
+    print(f"🔁 Duplicate submission for lead {existing_lead.id} (matched by {reason}, score {score:.2f}) - skipping outreach")
+    
+    return duplicate_response(existing_lead, lead_dict)
+
+
 @app.post("/api/leads", response_model=LeadResponse)
 def create_lead(lead_data: LeadCreate, db: Session = Depends(get_db)):
     """
@@ -114,11 +219,17 @@ def create_lead(lead_data: LeadCreate, db: Session = Depends(get_db)):
     # Convert to dict for enrichment
     lead_dict = lead_data.model_dump()
     
+    # Repeat submissions are merged into the existing lead - no new outreach
+    duplicate = find_duplicate_lead(db, lead_dict)
+    if duplicate:
+        return _merge_duplicate_submission(db, duplicate, lead_dict)
+    
     # Enrich lead data
     enriched_data = enrich_lead(lead_dict)
     
     # Create lead in database
     new_lead = Lead(
+        **dedup_keys(enriched_data),
         full_name=enriched_data["full_name"],
         email=enriched_data["email"],
         phone=enriched_data["phone"],
@@ -129,12 +240,22 @@ def create_lead(lead_data: LeadCreate, db: Session = Depends(get_db)):
         pain_points=enriched_data["pain_points"],
         estimated_savings=enriched_data["estimated_savings"],
         renewal_date=enriched_data["renewal_date"],
-        calendly_link=os.getenv("CALENDLY_LINK", "https://calendly.com/solisa-demo/30min"),
+        renewal_on=enriched_data.get("renewal_on"),
+        profile=enriched_data.get("profile"),
+        calendly_link=CALENDLY_LINK,
         status="enriched"
     )
     
     db.add(new_lead)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent submission of the same lead committed first
+        db.rollback()
+        duplicate = find_duplicate_lead(db, lead_dict)
+        if not duplicate:
+            raise
+        return _merge_duplicate_submission(db, duplicate, lead_dict)
     db.refresh(new_lead)
     
     # Generate personalized messages
@@ -169,13 +290,14 @@ def create_lead(lead_data: LeadCreate, db: Session = Depends(get_db)):
     return new_lead.to_dict()
 
 
-@app.get("/api/leads", response_model=List[LeadResponse])
+@app.get("/api/leads", response_model=List[LeadResponse], response_class=FastJSONResponse)
 def get_leads(db: Session = Depends(get_db)):
     """
     Get all leads, ordered by created_at descending.
+    Rows are selected and encoded directly (see serialization.py) - the
+    response model documents the shape.
     """
-    leads = db.query(Lead).order_by(Lead.created_at.desc()).all()
-    return [lead.to_dict() for lead in leads]
+    return FastJSONResponse(lead_list(db))
 
 
 @app.get("/api/leads/{lead_id}", response_model=LeadResponse)
@@ -189,6 +311,29 @@ def get_lead(lead_id: int, db: Session = Depends(get_db)):
     return lead.to_dict()
 
 
+@app.get("/api/leads/{lead_id}/360")
+def get_lead_360(lead_id: int, db: Session = Depends(get_db)):
+    """
+    A lead with all its activity - touchpoints, follow-up actions, life events,
+    occasions and policy health history, newest first - in six queries.
+    """
+    lead = db.query(Lead).options(*LEAD_360_LOADERS).filter(Lead.id == lead_id).first()
+    if not lead:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    
+    policy_health_history = [h.to_dict() for h in lead.policy_health_records]
+    
+    return {
+        "lead": lead.to_dict(),
+        "touchpoints": [t.to_dict() for t in lead.touchpoints],
+        "actions": [a.to_dict() for a in lead.followup_actions],
+        "life_events": [e.to_dict() for e in lead.life_events],
+        "occasions": [o.to_dict() for o in lead.occasions],
+        "policy_health": policy_health_history[0] if policy_health_history else None,
+        "policy_health_history": policy_health_history
+    }
+
+
 @app.post("/api/leads/{lead_id}/book")
 def book_meeting(lead_id: int, db: Session = Depends(get_db)):
     """
@@ -235,7 +380,7 @@ def get_stats(db: Session = Depends(get_db)):
 
 
 @app.post("/api/webhooks/calendly")
-async def calendly_webhook(request: dict, db: Session = Depends(get_db)):
+def calendly_webhook(request: dict, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Calendly webhook endpoint - automatically marks leads as booked when they schedule via Calendly.
     
@@ -243,73 +388,24 @@ async def calendly_webhook(request: dict, db: Session = Depends(get_db)):
     - invitee.created (someone books a meeting)
     - invitee.canceled (someone cancels)
     
-    Webhook payload includes invitee email which we use to find the lead.
+    Deliveries are appended to the webhook inbox and acknowledged immediately;
+    the inbox consumer then applies them in batches, matching leads by invitee email.
+    Redeliveries of the same event are recognized and not applied twice.
     """
     try:
-        # Extract event type
-        event_type = request.get("event")
-        
-        # Handle invitee.created (booking confirmed)
-        if event_type == "invitee.created":
-            payload = request.get("payload", {})
-            invitee_email = payload.get("email")
-            invitee_name = payload.get("name")
-            event_start_time = payload.get("scheduled_event", {}).get("start_time")
-            
-            if not invitee_email:
-                return {"status": "error", "message": "No email in webhook payload"}
-            
-            # Find lead by email
-            lead = db.query(Lead).filter(Lead.email == invitee_email).first()
-            
-            if lead:
-                # Mark as booked
-                lead.booking_confirmed = True
-                lead.booking_confirmed_at = datetime.utcnow()
-                lead.status = "booked"
-                db.commit()
-                
-                print(f"✅ Calendly Webhook: Lead {lead.full_name} ({invitee_email}) booked meeting!")
-                print(f"   Event Time: {event_start_time}")
-                
-                return {
-                    "status": "success",
-                    "message": f"Lead {lead.full_name} marked as booked",
-                    "lead_id": lead.id
-                }
-            else:
-                # Lead not found - might be a new prospect
-                print(f"⚠️  Calendly Webhook: No lead found for {invitee_email}")
-                return {
-                    "status": "warning",
-                    "message": f"No lead found for email {invitee_email}"
-                }
-        
-        # Handle invitee.canceled (booking canceled)
-        elif event_type == "invitee.canceled":
-            payload = request.get("payload", {})
-            invitee_email = payload.get("email")
-            
-            if invitee_email:
-                lead = db.query(Lead).filter(Lead.email == invitee_email).first()
-                if lead:
-                    lead.booking_confirmed = False
-                    lead.booking_confirmed_at = None
-                    lead.status = "contacted"
-                    db.commit()
-                    
-                    print(f"❌ Calendly Webhook: Lead {lead.full_name} canceled meeting")
-                    
-                    return {
-                        "status": "success",
-                        "message": f"Lead {lead.full_name} booking canceled"
-                    }
-        
-        return {"status": "received", "event": event_type}
-        
+        event, duplicate = record_webhook_event(db, "calendly", request)
     except Exception as e:
-        print(f"❌ Error processing Calendly webhook: {e}")
+        print(f"❌ Error recording Calendly webhook: {e}")
         return {"status": "error", "message": str(e)}
+    
+    background_tasks.add_task(drain_calendly_inbox)
+    
+    return {
+        "status": "received",
+        "event": request.get("event"),
+        "event_id": event.id,
+        "duplicate": duplicate
+    }
 
 
 # ============================================================
@@ -346,13 +442,15 @@ def add_touchpoint(lead_id: int, touchpoint_data: TouchpointCreate, db: Session
     
     print(f"\n📝 New {touchpoint_data.type} touchpoint added for {lead.full_name}")
     
-    # Get previous touchpoints for intent shift detection
-    previous_touchpoints = db.query(Touchpoint).filter(
-        Touchpoint.lead_id == lead_id,
-        Touchpoint.id != touchpoint.id
-    ).order_by(Touchpoint.created_at.asc()).all()
-    
-    previous_touchpoints_dicts = [tp.to_dict() for tp in previous_touchpoints]
+    # Previous intent for shift detection comes from the lead's maintained state.
+    # Leads created before that state existed fall back to one indexed probe.
+    previous_intent = lead.last_intent
+    if previous_intent is None:
+        previous_intent = db.query(Touchpoint.intent).filter(
+            Touchpoint.lead_id == lead_id,
+            Touchpoint.id != touchpoint.id,
+            Touchpoint.intent.isnot(None)
+        ).order_by(Touchpoint.created_at.desc(), Touchpoint.id.desc()).limit(1).scalar()
     
     # Analyze touchpoint with AI
     lead_dict = lead.to_dict()
@@ -364,13 +462,20 @@ def add_touchpoint(lead_id: int, touchpoint_data: TouchpointCreate, db: Session
     touchpoint.objections = analysis.get("objections", [])
     touchpoint.key_points = analysis.get("key_points", [])
     touchpoint.urgency = analysis.get("urgency")
+    
+    # Keep the lead's last known intent current
+    if analysis.get("intent"):
+        lead.last_intent = analysis.get("intent")
+        lead.last_intent_level = intent_level(lead.last_intent)
+        lead.last_intent_at = touchpoint.created_at
+    
     db.commit()
     db.refresh(touchpoint)
     
     print(f"🤖 AI Analysis: {analysis.get('intent')} - {len(analysis.get('objections', []))} objections")
     
     # Detect intent shift
-    intent_shift = detect_intent_shift(previous_touchpoints_dicts, analysis.get('intent'))
+    intent_shift = detect_intent_shift_from_state(previous_intent, analysis.get('intent'))
     
     if intent_shift.get('shift_detected'):
         print(f"🔄 {intent_shift.get('message')}")
@@ -396,6 +501,11 @@ def add_touchpoint(lead_id: int, touchpoint_data: TouchpointCreate, db: Session
     
     db.commit()
     
+    # Hand automated sends to the scheduler according to their timing
+    if SCHEDULER_ENABLED:
+        for action in actions:
+            followup_scheduler.schedule_action(action)
+    
     print(f"✅ Generated {len(actions)} follow-up actions")
     
     return {
@@ -440,6 +550,15 @@ def get_followup_actions(lead_id: int, db: Session = Depends(get_db)):
     }
 
 
+@app.get("/api/analytics/intent-trajectories")
+def get_intent_trajectory_analytics(refresh: bool = False, db: Session = Depends(get_db)):
+    """
+    Intent transition matrix, time-in-stage distributions and per-lead velocity
+    across all leads (columnar, cached - pass refresh=true to recompute)
+    """
+    return get_intent_trajectories(db, refresh=refresh)
+
+
 @app.post("/api/followup/{action_id}/execute")
 def execute_followup(action_id: int, db: Session = Depends(get_db)):
     """
@@ -449,51 +568,164 @@ def execute_followup(action_id: int, db: Session = Depends(get_db)):
     if not action:
         raise HTTPException(status_code=404, detail="Action not found")
     
-    lead = db.query(Lead).filter(Lead.id == action.lead_id).first()
+    # Claimed like the scheduler does, so the action is sent once
+    if not claim_actions(db, [action_id]):
+        db.refresh(action)
+        raise HTTPException(status_code=409, detail=f"Action is {action.status}, not pending")
+    db.refresh(action)
     
-    result = None
+    lead = db.query(Lead).filter(Lead.id == action.lead_id).first()
+    if not lead:
+        # Release the claim - nothing was sent
+        action.status = "pending"
+        action.claimed_at = None
+        db.commit()
+        raise HTTPException(status_code=404, detail="Lead not found")
     
     print(f"\n🚀 Executing {action.action_type} action for {lead.full_name}")
     
-    if action.action_type == "sms":
-        result = send_sms(lead.phone, action.content)
+    result = dispatch_followup_action(
+        action.action_type,
+        action.content,
+        {"phone": lead.phone, "email": lead.email, "insurance_type": lead.insurance_type},
+        action.reasoning
+    )
+    
+    if dispatch_succeeded(result):
+        action.status = "completed"
+        action.completed_at = datetime.utcnow()
+        print(f"✅ Action executed successfully")
+    else:
+        action.status = "failed"
+        print(f"❌ Action failed: {result.get('error')}")
+    db.commit()
     
-    elif action.action_type == "email":
-        # Extract subject from content (first line or generate one)
-        lines = action.content.split('\n')
-        
-        # Check if first line has "Subject:" prefix
-        if lines[0].lower().startswith("subject:"):
-            subject = lines[0].replace("Subject:", "").replace("subject:", "").strip()
-            body = '\n'.join(lines[1:]).strip()
-        else:
-            # If no subject line, use a default and treat all content as body
-            subject = f"Follow-up: {lead.insurance_type} Insurance Quote"
-            body = action.content.strip()
-        
-        result = send_email(lead.email, subject, body)
+    return {
+        "action": action.to_dict(),
+        "result": result
+    }
+
+
+class BulkExecuteRequest(BaseModel):
+    action_ids: Optional[List[int]] = None  # explicit actions, or filter with the fields below
+    status: Optional[str] = "pending"  # only pending actions can be executed
+    priority: Optional[str] = None  # high, medium, low
+    action_types: Optional[List[str]] = None  # sms, email, call, escalate
+    lead_id: Optional[int] = None
+    limit: int = 500
+
+
+@app.post("/api/followup/execute-bulk")
+def execute_followups_bulk(request: BulkExecuteRequest, db: Session = Depends(get_db)):
+    """
+    Execute many pending follow-up actions at once, either by ID or by filter
+    (e.g. all pending high-priority actions).
     
-    elif action.action_type == "call":
-        # For call scripts, just mark as ready
-        result = {"status": "script_ready", "message": "Call script prepared"}
+    Actions are claimed first (pending -> in_progress, as the scheduler does),
+    so only actions still pending are sent, and each only once. Claimed actions
+    and their leads are loaded in two queries, sends run concurrently, and all
+    status updates are committed in one transaction.
+    """
+    if request.status not in (None, "pending"):
+        raise HTTPException(status_code=400, detail="Only pending actions can be executed")
     
-    elif action.action_type == "escalate":
-        # Create escalation record
-        result = {"escalated": True, "to": "human_agent", "reason": action.reasoning}
+    query = db.query(FollowUpAction.id)
+    if request.action_ids is not None:
+        query = query.filter(FollowUpAction.id.in_(request.action_ids))
+    else:
+        query = query.filter(FollowUpAction.status == "pending")
+        if request.priority:
+            query = query.filter(FollowUpAction.priority == request.priority)
+        if request.action_types:
+            query = query.filter(FollowUpAction.action_type.in_(request.action_types))
+        if request.lead_id is not None:
+            query = query.filter(FollowUpAction.lead_id == request.lead_id)
+        query = query.order_by(FollowUpAction.created_at.asc()).limit(request.limit)
+    
+    found = [action_id for (action_id,) in query.all()]
+    claimed = claim_actions(db, found)
+    
+    results = {}
+    unclaimed = set(found) - set(claimed)
+    if unclaimed:
+        rejected = db.query(FollowUpAction.id, FollowUpAction.status).filter(FollowUpAction.id.in_(unclaimed)).all()
+        for action_id, current in rejected:
+            results[action_id] = {"action_id": action_id, "success": False, "error": f"Action is {current}, not pending"}
+    
+    actions = db.query(FollowUpAction).filter(FollowUpAction.id.in_(claimed)).all()
+    leads = {
+        lead.id: lead
+        for lead in db.query(Lead).filter(Lead.id.in_({a.lead_id for a in actions})).all()
+    }
+    
+    runnable = []
+    for action in actions:
+        if action.lead_id not in leads:
+            action.status = "skipped"
+            results[action.id] = {"action_id": action.id, "success": False, "error": "Lead not found"}
+            continue
+        runnable.append(action)
+    
+    print(f"\n🚀 Bulk executing {len(runnable)} follow-up actions")
+    
+    dispatch_results = dispatch_followup_actions([
+        {
+            "action_type": action.action_type,
+            "content": action.content,
+            "lead_data": {
+                "phone": leads[action.lead_id].phone,
+                "email": leads[action.lead_id].email,
+                "insurance_type": leads[action.lead_id].insurance_type
+            },
+            "reasoning": action.reasoning
+        }
+        for action in runnable
+    ])
+    
+    completed_at = datetime.utcnow()
+    for action, result in zip(runnable, dispatch_results):
+        success = dispatch_succeeded(result)
+        if success:
+            action.status = "completed"
+            action.completed_at = completed_at
+        else:
+            action.status = "failed"
+        results[action.id] = {
+            "action_id": action.id,
+            "success": success,
+            "action": action.to_dict(),
+            "result": result
+        }
     
-    # Mark action as completed
-    action.status = "completed"
-    action.completed_at = datetime.utcnow()
     db.commit()
     
-    print(f"✅ Action executed successfully")
+    # Requested IDs that don't exist
+    if request.action_ids is not None:
+        for action_id in request.action_ids:
+            if action_id not in results:
+                results[action_id] = {"action_id": action_id, "success": False, "error": "Action not found"}
+    
+    ordered = list(dict.fromkeys(request.action_ids if request.action_ids is not None else found))
+    executed = sum(1 for r in results.values() if r["success"])
+    
+    print(f"✅ Bulk execution finished: {executed}/{len(results)} succeeded")
     
     return {
-        "action": action.to_dict(),
-        "result": result
+        "requested": len(ordered),
+        "executed": executed,
+        "failed": len(results) - executed,
+        "results": [results[action_id] for action_id in ordered]
     }
 
 
+@app.get("/api/followup/scheduler")
+def get_followup_scheduler_status():
+    """
+    Follow-up scheduler status (queued actions and next due time)
+    """
+    return followup_scheduler.status()
+
+
 # PHASE 3: LIFELINE RETENTION AGENT ENDPOINTS
 
 class LifeEventCreate(BaseModel):
@@ -619,25 +851,12 @@ def get_life_events(lead_id: int, db: Session = Depends(get_db)):
     }
 
 
-@app.get("/api/life-events")
+@app.get("/api/life-events", response_class=FastJSONResponse)
 def get_all_life_events(db: Session = Depends(get_db)):
     """
-    Get all life events across all leads
+    Get all life events across all leads, with each lead's name, email and phone
     """
-    life_events = db.query(LifeEvent).order_by(LifeEvent.created_at.desc()).all()
-    
-    # Enrich with lead data
-    enriched_events = []
-    for event in life_events:
-        event_dict = event.to_dict()
-        lead = db.query(Lead).filter(Lead.id == event.lead_id).first()
-        if lead:
-            event_dict['lead_name'] = lead.full_name
-            event_dict['lead_email'] = lead.email
-            event_dict['lead_phone'] = lead.phone
-        enriched_events.append(event_dict)
-    
-    return {"life_events": enriched_events}
+    return FastJSONResponse({"life_events": life_event_list(db)})
 
 
 @app.get("/api/leads/{lead_id}/policy-health")
@@ -676,6 +895,62 @@ def get_policy_health(lead_id: int, db: Session = Depends(get_db)):
     }
 
 
+def _csv_param(value: Optional[str], name: str, allowed: tuple) -> Optional[list]:
+    """Comma-separated query parameter as a list, 400 on values outside `allowed`"""
+    if not value:
+        return None
+    values = [part.strip().lower() for part in value.split(",") if part.strip()]
+    invalid = [part for part in values if part not in allowed]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"{name} must be among {', '.join(allowed)}")
+    return values
+
+
+@app.get("/api/retention/worklist")
+def get_retention_worklist(
+    churn_risk: Optional[str] = None,
+    priority: Optional[str] = None,
+    min_score: Optional[int] = None,
+    max_score: Optional[int] = None,
+    sort: str = "score",
+    limit: int = 100,
+    offset: int = 0,
+    db: Session = Depends(get_db)
+):
+    """
+    Leads by latest policy health (churn_risk and priority take comma-separated lists), from the maintained latest-health table
+    """
+    if sort not in WORKLIST_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(WORKLIST_SORTS)}")
+    
+    return retention_worklist(
+        db,
+        churn_risks=_csv_param(churn_risk, "churn_risk", CHURN_RISKS),
+        priorities=_csv_param(priority, "priority", PRIORITIES),
+        min_score=min_score,
+        max_score=max_score,
+        sort=sort,
+        limit=max(1, min(limit, 1000)),
+        offset=max(0, offset)
+    )
+
+
+@app.get("/api/leads/{lead_id}/policy-health/trend")
+def get_policy_health_trend(lead_id: int, days: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    A lead's health score over time (optionally the last N days), from the compacted history and the latest records
+    """
+    if not db.query(Lead.id).filter(Lead.id == lead_id).first():
+        raise HTTPException(status_code=404, detail="Lead not found")
+    
+    since = date.today() - timedelta(days=max(0, days)) if days is not None else None
+    
+    return {
+        "lead_id": lead_id,
+        "points": health_trend(db, lead_id, since)
+    }
+
+
 @app.post("/api/life-events/{event_id}/respond")
 def respond_to_life_event(event_id: int, response_data: CustomerResponse, db: Session = Depends(get_db)):
     """
@@ -842,6 +1117,7 @@ def trigger_occasion(lead_id: int, occasion_data: OccasionCreate, db: Session =
     )
     
     db.add(occasion)
+    roll_forward(db, lead_id, occasion_data.occasion_type, occasion_date.date())
     db.commit()
     db.refresh(occasion)
     
@@ -886,25 +1162,38 @@ def get_occasions(lead_id: int, db: Session = Depends(get_db)):
     }
 
 
-@app.get("/api/occasions")
+@app.get("/api/occasions", response_class=FastJSONResponse)
 def get_all_occasions(db: Session = Depends(get_db)):
     """
-    Get all occasions across all leads
+    Get all occasions across all leads, with each lead's name, email and phone
     """
-    occasions = db.query(Occasion).order_by(Occasion.created_at.desc()).all()
-    
-    # Enrich with lead data
-    enriched_occasions = []
-    for occasion in occasions:
-        occasion_dict = occasion.to_dict()
-        lead = db.query(Lead).filter(Lead.id == occasion.lead_id).first()
-        if lead:
-            occasion_dict['lead_name'] = lead.full_name
-            occasion_dict['lead_email'] = lead.email
-            occasion_dict['lead_phone'] = lead.phone
-        enriched_occasions.append(occasion_dict)
-    
-    return {"occasions": enriched_occasions}
+    return FastJSONResponse({"occasions": occasion_list(db)})
+
+
+@app.get("/api/occasions/upcoming")
+def get_upcoming_occasions(
+    type: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+    anniversary_days: int = 30,
+    renewal_days: int = 60,
+    db: Session = Depends(get_db)
+):
+    """
+    Paged worklist of upcoming policy anniversaries and renewals across the whole book, soonest first,
+    from the maintained engagement schedule
+    """
+    if type and type not in OCCASION_TYPES:
+        raise HTTPException(status_code=400, detail=f"type must be one of {', '.join(OCCASION_TYPES)}")
+    
+    return get_occasion_worklist(
+        db,
+        occasion_types=(type,) if type else OCCASION_TYPES,
+        limit=max(1, min(limit, 1000)),
+        offset=max(0, offset),
+        anniversary_days=anniversary_days,
+        renewal_days=renewal_days
+    )
 
 
 @app.post("/api/occasions/{occasion_id}/respond")
@@ -1031,7 +1320,142 @@ def detect_lead_occasions(lead_id: int, db: Session = Depends(get_db)):
     }
 
 
-# Run the application
+# CAMPAIGN ENDPOINTS
+
+class CampaignCreate(BaseModel):
+    name: str
+    occasion_type: str  # holiday_season, policy_anniversary, birthday, policy_renewal, usage_based_savings
+    channel: str = "sms"  # sms, email
+    insurance_types: Optional[List[str]] = None
+    statuses: Optional[List[str]] = None
+    min_tenure_days: Optional[int] = None
+    lead_ids: Optional[List[int]] = None
+    send_rate: Optional[float] = None  # messages per second (defaults to CAMPAIGN_SEND_RATE)
+    start: bool = True
+
+
+@app.post("/api/campaigns")
+def create_campaign(campaign_data: CampaignCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Create an occasion campaign over a segment of the book and (by default) start it
+    """
+    if campaign_data.channel not in ("sms", "email"):
+        raise HTTPException(status_code=400, detail="channel must be sms or email")
+    
+    segment = {
+        key: value for key, value in {
+            "insurance_types": campaign_data.insurance_types,
+            "statuses": campaign_data.statuses,
+            "min_tenure_days": campaign_data.min_tenure_days,
+            "lead_ids": campaign_data.lead_ids,
+        }.items() if value
+    }
+    
+    campaign = Campaign(
+        name=campaign_data.name,
+        occasion_type=campaign_data.occasion_type,
+        channel=campaign_data.channel,
+        segment=segment,
+        send_rate=campaign_data.send_rate,
+        status="draft"
+    )
+    
+    db.add(campaign)
+    db.commit()
+    db.refresh(campaign)
+    
+    print(f"\n📣 Campaign created: {campaign.name} ({campaign.occasion_type})")
+    
+    if campaign_data.start:
+        background_tasks.add_task(run_campaign, campaign.id)
+    
+    return {"campaign": campaign.to_dict(), "started": campaign_data.start}
+
+
+@app.get("/api/campaigns")
+def get_campaigns(db: Session = Depends(get_db)):
+    """
+    List campaigns with their progress
+    """
+    campaigns = db.query(Campaign).order_by(Campaign.created_at.desc()).all()
+    return {"campaigns": [c.to_dict() for c in campaigns]}
+
+
+@app.get("/api/campaigns/{campaign_id}")
+def get_campaign(campaign_id: int, db: Session = Depends(get_db)):
+    """
+    Campaign progress (targets, processed, sent, failed, health pass)
+    """
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    return {"campaign": campaign.to_dict()}
+
+
+@app.post("/api/campaigns/{campaign_id}/run")
+def start_campaign(campaign_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Start or resume a campaign from where it stopped
+    """
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    if campaign.status not in RUNNABLE_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Campaign is {campaign.status}")
+    
+    # A paused run finishes its current batch before it lets go of the campaign
+    lease = campaign_run_lease(campaign.id)
+    if not lease.acquire(lease_seconds(CAMPAIGN_BATCH_SIZE)):
+        raise HTTPException(status_code=409, detail="Campaign's previous run is still finishing a batch")
+    
+    background_tasks.add_task(run_campaign, campaign.id, lease=lease)
+    
+    return {"campaign": campaign.to_dict(), "started": True}
+
+
+@app.post("/api/campaigns/{campaign_id}/pause")
+def pause_campaign(campaign_id: int, db: Session = Depends(get_db)):
+    """
+    Pause a running campaign after its current batch
+    """
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    if campaign.status not in ("draft", "running"):
+        raise HTTPException(status_code=409, detail=f"Campaign is {campaign.status}")
+    
+    campaign.status = "paused"
+    db.commit()
+    db.refresh(campaign)
+    
+    return {"campaign": campaign.to_dict()}
+
+
+@app.post("/api/campaigns/{campaign_id}/recalculate-health")
+def recalculate_campaign_policy_health(campaign_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Run (or resume) the batched policy health pass over the campaign's leads
+    """
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    if campaign.status == "running":
+        raise HTTPException(status_code=409, detail="Campaign is still running")
+    
+    lease = campaign_health_lease(campaign.id)
+    if not lease.acquire(CAMPAIGN_LEASE_SECONDS):
+        raise HTTPException(status_code=409, detail="Policy health pass is already running")
+    
+    background_tasks.add_task(recalculate_campaign_health, campaign.id, lease=lease)
+    
+    return {"campaign": campaign.to_dict(), "started": True}
+
+
+# Run the application (single process - serve.py runs several workers)
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,269 @@
+"""
+Message templates for demo-mode and fallback outreach.
+
+Every template is parsed and validated once at import; engines look one up by
+name and render only that one, instead of formatting a whole table of
+f-strings per call.
+"""
+from string import Formatter
+
+
+class MessageTemplate:
+    """A str.format template with its field names and static metadata (offer details etc.)"""
+    __slots__ = ("name", "text", "fields", "metadata")
+
+    def __init__(self, name: str, text: str, **metadata):
+        self.name = name
+        self.text = text
+        self.fields = frozenset(field for _, field, _, _ in Formatter().parse(text) if field)
+        self.metadata = metadata
+
+    def render(self, **values) -> str:
+        """Format the template (raises KeyError if a field is missing)"""
+        return self.text.format_map(values)
+
+
+TEMPLATES = {}
+
+
+def register_template(name: str, text: str, **metadata) -> MessageTemplate:
+    """Compile and register a template (names are unique)"""
+    if name in TEMPLATES:
+        raise ValueError(f"Template {name} is already registered")
+    template = MessageTemplate(name, text, **metadata)
+    TEMPLATES[name] = template
+    return template
+
+
+def get_template(name: str, default: str = None) -> MessageTemplate:
+    """Template by name, or the default template's if name is unknown"""
+    template = TEMPLATES.get(name)
+    if template is None and default is not None:
+        template = TEMPLATES[default]
+    if template is None:
+        raise KeyError(f"Unknown message template {name}")
+    return template
+
+
+def render_template(name: str, **values) -> str:
+    return TEMPLATES[name].render(**values)
+
+
+# --- Outreach (ai_engine) ---
+
+register_template(
+    "outreach.sms.demo",
+    "Hi {first_name}! 👋 Noticed you're with {current_provider} for {insurance_type_lower}. We could save you ${savings}/yr. Book a quick chat? {calendly_link} - Alex @ Solisa"
+)
+
+register_template(
+    "outreach.sms.fallback",
+    "Hi {first_name}! We can save you ${savings}/yr on {insurance_type_lower}. Book a chat? {calendly_link} - Alex @ Solisa"
+)
+
+register_template(
+    "outreach.email.subject",
+    "{first_name}, save ${savings}/year on your {insurance_type} insurance"
+)
+
+register_template("outreach.email.demo", """Hi {full_name},
+
+I noticed you're currently with {current_provider} for your {insurance_type_lower} insurance. As a {life_stage_lower}, you deserve coverage that actually works for you.
+
+Here's what caught my attention:
+{pain_points_text}
+
+The good news? We can likely save you ${savings} per year while addressing these concerns. With your renewal coming up in {renewal_date}, now's the perfect time to explore better options.
+
+I'd love to show you a personalized quote that fits your needs. It takes just 15 minutes, and there's zero pressure.
+
+Book a quick call: {calendly_link}
+
+Looking forward to helping you get the coverage you deserve!
+
+Best,
+Alex
+Solisa Insurance
+alex@solisa.com""")
+
+register_template("outreach.email.fallback", """Hi {full_name},
+
+I noticed you're with {current_provider} for {insurance_type_lower} insurance. We can save you ${savings}/year with better coverage.
+
+Your renewal is coming up in {renewal_date} - let's chat about your options.
+
+Book a quick call: {calendly_link}
+
+Best,
+Alex
+Solisa Insurance
+alex@solisa.com""")
+
+
+# --- Follow-up actions (followup_engine, demo mode) ---
+
+register_template(
+    "followup.sms.demo",
+    "Hi {first_name}! Quick follow-up - I found a way to get you closer to your current rate. Can we chat for 5 mins tomorrow? 📞 - Alex @ Solisa",
+    action_type="sms",
+    priority="high",
+    reasoning="Prospect mentioned price as main objection. Quick SMS shows we're addressing their concern.",
+    timing="immediate"
+)
+
+register_template("followup.email.demo", """Subject: Accident Forgiveness: Worth the Extra $40?
+
+Hi {first_name},
+
+Great talking with you today! I know the $40/month difference gave you pause.
+
+Here's something to consider: With your clean driving record, you're a perfect candidate for accident forgiveness. Here's what that means:
+
+• One accident won't raise your rates
+• Average rate increase after accident: $500-$1,200/year
+• Your protection: $0 increase
+
+So that $40/month ($480/year) could save you $500-$1,200 if something happens.
+
+Plus, I'm working on getting you a better rate. Let's schedule a quick 15-minute call to discuss your options:
+
+📅 Book your call here: {calendly_link}
+
+Looking forward to finding you the best coverage!
+
+Best,
+Alex
+Solisa Insurance""",
+    action_type="email",
+    priority="medium",
+    reasoning="Provide ROI case study addressing price objection with concrete numbers.",
+    timing="1hour"
+)
+
+register_template("followup.call.demo", """CALL SCRIPT - Follow-up with {full_name}
+
+OBJECTIVE: Address price objection, present revised quote
+
+OPENING:
+"Hi {first_name}, it's Alex from Solisa. Do you have 5 minutes? I found some options that might work better for you."
+
+KEY POINTS TO COVER:
+1. Acknowledge their concern about the $40 difference
+2. Present revised quote (aim for $200-210/month)
+3. Emphasize accident forgiveness value with their clean record
+4. Offer flexible payment options
+
+OBJECTION HANDLING:
+- If still too expensive: "What monthly rate would work for your budget?"
+- If needs time: "I understand. Can I check back next week?"
+- If comparing: "What would make this an easy yes for you?"
+
+CLOSE:
+"Does this feel more in line with what you're looking for?"
+
+NEXT STEP: Book follow-up or close deal""",
+    action_type="call",
+    priority="medium",
+    reasoning="Prepare for tomorrow's call with specific talking points addressing their objections.",
+    timing="1day"
+)
+
+
+# --- Life events (retention_engine) ---
+
+register_template(
+    "life_event.new_baby",
+    "🎉 Congrats on the new baby, {first_name}! As your family grows, have you thought about umbrella insurance? It adds an extra layer of liability protection beyond your regular policies. Would love to send you a quick quote — just let me know!",
+    opportunity_type="upsell",
+    recommended_product="umbrella_insurance",
+    estimated_value=25  # $25/month
+)
+
+register_template(
+    "life_event.home_reno",
+    "🏡 Congrats on the new home, {first_name}! Have you thought about adding flood coverage? It's not included in standard policies but can be a lifesaver. Want me to send over a quote?",
+    opportunity_type="upsell",
+    recommended_product="flood_coverage",
+    estimated_value=35  # $35/month
+)
+
+register_template(
+    "life_event.teen_driver",
+    "🚗 Hey {first_name}, congrats on the teen driver! That's a big milestone. We have great coverage options for young drivers, including accident forgiveness. Want to review your policy to make sure you're covered?",
+    opportunity_type="upsell",
+    recommended_product="auto_upgrade",
+    estimated_value=75  # $75/month
+)
+
+register_template(
+    "life_event.job_change",
+    "💼 Congrats on the new job, {first_name}! Life changes can affect your insurance needs. Want to do a quick policy review to make sure everything still fits?",
+    opportunity_type="retention",
+    recommended_product="policy_review",
+    estimated_value=0
+)
+
+register_template(
+    "life_event.default",
+    "Hi {first_name}, I wanted to check in and see how things are going. Let me know if there's anything I can help with!",
+    opportunity_type="retention",
+    recommended_product="policy_review",
+    estimated_value=0
+)
+
+
+# --- Occasions (occasions_engine) ---
+
+register_template(
+    "occasion.policy_anniversary",
+    "🎉 Happy {years}-year anniversary with Solisa, {first_name}! We're so grateful to have you as part of our family. As a thank you for your loyalty, here's a special gift: $50 off your next renewal! You've been an amazing customer, and we look forward to many more years together. Cheers to you! 🥳",
+    offer_type="loyalty_discount",
+    offer_value=50,
+    offer_description="$50 off next renewal",
+    action_required=False
+)
+
+register_template(
+    "occasion.birthday",
+    "🎂 Happy Birthday, {first_name}! We hope your day is filled with joy and celebration. As a birthday gift from us, enjoy free roadside assistance for the entire month! It's our way of saying thank you for being such a valued customer. Have a wonderful day! 🎈",
+    offer_type="free_service",
+    offer_value=0,
+    offer_description="Free roadside assistance for 1 month",
+    action_required=False
+)
+
+register_template(
+    "occasion.policy_renewal",
+    "Hi {first_name}, your policy renewal is coming up in {days_until} days. Before you renew, I wanted to check in - are you still happy with your coverage? Sometimes life changes, and your insurance should too. I'm here if you'd like to review your policy or explore any updates. No pressure, just want to make sure you're getting the best value! 😊",
+    offer_type="policy_review",
+    offer_value=0,
+    offer_description="Complimentary policy review",
+    action_required=True
+)
+
+register_template(
+    "occasion.usage_based_savings",
+    "Hi {first_name}, I noticed something interesting - you're driving about 40% less than the average policyholder! That's great for the environment and your wallet. Have you considered switching to our pay-per-mile plan? Based on your driving, you could save around $340 per year. Want to learn more? No obligation, just thought you'd like to know! 🚗",
+    offer_type="plan_switch",
+    offer_value=340,
+    offer_description="Save $340/year with pay-per-mile",
+    action_required=True
+)
+
+register_template(
+    "occasion.holiday_season",
+    "Happy Holidays, {first_name}! 🎄 As we wrap up the year, I wanted to reach out and say thank you for being such a wonderful customer. If you're planning any holiday travel, remember you have 24/7 roadside assistance. Safe travels and warm wishes to you and your family! ❄️",
+    offer_type="reminder",
+    offer_value=0,
+    offer_description="Holiday travel reminder",
+    action_required=False
+)
+
+register_template(
+    "occasion.default",
+    "Hi {first_name}, just checking in to see how everything is going with your policy. I'm here if you need anything!",
+    offer_type="check_in",
+    offer_value=0,
+    offer_description="Customer check-in",
+    action_required=False
+)
@@ -0,0 +1,258 @@
+"""
+Request and dependency metrics in the Prometheus text format.
+
+Per-endpoint latency and counts come from MetricsMiddleware; calls out to the
+database, the LLM, Twilio, SendGrid, Zoom and Apollo are timed with span():
+
+    with span("llm", "analyze_touchpoint"):
+        response = client.chat.completions.create(...)
+
+With METRICS_ENABLED=false the middleware passes requests straight through and
+span() returns a shared no-op, so instrumented code costs one attribute check.
+"""
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from sqlalchemy import event
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> list:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_label_text(self.labelnames, labels)} {_number(v)}" for labels, v in values)
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> list:
+        with self._lock:
+            snapshot = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {repr(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {cumulative}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+HTTP_REQUESTS = Counter(
+    "solisa_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "solisa_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+DEPENDENCY_CALLS = Counter(
+    "solisa_dependency_calls_total", "Calls to the database and external services", ("dependency", "operation", "outcome")
+)
+DEPENDENCY_LATENCY = Histogram(
+    "solisa_dependency_duration_seconds", "Latency of calls to the database and external services", ("dependency", "operation")
+)
+
+REGISTRY = (HTTP_REQUESTS, HTTP_LATENCY, DEPENDENCY_CALLS, DEPENDENCY_LATENCY)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    """Drop all recorded values"""
+    for metric in REGISTRY:
+        metric.clear()
+
+
+def record_dependency(dependency: str, operation: str, seconds: float, outcome: str = "ok"):
+    """Record one finished dependency call"""
+    DEPENDENCY_LATENCY.observe(seconds, dependency, operation)
+    DEPENDENCY_CALLS.inc(dependency, operation, outcome)
+
+
+class _Span:
+    __slots__ = ("dependency", "operation", "started")
+
+    def __init__(self, dependency: str, operation: str):
+        self.dependency = dependency
+        self.operation = operation
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record_dependency(self.dependency, self.operation, perf_counter() - self.started,
+                          "error" if exc_type else "ok")
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(dependency: str, operation: str):
+    """
+    Time a call to a dependency (context manager).
+
+    Args:
+        dependency: Service being called (db, llm, twilio, sendgrid, zoom, apollo)
+        operation: What the call does (e.g. the engine function or API endpoint)
+
+    Exceptions are counted with outcome="error" and re-raised.
+    """
+    if not METRICS_ENABLED:
+        return _NOOP_SPAN
+    return _Span(dependency, operation)
+
+
+def _statement_operation(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)
+    return word[0].upper() if word else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["metrics_started"].pop()
+    record_dependency("db", _statement_operation(statement), perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("metrics_started") if exception_context.connection else None
+    if started:
+        record_dependency("db", _statement_operation(exception_context.statement or ""),
+                          perf_counter() - started.pop(), "error")
+
+
+def instrument_engine(engine):
+    """Time every statement run on an engine (no-op when metrics are disabled)"""
+    if not METRICS_ENABLED or event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and status per route.
+
+    Routes are labelled by their path template (/api/leads/{lead_id}), so label
+    cardinality stays bounded; unmatched paths share one "unmatched" label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not METRICS_ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            HTTP_LATENCY.observe(perf_counter() - started, method, route_path)
+            HTTP_REQUESTS.inc(method, route_path, str(status[0]))
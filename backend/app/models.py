@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Boolean, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Date, DateTime, JSON, Boolean, ForeignKey, Text, Float, Index
+from sqlalchemy.orm import relationship, selectinload
 from datetime import datetime
 
 try:
@@ -15,16 +15,26 @@ class Lead(Base):
     # Basic Info
     full_name = Column(String, nullable=False)
     email = Column(String, nullable=False, index=True)
+    email_normalized = Column(String, nullable=True, unique=True, index=True)  # see lead_resolution.normalize_email
+    email_duplicate_of = Column(Integer, nullable=True)  # legacy lead left without email_normalized: the lead that owns the address
     phone = Column(String, nullable=False)
     insurance_type = Column(String, nullable=False)
     current_provider = Column(String, nullable=True)
     
+    # Dedup keys (see lead_dedup)
+    phone_normalized = Column(String, nullable=True, index=True)  # E.164
+    name_key = Column(String, nullable=True, index=True)  # Soundex(last name)|first initial
+    submission_count = Column(Integer, default=1)
+    last_submitted_at = Column(DateTime, nullable=True)
+    
     # Enriched Data
     life_stage = Column(String, nullable=True)
     estimated_age_range = Column(String, nullable=True)
     pain_points = Column(JSON, nullable=True)
     estimated_savings = Column(Integer, nullable=True)
-    renewal_date = Column(String, nullable=True)
+    renewal_date = Column(String, nullable=True)  # display form, e.g. "June 2025"
+    renewal_on = Column(Date, nullable=True, index=True)  # queryable renewal date
+    profile = Column(JSON, nullable=True)  # enrichment provider attributes (job title, company, industry, ...)
     
     # Communication Status
     sms_sent = Column(Boolean, default=False)
@@ -44,16 +54,24 @@ class Lead(Base):
     # Status
     status = Column(String, default="new")  # new, enriched, contacted, booked
     
+    # Last known intent (maintained on each touchpoint for O(1) intent shift detection)
+    last_intent = Column(String, nullable=True)
+    last_intent_level = Column(Float, nullable=True)
+    last_intent_at = Column(DateTime, nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
-    touchpoints = relationship("Touchpoint", back_populates="lead")
-    followup_actions = relationship("FollowUpAction", back_populates="lead")
-    life_events = relationship("LifeEvent", back_populates="lead")
-    policy_health_records = relationship("PolicyHealth", back_populates="lead")
-    occasions = relationship("Occasion", back_populates="lead")
+    # Relationships - lazy="raise" everywhere: handlers query what they need or
+    # load it with a bundle below (e.g. LEAD_360_LOADERS), so an accidental lazy
+    # load fails loudly instead of turning into N+1 queries. Collections are
+    # newest first, like the per-lead list endpoints.
+    touchpoints = relationship("Touchpoint", back_populates="lead", lazy="raise", order_by="Touchpoint.created_at.desc()")
+    followup_actions = relationship("FollowUpAction", back_populates="lead", lazy="raise", order_by="FollowUpAction.created_at.desc()")
+    life_events = relationship("LifeEvent", back_populates="lead", lazy="raise", order_by="LifeEvent.created_at.desc()")
+    policy_health_records = relationship("PolicyHealth", back_populates="lead", lazy="raise", order_by="PolicyHealth.calculated_at.desc()")
+    occasions = relationship("Occasion", back_populates="lead", lazy="raise", order_by="Occasion.created_at.desc()")
     
     def to_dict(self):
         """Convert model to dictionary"""
@@ -69,6 +87,8 @@ class Lead(Base):
             "pain_points": self.pain_points,
             "estimated_savings": self.estimated_savings,
             "renewal_date": self.renewal_date,
+            "renewal_on": self.renewal_on.isoformat() if self.renewal_on else None,
+            "profile": self.profile,
             "sms_sent": self.sms_sent,
             "sms_sent_at": self.sms_sent_at.isoformat() if self.sms_sent_at else None,
             "sms_content": self.sms_content,
@@ -80,6 +100,11 @@ class Lead(Base):
             "booking_confirmed": self.booking_confirmed,
             "booking_confirmed_at": self.booking_confirmed_at.isoformat() if self.booking_confirmed_at else None,
             "status": self.status,
+            "submission_count": self.submission_count,
+            "last_submitted_at": self.last_submitted_at.isoformat() if self.last_submitted_at else None,
+            "last_intent": self.last_intent,
+            "last_intent_level": self.last_intent_level,
+            "last_intent_at": self.last_intent_at.isoformat() if self.last_intent_at else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
@@ -88,6 +113,9 @@ class Lead(Base):
 class Touchpoint(Base):
     """Track every interaction with a lead"""
     __tablename__ = "touchpoints"
+    __table_args__ = (
+        Index("ix_touchpoints_lead_created", "lead_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     lead_id = Column(Integer, ForeignKey('leads.id'), nullable=False)
@@ -108,8 +136,8 @@ class Touchpoint(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    lead = relationship("Lead", back_populates="touchpoints")
-    followup_actions = relationship("FollowUpAction", back_populates="touchpoint")
+    lead = relationship("Lead", back_populates="touchpoints", lazy="raise")
+    followup_actions = relationship("FollowUpAction", back_populates="touchpoint", lazy="raise")
     
     def to_dict(self):
         return {
@@ -130,6 +158,9 @@ class Touchpoint(Base):
 class FollowUpAction(Base):
     """AI-recommended next actions"""
     __tablename__ = "followup_actions"
+    __table_args__ = (
+        Index("ix_followup_actions_status_created", "status", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     lead_id = Column(Integer, ForeignKey('leads.id'), nullable=False)
@@ -143,13 +174,14 @@ class FollowUpAction(Base):
     timing = Column(String, nullable=True)  # immediate, 1hour, 1day
     
     # Status
-    status = Column(String, default="pending")  # pending, completed, skipped
+    status = Column(String, default="pending")  # pending, in_progress, completed, failed, skipped
+    claimed_at = Column(DateTime, nullable=True)  # when it went in_progress (stale claims are retried)
     completed_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    lead = relationship("Lead", back_populates="followup_actions")
-    touchpoint = relationship("Touchpoint", back_populates="followup_actions")
+    lead = relationship("Lead", back_populates="followup_actions", lazy="raise")
+    touchpoint = relationship("Touchpoint", back_populates="followup_actions", lazy="raise")
     
     def to_dict(self):
         return {
@@ -197,7 +229,7 @@ class LifeEvent(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    lead = relationship("Lead", back_populates="life_events")
+    lead = relationship("Lead", back_populates="life_events", lazy="raise")
     
     def to_dict(self):
         return {
@@ -223,6 +255,9 @@ class LifeEvent(Base):
 class PolicyHealth(Base):
     """Track policy health scores and churn predictions"""
     __tablename__ = "policy_health"
+    __table_args__ = (
+        Index("ix_policy_health_lead_calculated", "lead_id", "calculated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     lead_id = Column(Integer, ForeignKey('leads.id'), nullable=False)
@@ -248,7 +283,7 @@ class PolicyHealth(Base):
     calculated_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    lead = relationship("Lead", back_populates="policy_health_records")
+    lead = relationship("Lead", back_populates="policy_health_records", lazy="raise")
     
     def to_dict(self):
         return {
@@ -275,6 +310,7 @@ class Occasion(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     lead_id = Column(Integer, ForeignKey('leads.id'), nullable=False)
+    campaign_id = Column(Integer, ForeignKey('campaigns.id'), nullable=True, index=True)  # set for campaign sends
     
     # Occasion details
     occasion_type = Column(String, nullable=False)  # policy_anniversary, birthday, renewal, holiday, usage_milestone
@@ -291,19 +327,20 @@ class Occasion(Base):
     action_type = Column(String, nullable=True)  # sms, email
     action_content = Column(Text, nullable=True)
     customer_response = Column(Text, nullable=True)
-    outcome = Column(String, nullable=True)  # accepted, declined, pending, no_response
+    outcome = Column(String, nullable=True)  # accepted, declined, pending, no_response (campaigns: queued, sending, failed, interrupted)
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    lead = relationship("Lead", back_populates="occasions")
+    lead = relationship("Lead", back_populates="occasions", lazy="raise")
     
     def to_dict(self):
         return {
             "id": self.id,
             "lead_id": self.lead_id,
+            "campaign_id": self.campaign_id,
             "occasion_type": self.occasion_type,
             "occasion_date": self.occasion_date.isoformat() if self.occasion_date else None,
             "description": self.description,
@@ -318,3 +355,220 @@ class Occasion(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class Campaign(Base):
+    """Occasion message sent to a whole segment of the book, run in resumable batches"""
+    __tablename__ = "campaigns"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Campaign details
+    name = Column(String, nullable=False)
+    occasion_type = Column(String, nullable=False)  # holiday_season, policy_anniversary, birthday, ...
+    channel = Column(String, default="sms")  # sms, email
+    segment = Column(JSON, nullable=True)  # {"insurance_types": [...], "statuses": [...], "min_tenure_days": N}
+    send_rate = Column(Float, nullable=True)  # max sends per second
+    
+    # Progress
+    status = Column(String, default="draft")  # draft, running, paused, completed, failed
+    total_targets = Column(Integer, default=0)
+    processed = Column(Integer, default=0)
+    sent = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    last_lead_id = Column(Integer, default=0)  # resume cursor - leads up to here have an Occasion row
+    error = Column(Text, nullable=True)
+    
+    # Deferred policy health pass over the campaign's leads
+    health_status = Column(String, nullable=True)  # pending, running, completed
+    health_recalculated = Column(Integer, default=0)
+    health_last_lead_id = Column(Integer, default=0)  # resume cursor for the health pass
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    health_recalculated_at = Column(DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "occasion_type": self.occasion_type,
+            "channel": self.channel,
+            "segment": self.segment,
+            "send_rate": self.send_rate,
+            "status": self.status,
+            "total_targets": self.total_targets,
+            "processed": self.processed,
+            "sent": self.sent,
+            "failed": self.failed,
+            "progress": round(100 * (self.processed or 0) / self.total_targets, 1) if self.total_targets else 0.0,
+            "last_lead_id": self.last_lead_id,
+            "error": self.error,
+            "health_status": self.health_status,
+            "health_recalculated": self.health_recalculated,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "health_recalculated_at": self.health_recalculated_at.isoformat() if self.health_recalculated_at else None,
+        }
+
+
+class EngagementSchedule(Base):
+    """Next engagement date per lead and occasion type - "what is due" is one index range scan"""
+    __tablename__ = "engagement_schedule"
+    __table_args__ = (
+        Index("ux_engagement_schedule_lead_type", "lead_id", "occasion_type", unique=True),
+        Index("ix_engagement_schedule_next_date", "next_date", "occasion_type"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    lead_id = Column(Integer, ForeignKey('leads.id'), nullable=False)
+    occasion_type = Column(String, nullable=False)  # policy_anniversary, policy_renewal
+    next_date = Column(Date, nullable=False)
+    last_fired_on = Column(Date, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "lead_id": self.lead_id,
+            "occasion_type": self.occasion_type,
+            "next_date": self.next_date.isoformat() if self.next_date else None,
+            "last_fired_on": self.last_fired_on.isoformat() if self.last_fired_on else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class LatestPolicyHealth(Base):
+    """Most recent PolicyHealth record per lead, maintained on insert - the retention worklist reads only this table"""
+    __tablename__ = "latest_policy_health"
+    __table_args__ = (
+        Index("ix_latest_policy_health_risk_score", "churn_risk", "health_score"),
+        Index("ix_latest_policy_health_priority_score", "priority", "health_score"),
+        Index("ix_latest_policy_health_score", "health_score"),
+    )
+    
+    lead_id = Column(Integer, ForeignKey('leads.id'), primary_key=True)
+    policy_health_id = Column(Integer, ForeignKey('policy_health.id'), nullable=False)
+    
+    # Copied from the PolicyHealth record (scores only - reasoning and actions stay there)
+    health_score = Column(Integer, nullable=False)
+    churn_risk = Column(String, nullable=False)
+    churn_probability = Column(Integer, nullable=True)
+    days_to_predicted_churn = Column(Integer, nullable=True)
+    engagement_score = Column(Integer, nullable=True)
+    satisfaction_score = Column(Integer, nullable=True)
+    usage_score = Column(Integer, nullable=True)
+    payment_score = Column(Integer, nullable=True)
+    priority = Column(String, nullable=True)
+    calculated_at = Column(DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            "lead_id": self.lead_id,
+            "policy_health_id": self.policy_health_id,
+            "health_score": self.health_score,
+            "churn_risk": self.churn_risk,
+            "churn_probability": self.churn_probability,
+            "days_to_predicted_churn": self.days_to_predicted_churn,
+            "engagement_score": self.engagement_score,
+            "satisfaction_score": self.satisfaction_score,
+            "usage_score": self.usage_score,
+            "payment_score": self.payment_score,
+            "priority": self.priority,
+            "calculated_at": self.calculated_at.isoformat() if self.calculated_at else None,
+        }
+
+
+class PolicyHealthHistory(Base):
+    """Compacted policy health: one score point per lead and day (recent) or week (older), from records pruned out of policy_health"""
+    __tablename__ = "policy_health_history"
+    __table_args__ = (
+        Index("ux_policy_health_history_lead_period", "lead_id", "granularity", "period_start", unique=True),
+        Index("ix_policy_health_history_granularity_period", "granularity", "period_start"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    lead_id = Column(Integer, ForeignKey('leads.id'), nullable=False)
+    granularity = Column(String, nullable=False)  # day, week
+    period_start = Column(Date, nullable=False)  # the day, or the Monday of the week
+    
+    # Scores of the records in the period
+    health_score = Column(Float, nullable=False)  # mean
+    min_score = Column(Integer, nullable=False)
+    max_score = Column(Integer, nullable=False)
+    samples = Column(Integer, nullable=False)
+    
+    # As of the period's last record
+    churn_risk = Column(String, nullable=True)
+    churn_probability = Column(Integer, nullable=True)
+    last_calculated_at = Column(DateTime, nullable=False)
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "lead_id": self.lead_id,
+            "granularity": self.granularity,
+            "period_start": self.period_start.isoformat() if self.period_start else None,
+            "health_score": round(self.health_score, 1) if self.health_score is not None else None,
+            "min_score": self.min_score,
+            "max_score": self.max_score,
+            "samples": self.samples,
+            "churn_risk": self.churn_risk,
+            "churn_probability": self.churn_probability,
+            "last_calculated_at": self.last_calculated_at.isoformat() if self.last_calculated_at else None,
+        }
+
+
+class WebhookEvent(Base):
+    """Append-only inbox of incoming webhook deliveries, applied in batches by a consumer"""
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        Index("ix_webhook_events_source_status", "source", "status", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Delivery details
+    source = Column(String, nullable=False)  # calendly
+    event_type = Column(String, nullable=True)  # invitee.created, invitee.canceled
+    event_key = Column(String, nullable=False, unique=True)  # dedup key so redeliveries are ignored
+    email = Column(String, nullable=True)
+    payload = Column(JSON, nullable=True)
+    
+    # Processing
+    status = Column(String, default="pending")  # pending, processed, ignored, failed
+    result = Column(Text, nullable=True)
+    lead_id = Column(Integer, nullable=True)
+    
+    # Timestamps
+    received_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "source": self.source,
+            "event_type": self.event_type,
+            "event_key": self.event_key,
+            "email": self.email,
+            "payload": self.payload,
+            "status": self.status,
+            "result": self.result,
+            "lead_id": self.lead_id,
+            "received_at": self.received_at.isoformat() if self.received_at else None,
+            "processed_at": self.processed_at.isoformat() if self.processed_at else None,
+        }
+
+
+# Loader bundles: options for db.query(Lead).options(*BUNDLE). Each selectinload
+# is one extra query for any number of leads.
+LEAD_360_LOADERS = (
+    selectinload(Lead.touchpoints),
+    selectinload(Lead.followup_actions),
+    selectinload(Lead.life_events),
+    selectinload(Lead.occasions),
+    selectinload(Lead.policy_health_records),
+)
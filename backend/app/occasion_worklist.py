@@ -0,0 +1,150 @@
+import heapq
+from datetime import date, timedelta
+from sqlalchemy import select, func
+
+try:
+    from .models import Lead, EngagementSchedule
+    from .occasions_engine import parse_renewal_date
+    from .engagement_calendar import SCHEDULED_OCCASION_TYPES, advance_engagements_daily
+except ImportError:
+    from models import Lead, EngagementSchedule
+    from occasions_engine import parse_renewal_date
+    from engagement_calendar import SCHEDULED_OCCASION_TYPES, advance_engagements_daily
+
+# Same windows as detect_occasions
+ANNIVERSARY_WINDOW_DAYS = 30
+RENEWAL_WINDOW_DAYS = 60
+
+OCCASION_TYPES = SCHEDULED_OCCASION_TYPES
+
+
+def _due_window(occasion_type: str, today: date, days: int) -> tuple:
+    """Schedule rows of a type due in [today, today + days] (a range on the next_date index)"""
+    return (EngagementSchedule.next_date.between(today, today + timedelta(days=days)),
+            EngagementSchedule.occasion_type == occasion_type)
+
+
+def _upcoming(db, occasion_type: str, today: date, days: int, limit: int):
+    rows = db.execute(
+        select(EngagementSchedule.lead_id, EngagementSchedule.next_date, EngagementSchedule.last_fired_on,
+               Lead.full_name, Lead.email, Lead.phone, Lead.insurance_type, Lead.created_at)
+        .join(Lead, Lead.id == EngagementSchedule.lead_id)
+        .where(*_due_window(occasion_type, today, days))
+        .order_by(EngagementSchedule.next_date.asc(), EngagementSchedule.lead_id.asc())
+        .limit(limit)
+    ).all()
+
+    for row in rows:
+        days_until = (row.next_date - today).days
+        item = {
+            "lead_id": row.lead_id,
+            "full_name": row.full_name,
+            "email": row.email,
+            "phone": row.phone,
+            "insurance_type": row.insurance_type,
+            "type": occasion_type,
+            "date": row.next_date.isoformat(),
+            "days_until": days_until,
+            "last_fired_on": row.last_fired_on.isoformat() if row.last_fired_on else None,
+        }
+        if occasion_type == "policy_anniversary":
+            item["years"] = row.next_date.year - row.created_at.year
+            item["priority"] = "medium"
+        else:
+            item["priority"] = "high" if days_until <= 30 else "medium"
+        yield item
+
+
+def count_upcoming_occasions(db, today: date = None, anniversary_days: int = ANNIVERSARY_WINDOW_DAYS,
+                             renewal_days: int = RENEWAL_WINDOW_DAYS) -> dict:
+    """Number of upcoming anniversaries and renewals (one indexed count each)"""
+    today = today or date.today()
+    windows = {"policy_anniversary": anniversary_days, "policy_renewal": renewal_days}
+
+    return {
+        occasion_type: db.execute(
+            select(func.count(EngagementSchedule.id)).where(*_due_window(occasion_type, today, days))
+        ).scalar() or 0
+        for occasion_type, days in windows.items()
+    }
+
+
+def get_occasion_worklist(db, today: date = None, occasion_types=OCCASION_TYPES, limit: int = 100, offset: int = 0,
+                          anniversary_days: int = ANNIVERSARY_WINDOW_DAYS, renewal_days: int = RENEWAL_WINDOW_DAYS) -> dict:
+    """
+    Portfolio-wide upcoming anniversaries and renewals, soonest first, from
+    the maintained engagement schedule (occasions that already fired have
+    rolled forward to their next date and drop off the list).
+
+    Each type is one range query on the next_date index returning rows already
+    in date order; the streams are merged and the requested page sliced, so a
+    page costs O(offset + limit) rows regardless of book size. The first read
+    of the day rolls dates that passed without firing forward.
+
+    Returns:
+        Dict with the page of items, per-type totals and paging info
+    """
+    advance_engagements_daily(db)
+    today = today or date.today()
+    fetch = offset + limit
+
+    streams = []
+    if "policy_anniversary" in occasion_types:
+        streams.append(_upcoming(db, "policy_anniversary", today, anniversary_days, fetch))
+    if "policy_renewal" in occasion_types:
+        streams.append(_upcoming(db, "policy_renewal", today, renewal_days, fetch))
+
+    merged = heapq.merge(*streams, key=lambda item: (item["days_until"], item["lead_id"], item["type"]))
+    items = [item for _, item in zip(range(fetch), merged)][offset:]
+
+    totals = count_upcoming_occasions(db, today, anniversary_days, renewal_days)
+    total = sum(count for occasion_type, count in totals.items() if occasion_type in occasion_types)
+
+    return {
+        "as_of": today.isoformat(),
+        "items": items,
+        "totals": totals,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "has_more": offset + len(items) < total
+    }
+
+
+def backfill_occasion_dates(db, batch_size: int = 5000) -> int:
+    """
+    Fill renewal_on for leads created before the column existed.
+
+    Returns:
+        Number of leads updated
+    """
+    updated = 0
+    last_id = 0
+
+    while True:
+        rows = db.query(Lead.id, Lead.renewal_date).filter(
+            Lead.id > last_id,
+            Lead.renewal_on.is_(None),
+            Lead.renewal_date.isnot(None)
+        ).order_by(Lead.id.asc()).limit(batch_size).all()
+
+        if not rows:
+            break
+
+        # Unparseable strings stay NULL (and are skipped again next time)
+        mappings = []
+        for lead_id, renewal_date in rows:
+            renewal_on = parse_renewal_date(renewal_date)
+            if renewal_on:
+                mappings.append({"id": lead_id, "renewal_on": renewal_on})
+        if mappings:
+            db.bulk_update_mappings(Lead, mappings)
+            db.commit()
+
+        updated += len(mappings)
+        last_id = rows[-1][0]
+
+    if updated:
+        print(f"🛠️  Backfilled renewal dates for {updated} leads")
+
+    return updated
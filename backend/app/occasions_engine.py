@@ -1,20 +1,84 @@
-import os
 import json
-from groq import Groq
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
+import zlib
+from datetime import date, datetime, timedelta
 
-load_dotenv()
+try:
+    from .settings import DEMO_MODE, GROQ_API_KEY
+    from .message_templates import get_template
+except ImportError:
+    from settings import DEMO_MODE, GROQ_API_KEY
+    from message_templates import get_template
 
-# Check if we're in demo mode
-DEMO_MODE = os.getenv("DEMO_MODE", "true").lower() == "true"
+# Sample usage profiles for demo mode: low mileage, safe driver, bundle candidate
+DEMO_USAGE_PROFILES = [
+    {"annual_mileage": 5400, "claims_count": 1, "app_sessions_90d": 2, "owns_home": False, "has_auto": True, "has_home": False},
+    {"annual_mileage": 12000, "claims_count": 0, "app_sessions_90d": 30, "owns_home": False, "has_auto": True, "has_home": False},
+    {"annual_mileage": 14000, "claims_count": 1, "app_sessions_90d": 3, "owns_home": True, "has_auto": True, "has_home": False},
+]
 
-# Initialize Groq client
-groq_api_key = os.getenv("GROQ_API_KEY")
-if not DEMO_MODE and groq_api_key:
-    client = Groq(api_key=groq_api_key)
-else:
-    client = None
+
+def anniversary_in_year(start, year: int) -> date:
+    """The anniversary of start in a given year; Feb 29 falls on Feb 28 in non-leap years"""
+    try:
+        return date(year, start.month, start.day)
+    except ValueError:
+        return date(year, 2, 28)
+
+
+def next_anniversary(start, today=None) -> date:
+    """
+    Next anniversary of start on or after today (leap-day safe).
+    
+    Args:
+        start: Date or datetime the policy started
+        today: Reference date (defaults to today)
+    
+    Returns:
+        Date of the next anniversary
+    """
+    today = today or date.today()
+    if isinstance(today, datetime):
+        today = today.date()
+
+    anniversary = anniversary_in_year(start, today.year)
+    if anniversary < today:
+        anniversary = anniversary_in_year(start, today.year + 1)
+    return anniversary
+
+
+def first_anniversary_on_or_after(start, today=None) -> date:
+    """
+    Next anniversary of a policy start that is worth celebrating: on or after
+    today, and never earlier than the first one (a policy started this year
+    has no anniversary yet).
+    """
+    return max(next_anniversary(start, today), anniversary_in_year(start, start.year + 1))
+
+
+def parse_renewal_date(value) -> date:
+    """
+    Renewal date from the stored string: "2025-06-15", or "June 2025" as written
+    by enrich_lead (taken as the 1st of the month). Returns None if unparseable.
+    """
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+
+    for fmt in ("%Y-%m-%d", "%B %Y"):
+        try:
+            return datetime.strptime(value.strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def next_renewal(renewal: date, today=None) -> date:
+    """Renewal on or after today - policies renew yearly, so a past date rolls forward a year at a time"""
+    today = today or date.today()
+    while renewal < today:
+        renewal = anniversary_in_year(renewal, renewal.year + 1)
+    return renewal
 
 
 def detect_occasions(lead_data: dict) -> list:
@@ -28,51 +92,46 @@ def detect_occasions(lead_data: dict) -> list:
         List of detected occasions
     """
     occasions = []
-    today = datetime.now()
+    today = datetime.now().date()
     
     # Check for policy anniversary
     if lead_data.get('created_at'):
         try:
-            policy_start = datetime.fromisoformat(lead_data['created_at'].replace('Z', '+00:00'))
-            years_with_company = (today - policy_start).days // 365
+            policy_start = datetime.fromisoformat(lead_data['created_at'].replace('Z', '+00:00')).date()
+        except (TypeError, ValueError) as e:
+            print(f"⚠️  Unparseable created_at {lead_data.get('created_at')!r}: {e}")
+            policy_start = None
+        
+        if policy_start:
+            # Leap-day safe (Feb 29 starts celebrate on Feb 28 in other years)
+            anniversary = first_anniversary_on_or_after(policy_start, today)
+            days_until = (anniversary - today).days
             
-            if years_with_company > 0:
-                # Calculate next anniversary
-                next_anniversary = policy_start.replace(year=today.year)
-                if next_anniversary < today:
-                    next_anniversary = next_anniversary.replace(year=today.year + 1)
-                
-                days_until = (next_anniversary - today).days
-                
-                if 0 <= days_until <= 30:  # Within 30 days
-                    occasions.append({
-                        'type': 'policy_anniversary',
-                        'years': years_with_company,
-                        'date': next_anniversary.isoformat(),
-                        'days_until': days_until,
-                        'priority': 'medium'
-                    })
-        except:
-            pass
+            if 0 <= days_until <= 30:  # Within 30 days
+                occasions.append({
+                    'type': 'policy_anniversary',
+                    'years': anniversary.year - policy_start.year,
+                    'date': anniversary.isoformat(),
+                    'days_until': days_until,
+                    'priority': 'medium'
+                })
     
     # Check for birthday (if we had birth date)
     # For demo, we'll simulate this
     
     # Check for renewal date
-    if lead_data.get('renewal_date'):
-        try:
-            renewal_date = datetime.strptime(lead_data['renewal_date'], '%Y-%m-%d')
-            days_until = (renewal_date - today).days
-            
-            if 0 <= days_until <= 60:  # Within 60 days
-                occasions.append({
-                    'type': 'policy_renewal',
-                    'date': renewal_date.isoformat(),
-                    'days_until': days_until,
-                    'priority': 'high' if days_until <= 30 else 'medium'
-                })
-        except:
-            pass
+    renewal_date = parse_renewal_date(lead_data.get('renewal_on') or lead_data.get('renewal_date'))
+    if renewal_date:
+        renewal_date = next_renewal(renewal_date, today)
+        days_until = (renewal_date - today).days
+        
+        if 0 <= days_until <= 60:  # Within 60 days
+            occasions.append({
+                'type': 'policy_renewal',
+                'date': renewal_date.isoformat(),
+                'days_until': days_until,
+                'priority': 'high' if days_until <= 30 else 'medium'
+            })
     
     return occasions
 
@@ -95,51 +154,17 @@ def generate_occasion_message(occasion_type: str, lead_data: dict, occasion_data
     print(f"\n🎉 Generating occasion message: {occasion_type}")
     
     # Always use detailed, empathetic messages
-    occasion_messages = {
-            "policy_anniversary": {
-                "message": f"🎉 Happy {occasion_data.get('years', 2)}-year anniversary with Solisa, {first_name}! We're so grateful to have you as part of our family. As a thank you for your loyalty, here's a special gift: $50 off your next renewal! You've been an amazing customer, and we look forward to many more years together. Cheers to you! 🥳",
-                "offer_type": "loyalty_discount",
-                "offer_value": 50,
-                "offer_description": "$50 off next renewal",
-                "action_required": False
-            },
-            "birthday": {
-                "message": f"🎂 Happy Birthday, {first_name}! We hope your day is filled with joy and celebration. As a birthday gift from us, enjoy free roadside assistance for the entire month! It's our way of saying thank you for being such a valued customer. Have a wonderful day! 🎈",
-                "offer_type": "free_service",
-                "offer_value": 0,
-                "offer_description": "Free roadside assistance for 1 month",
-                "action_required": False
-            },
-            "policy_renewal": {
-                "message": f"Hi {first_name}, your policy renewal is coming up in {occasion_data.get('days_until', 30)} days. Before you renew, I wanted to check in - are you still happy with your coverage? Sometimes life changes, and your insurance should too. I'm here if you'd like to review your policy or explore any updates. No pressure, just want to make sure you're getting the best value! 😊",
-                "offer_type": "policy_review",
-                "offer_value": 0,
-                "offer_description": "Complimentary policy review",
-                "action_required": True
-            },
-            "usage_based_savings": {
-                "message": f"Hi {first_name}, I noticed something interesting - you're driving about 40% less than the average policyholder! That's great for the environment and your wallet. Have you considered switching to our pay-per-mile plan? Based on your driving, you could save around $340 per year. Want to learn more? No obligation, just thought you'd like to know! 🚗",
-                "offer_type": "plan_switch",
-                "offer_value": 340,
-                "offer_description": "Save $340/year with pay-per-mile",
-                "action_required": True
-            },
-            "holiday_season": {
-                "message": f"Happy Holidays, {first_name}! 🎄 As we wrap up the year, I wanted to reach out and say thank you for being such a wonderful customer. If you're planning any holiday travel, remember you have 24/7 roadside assistance. Safe travels and warm wishes to you and your family! ❄️",
-                "offer_type": "reminder",
-                "offer_value": 0,
-                "offer_description": "Holiday travel reminder",
-                "action_required": False
-            }
-        }
-    
-    return occasion_messages.get(occasion_type, {
-        "message": f"Hi {first_name}, just checking in to see how everything is going with your policy. I'm here if you need anything!",
-        "offer_type": "check_in",
-        "offer_value": 0,
-        "offer_description": "Customer check-in",
-        "action_required": False
-    })
+    occasion_data = occasion_data or {}
+    template = get_template(f"occasion.{occasion_type}", default="occasion.default")
+    
+    return {
+        "message": template.render(
+            first_name=first_name,
+            years=occasion_data.get('years', 2),
+            days_until=occasion_data.get('days_until', 30)
+        ),
+        **template.metadata
+    }
 
 
 def analyze_usage_patterns(lead_data: dict) -> dict:
@@ -152,52 +177,26 @@ def analyze_usage_patterns(lead_data: dict) -> dict:
     Returns:
         Dict with usage analysis and recommendations
     """
-    
-    # Demo mode - simulate usage analysis
-    if DEMO_MODE or not client:
+    # numpy is only loaded once usage is analyzed (keeps it out of the API's import time)
+    try:
+        from .usage_analysis import analyze_usage, FEATURES as USAGE_FEATURES, STANDARD_PATTERN
+    except ImportError:
+        from usage_analysis import analyze_usage, FEATURES as USAGE_FEATURES, STANDARD_PATTERN
+    
+    # Real usage data when we have it
+    if any(lead_data.get(name) is not None for name in USAGE_FEATURES):
+        return analyze_usage(lead_data)
+    
+    # Demo mode - a stable sample profile per customer, run through the same rules
+    if DEMO_MODE or not GROQ_API_KEY:
         print("\n🎭 DEMO MODE - Analyzing usage patterns")
         
-        # Simulate different usage patterns
-        import random
-        
-        patterns = [
-            {
-                "pattern_type": "low_mileage",
-                "current_usage": "60% below average",
-                "recommendation": "pay_per_mile",
-                "potential_savings": 340,
-                "confidence": 0.85,
-                "message": "Customer drives significantly less than average - perfect candidate for pay-per-mile"
-            },
-            {
-                "pattern_type": "high_engagement",
-                "current_usage": "Uses app regularly, no claims",
-                "recommendation": "safe_driver_discount",
-                "potential_savings": 120,
-                "confidence": 0.90,
-                "message": "Excellent driving record and high engagement - eligible for safe driver discount"
-            },
-            {
-                "pattern_type": "bundle_opportunity",
-                "current_usage": "Auto only, owns home",
-                "recommendation": "home_auto_bundle",
-                "potential_savings": 400,
-                "confidence": 0.75,
-                "message": "Customer owns home but only has auto insurance - bundle opportunity"
-            }
-        ]
-        
-        return random.choice(patterns)
+        key = str(lead_data.get('id') or lead_data.get('email') or '')
+        profile = DEMO_USAGE_PROFILES[zlib.crc32(key.encode()) % len(DEMO_USAGE_PROFILES)]
+        return analyze_usage(profile)
     
-    # Real AI analysis would go here
-    return {
-        "pattern_type": "standard",
-        "current_usage": "Average",
-        "recommendation": None,
-        "potential_savings": 0,
-        "confidence": 0.5,
-        "message": "Standard usage pattern"
-    }
+    # No usage data available
+    return dict(STANDARD_PATTERN)
 
 
 def generate_occasion_action(occasion_type: str, lead_data: dict, occasion_data: dict = None) -> dict:
@@ -0,0 +1,84 @@
+"""
+Lazily constructed, shared clients for external services.
+
+SDKs are imported and clients built the first time a client is asked for,
+not at import, so starting a worker doesn't pay for services it may never
+call. Each client is built once per process and shared. Factories return
+None when the service isn't configured (or is stubbed by demo mode).
+
+    client = get_provider("groq")
+    set_provider("groq", stand_in_client)  # tests and load tests
+"""
+import threading
+
+try:
+    from . import settings
+except ImportError:
+    import settings
+
+_factories = {}
+_instances = {}
+_lock = threading.Lock()
+
+
+def register_provider(name: str, factory):
+    """Register (or replace) the factory building a named client"""
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+    return factory
+
+
+def provider(name: str):
+    """Decorator form of register_provider"""
+    return lambda factory: register_provider(name, factory)
+
+
+def get_provider(name: str):
+    """The shared client for a service, built on first use (None if unavailable)"""
+    try:
+        return _instances[name]
+    except KeyError:
+        pass
+
+    with _lock:
+        if name not in _instances:
+            _instances[name] = _factories[name]()
+        return _instances[name]
+
+
+def set_provider(name: str, instance):
+    """Use a given client for a service (e.g. a stub or stand-in)"""
+    with _lock:
+        _instances[name] = instance
+
+
+def reset_providers(*names: str):
+    """Drop built clients so they are rebuilt on next use (all if no names given)"""
+    with _lock:
+        for name in names or list(_instances):
+            _instances.pop(name, None)
+
+
+@provider("groq")
+def _groq_client():
+    if settings.LLM_DEMO_MODE or not settings.GROQ_API_KEY:
+        return None
+    from groq import Groq
+    return Groq(api_key=settings.GROQ_API_KEY, base_url=settings.GROQ_BASE_URL)
+
+
+@provider("twilio")
+def _twilio_client():
+    if settings.DEMO_MODE or not (settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN):
+        return None
+    from twilio.rest import Client
+    return Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+
+
+@provider("sendgrid")
+def _sendgrid_client():
+    if settings.DEMO_MODE or not settings.SENDGRID_API_KEY:
+        return None
+    from sendgrid import SendGridAPIClient
+    return SendGridAPIClient(settings.SENDGRID_API_KEY)
@@ -0,0 +1,176 @@
+"""
+Per-request SQL query accounting.
+
+Every statement run on the engine is counted against the request that issued
+it (tracked with a contextvar set by QueryAccountingMiddleware). With
+QUERY_DEBUG=true responses carry X-DB-Query-Count and X-DB-Time-ms headers,
+and statements slower than SLOW_QUERY_MS are logged with their parameters and
+the endpoint that ran them.
+
+count_queries() counts everything run on the engine inside a block, for
+catching N+1 regressions in CI:
+
+    with count_queries() as queries:
+        client.get("/api/occasions")
+    assert queries.count <= 3, queries.statements
+"""
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from sqlalchemy import event
+
+QUERY_DEBUG = os.getenv("QUERY_DEBUG", "false").lower() == "true"
+
+# Statements slower than this are logged (0 disables the log)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))
+
+# Longest parameter repr included in a slow-query log line
+SLOW_QUERY_MAX_PARAMS_CHARS = 500
+
+
+class QueryStats:
+    """Query count and total DB time for one request (or one count_queries block)"""
+    __slots__ = ("count", "seconds", "scope", "statements")
+
+    def __init__(self, scope: dict = None, keep_statements: bool = False):
+        self.count = 0
+        self.seconds = 0.0
+        self.scope = scope
+        self.statements = [] if keep_statements else None
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000
+
+    @property
+    def endpoint(self) -> str:
+        """METHOD /route/template of the request, resolved once routing has run"""
+        if self.scope is None:
+            return "background"
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', self.scope['path'])}"
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        if self.statements is not None:
+            self.statements.append(statement)
+
+
+_current_request: ContextVar = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> QueryStats:
+    """Stats of the request being handled, or None outside a request"""
+    return _current_request.get()
+
+
+def _format_parameters(parameters, executemany: bool) -> str:
+    if executemany:
+        text = f"{len(parameters)} rows, first={parameters[0]!r}" if parameters else "0 rows"
+    else:
+        text = repr(parameters)
+    if len(text) > SLOW_QUERY_MAX_PARAMS_CHARS:
+        text = text[:SLOW_QUERY_MAX_PARAMS_CHARS] + "..."
+    return text
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = perf_counter() - conn.info["query_started"].pop()
+
+    stats = _current_request.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        endpoint = stats.endpoint if stats is not None else "background"
+        print(f"🐢 Slow query ({elapsed * 1000:.1f} ms) in {endpoint}: {' '.join(statement.split())} "
+              f"-- params: {_format_parameters(parameters, executemany)}")
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def instrument_queries(engine):
+    """Attach query accounting to an engine (idempotent)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def count_queries(bind=None):
+    """
+    Count every statement run on an engine inside the block, from any thread.
+
+    Args:
+        bind: Engine to watch (defaults to the app's engine)
+
+    Yields:
+        QueryStats with count, seconds and the executed statements
+    """
+    if bind is None:
+        try:
+            from .database import engine as bind
+        except ImportError:
+            from database import engine as bind
+
+    stats = QueryStats(keep_statements=True)
+    started = {}
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        started[id(cursor)] = perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        stats.record(statement, perf_counter() - started.pop(id(cursor), perf_counter()))
+
+    event.listen(bind, "before_cursor_execute", before)
+    event.listen(bind, "after_cursor_execute", after)
+    try:
+        yield stats
+    finally:
+        event.remove(bind, "before_cursor_execute", before)
+        event.remove(bind, "after_cursor_execute", after)
+
+
+class QueryAccountingMiddleware:
+    """
+    ASGI middleware giving each request its own QueryStats.
+
+    Sync endpoints and dependencies run in a threadpool with a copy of the
+    request's context, so their queries land on the same QueryStats.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current_request.set(stats)
+
+        async def send_with_headers(message):
+            if QUERY_DEBUG and message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.milliseconds:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_request.reset(token)
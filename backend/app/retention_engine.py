@@ -1,20 +1,16 @@
-import os
 import json
-from groq import Groq
-from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
-load_dotenv()
-
-# Check if we're in demo mode
-DEMO_MODE = os.getenv("DEMO_MODE", "true").lower() == "true"
-
-# Initialize Groq client
-groq_api_key = os.getenv("GROQ_API_KEY")
-if not DEMO_MODE and groq_api_key:
-    client = Groq(api_key=groq_api_key)
-else:
-    client = None
+try:
+    from .settings import LLM_DEMO_MODE
+    from .providers import get_provider
+    from .message_templates import get_template
+    from .metrics import span
+except ImportError:
+    from settings import LLM_DEMO_MODE
+    from providers import get_provider
+    from message_templates import get_template
+    from metrics import span
 
 
 def calculate_policy_health_score(lead_data: dict, touchpoints: list = None, life_events: list = None) -> dict:
@@ -111,15 +107,17 @@ SCORING GUIDELINES:
 Return ONLY the JSON, no other text."""
 
     # Use AI to calculate score
+    client = get_provider("groq")
     if client:
         try:
             print("📊 Analyzing customer data with AI...")
-            response = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                max_tokens=1000,
-                temperature=0.3,  # Lower temperature for consistent scoring
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with span("llm", "calculate_policy_health_score"):
+                response = client.chat.completions.create(
+                    model="llama-3.3-70b-versatile",
+                    max_tokens=1000,
+                    temperature=0.3,  # Lower temperature for consistent scoring
+                    messages=[{"role": "user", "content": prompt}]
+                )
             
             # Parse AI response
             result = json.loads(response.choices[0].message.content)
@@ -215,40 +213,15 @@ def analyze_life_event(event_type: str, lead_data: dict) -> dict:
     
     first_name = lead_data.get('full_name', '').split()[0] if lead_data.get('full_name') else 'there'
     
-    # Define opportunities for each life event type (EXACT SPEC)
-    opportunities = {
-        "new_baby": {
-            "opportunity_type": "upsell",
-            "recommended_product": "umbrella_insurance",
-            "estimated_value": 25,  # $25/month
-            "message": f"🎉 Congrats on the new baby, {first_name}! As your family grows, have you thought about umbrella insurance? It adds an extra layer of liability protection beyond your regular policies. Would love to send you a quick quote — just let me know!"
-        },
-        "home_reno": {
-            "opportunity_type": "upsell",
-            "recommended_product": "flood_coverage",
-            "estimated_value": 35,  # $35/month
-            "message": f"🏡 Congrats on the new home, {first_name}! Have you thought about adding flood coverage? It's not included in standard policies but can be a lifesaver. Want me to send over a quote?"
-        },
-        "teen_driver": {
-            "opportunity_type": "upsell",
-            "recommended_product": "auto_upgrade",
-            "estimated_value": 75,  # $75/month
-            "message": f"🚗 Hey {first_name}, congrats on the teen driver! That's a big milestone. We have great coverage options for young drivers, including accident forgiveness. Want to review your policy to make sure you're covered?"
-        },
-        "job_change": {
-            "opportunity_type": "retention",
-            "recommended_product": "policy_review",
-            "estimated_value": 0,
-            "message": f"💼 Congrats on the new job, {first_name}! Life changes can affect your insurance needs. Want to do a quick policy review to make sure everything still fits?"
-        }
-    }
+    # Opportunities for each life event type (EXACT SPEC) live in message_templates
+    template = get_template(f"life_event.{event_type}", default="life_event.default")
     
-    return opportunities.get(event_type, {
-        "opportunity_type": "retention",
-        "recommended_product": "policy_review",
-        "estimated_value": 0,
-        "message": f"Hi {first_name}, I wanted to check in and see how things are going. Let me know if there's anything I can help with!"
-    })
+    return {
+        "opportunity_type": template.metadata["opportunity_type"],
+        "recommended_product": template.metadata["recommended_product"],
+        "estimated_value": template.metadata["estimated_value"],
+        "message": template.render(first_name=first_name)
+    }
 
 
 def generate_retention_action(life_event_data: dict, lead_data: dict, policy_health: dict) -> dict:
@@ -295,7 +268,7 @@ def process_customer_response(response_text: str, life_event_id: int, lead_data:
     """
     
     # Demo mode - robust intent detection
-    if DEMO_MODE or not client:
+    if LLM_DEMO_MODE or not get_provider("groq"):
         print(f"\n🎭 DEMO MODE - Processing customer response: {response_text}")
         
         # Clean and normalize response
@@ -0,0 +1,154 @@
+from sqlalchemy import event, select, insert, delete, exists, case
+
+try:
+    from .models import Lead, PolicyHealth, LatestPolicyHealth
+except ImportError:
+    from models import Lead, PolicyHealth, LatestPolicyHealth
+
+CHURN_RISKS = ("low", "medium", "high")
+PRIORITIES = ("critical", "high", "medium", "low")
+
+# Columns copied from a lead's latest PolicyHealth record
+LATEST_HEALTH_FIELDS = (
+    "health_score", "churn_risk", "churn_probability", "days_to_predicted_churn",
+    "engagement_score", "satisfaction_score", "usage_score", "payment_score",
+    "priority", "calculated_at",
+)
+
+_priority_rank = case(
+    {priority: rank for rank, priority in enumerate(PRIORITIES)},
+    value=LatestPolicyHealth.priority,
+    else_=len(PRIORITIES)
+)
+
+# sort key -> ORDER BY (lead_id breaks ties so pages are stable)
+WORKLIST_SORTS = {
+    "score": (LatestPolicyHealth.health_score.asc(),),  # least healthy first
+    "-score": (LatestPolicyHealth.health_score.desc(),),
+    "churn_probability": (LatestPolicyHealth.churn_probability.asc(),),
+    "-churn_probability": (LatestPolicyHealth.churn_probability.desc(),),
+    "priority": (_priority_rank.asc(), LatestPolicyHealth.health_score.asc()),  # critical first
+    "calculated_at": (LatestPolicyHealth.calculated_at.asc(),),  # stalest score first
+    "-calculated_at": (LatestPolicyHealth.calculated_at.desc(),),
+}
+
+# Outer PolicyHealth of the correlated "newest record per lead" subquery
+_history = PolicyHealth.__table__.alias("history")
+
+
+def refresh_latest_health(connection, lead_ids) -> None:
+    """
+    Rebuild the latest-health rows of some leads from their PolicyHealth history
+    (the newest calculated_at wins, the highest id among equals).
+
+    Runs on a Connection or Session; callers commit.
+    """
+    if isinstance(lead_ids, int):
+        lead_ids = [lead_ids]
+    lead_ids = list(lead_ids)
+    if not lead_ids:
+        return
+
+    newest = (
+        select(PolicyHealth.id)
+        .where(PolicyHealth.lead_id == _history.c.lead_id)
+        .order_by(PolicyHealth.calculated_at.desc(), PolicyHealth.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    connection.execute(delete(LatestPolicyHealth).where(LatestPolicyHealth.lead_id.in_(lead_ids)))
+    connection.execute(insert(LatestPolicyHealth).from_select(
+        ("lead_id", "policy_health_id") + LATEST_HEALTH_FIELDS,
+        select(_history.c.lead_id, _history.c.id, *(_history.c[name] for name in LATEST_HEALTH_FIELDS))
+        .where(_history.c.lead_id.in_(lead_ids), _history.c.id == newest)
+    ))
+
+
+@event.listens_for(PolicyHealth, "after_insert")
+def _record_latest_health(mapper, connection, policy_health):
+    refresh_latest_health(connection, policy_health.lead_id)
+
+
+def retention_worklist(db, churn_risks=None, priorities=None, min_score: int = None, max_score: int = None,
+                       sort: str = "score", limit: int = 100, offset: int = 0) -> dict:
+    """
+    Leads by their latest policy health, for triaging retention work.
+
+    Args:
+        churn_risks: Only these churn risks (all by default)
+        priorities: Only these priorities (all by default)
+        min_score, max_score: Inclusive health score bounds
+        sort: A WORKLIST_SORTS key
+
+    Returns:
+        Dict with the page of items and paging info
+    """
+    filters = []
+    if churn_risks:
+        filters.append(LatestPolicyHealth.churn_risk.in_(churn_risks))
+    if priorities:
+        filters.append(LatestPolicyHealth.priority.in_(priorities))
+    if min_score is not None:
+        filters.append(LatestPolicyHealth.health_score >= min_score)
+    if max_score is not None:
+        filters.append(LatestPolicyHealth.health_score <= max_score)
+
+    rows = db.execute(
+        select(LatestPolicyHealth, Lead.full_name, Lead.email, Lead.phone, Lead.insurance_type, Lead.status)
+        .join(Lead, Lead.id == LatestPolicyHealth.lead_id)
+        .where(*filters)
+        .order_by(*WORKLIST_SORTS[sort], LatestPolicyHealth.lead_id.asc())
+        .limit(limit + 1)
+        .offset(offset)
+    ).all()
+
+    items = []
+    for row in rows[:limit]:
+        item = row.LatestPolicyHealth.to_dict()
+        item.update(full_name=row.full_name, email=row.email, phone=row.phone,
+                    insurance_type=row.insurance_type, status=row.status)
+        items.append(item)
+
+    return {
+        "sort": sort,
+        "items": items,
+        "limit": limit,
+        "offset": offset,
+        "has_more": len(rows) > limit
+    }
+
+
+def backfill_latest_health(db, batch_size: int = 5000) -> int:
+    """
+    Create latest-health rows for leads with PolicyHealth records but none
+    (records from before the table existed, or bulk-loaded without the ORM).
+
+    Returns:
+        Number of leads filled in
+    """
+    filled = 0
+    last_id = 0
+    has_latest = exists().where(LatestPolicyHealth.lead_id == PolicyHealth.lead_id)
+
+    while True:
+        lead_ids = db.execute(
+            select(PolicyHealth.lead_id)
+            .where(PolicyHealth.lead_id > last_id, ~has_latest)
+            .group_by(PolicyHealth.lead_id)
+            .order_by(PolicyHealth.lead_id.asc())
+            .limit(batch_size)
+        ).scalars().all()
+
+        if not lead_ids:
+            break
+
+        refresh_latest_health(db, lead_ids)
+        db.commit()
+
+        filled += len(lead_ids)
+        last_id = lead_ids[-1]
+
+    if filled:
+        print(f"🛠️  Built latest policy health for {filled} leads")
+
+    return filled
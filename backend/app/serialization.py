@@ -0,0 +1,119 @@
+"""
+Fast path for large list endpoints.
+
+The ORM path builds a model object per row, turns it into a dict with
+to_dict() and, with a response_model, has FastAPI validate and re-serialize
+every dict before json.dumps. List endpoints here instead select plain rows
+with a Core select, convert dates in place and hand the dicts to
+FastJSONResponse, which encodes them with orjson (json from the standard
+library when orjson isn't installed). The JSON is byte-for-byte what the ORM
+path returns - benchmarks/bench_serialization.py checks it.
+"""
+from sqlalchemy import select, Date, DateTime
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from .models import Lead, LifeEvent, Occasion
+except ImportError:
+    from models import Lead, LifeEvent, Occasion
+
+# Lead fields of LeadResponse (the /api/leads response model), in its order
+LEAD_LIST_FIELDS = (
+    "id", "full_name", "email", "phone", "insurance_type", "current_provider",
+    "life_stage", "estimated_age_range", "pain_points", "estimated_savings", "renewal_date", "profile",
+    "sms_sent", "sms_sent_at", "sms_content", "email_sent", "email_sent_at", "email_subject", "email_content",
+    "booking_confirmed", "booking_confirmed_at", "status", "created_at", "updated_at",
+)
+
+# Fields of LifeEvent.to_dict() / Occasion.to_dict(), in their order
+LIFE_EVENT_FIELDS = (
+    "id", "lead_id", "event_type", "event_date", "description", "source",
+    "opportunity_type", "recommended_product", "estimated_value",
+    "action_taken", "action_type", "action_content", "customer_response", "outcome",
+    "created_at", "updated_at",
+)
+OCCASION_FIELDS = (
+    "id", "lead_id", "campaign_id", "occasion_type", "occasion_date", "description",
+    "offer_type", "offer_value", "offer_description",
+    "action_taken", "action_type", "action_content", "customer_response", "outcome",
+    "created_at", "updated_at",
+)
+
+# Lead contact columns the cross-lead lists add to each row
+LEAD_CONTACT_COLUMNS = (
+    Lead.full_name.label("lead_name"),
+    Lead.email.label("lead_email"),
+    Lead.phone.label("lead_phone"),
+)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse with orjson encoding.
+
+    Same bytes as JSONResponse for the dicts, lists, strings, numbers, booleans
+    and None the list endpoints return (compact separators, UTF-8 text).
+    """
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(content)
+
+
+def columns(model, fields: tuple) -> list:
+    """Table columns of a model for the given field names"""
+    return [model.__table__.c[name] for name in fields]
+
+
+def fetch_dicts(db, statement) -> list:
+    """
+    Run a Core select and return its rows as dicts.
+
+    Date and datetime values become ISO strings, as in the models' to_dict().
+    """
+    temporal = [column.key for column in statement.selected_columns if isinstance(column.type, (Date, DateTime))]
+
+    rows = [dict(row) for row in db.execute(statement).mappings()]
+    for row in rows:
+        for key in temporal:
+            value = row[key]
+            if value is not None:
+                row[key] = value.isoformat()
+    return rows
+
+
+def _with_lead_contact(rows: list) -> list:
+    # Rows whose lead is missing carry no lead keys at all (like the ORM path)
+    for row in rows:
+        if row["lead_name"] is None:
+            del row["lead_name"], row["lead_email"], row["lead_phone"]
+    return rows
+
+
+def lead_list(db) -> list:
+    """All leads as LeadResponse dicts, newest first"""
+    return fetch_dicts(db, select(*columns(Lead, LEAD_LIST_FIELDS)).order_by(Lead.created_at.desc()))
+
+
+def life_event_list(db) -> list:
+    """All life events with their lead's name, email and phone, newest first"""
+    return _with_lead_contact(fetch_dicts(db, (
+        select(*columns(LifeEvent, LIFE_EVENT_FIELDS), *LEAD_CONTACT_COLUMNS)
+        .outerjoin(Lead, Lead.id == LifeEvent.lead_id)
+        .order_by(LifeEvent.created_at.desc())
+    )))
+
+
+def occasion_list(db) -> list:
+    """All occasions with their lead's name, email and phone, newest first"""
+    return _with_lead_contact(fetch_dicts(db, (
+        select(*columns(Occasion, OCCASION_FIELDS), *LEAD_CONTACT_COLUMNS)
+        .outerjoin(Lead, Lead.id == Occasion.lead_id)
+        .order_by(Occasion.created_at.desc())
+    )))
@@ -0,0 +1,83 @@
+"""
+Multi-worker entry point.
+
+    python serve.py --workers 4              # uvicorn worker processes
+    gunicorn -c gunicorn.conf.py main:app    # or gunicorn managing uvicorn workers
+
+Tables are migrated and startup maintenance (backfills, pausing campaigns left
+running, the webhook inbox) runs once here before any worker starts; workers
+then run with AUTO_MIGRATE=false and STARTUP_MAINTENANCE=false. With more than
+one worker STATE_BACKEND defaults to sqlite, so caches, the scheduler and inbox
+leases and campaign send rates are shared by all workers.
+
+    python serve.py --prepare-only           # just the migration + maintenance step
+"""
+import os
+import sys
+import argparse
+
+# Worker processes (same variable gunicorn and most PaaS hosts use)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+
+
+def configure_workers(workers: int):
+    """
+    Environment for a deployment with this many workers.
+
+    Must run before the app modules are imported (they read it at import).
+    """
+    if workers <= 1:
+        return
+
+    os.environ.setdefault("STATE_BACKEND", "sqlite")
+    if os.environ["STATE_BACKEND"].lower() == "memory":
+        print(f"⚠️  {workers} workers with STATE_BACKEND=memory - caches and rate limits are per worker")
+
+
+def prepare_deployment():
+    """Create/upgrade tables and run startup maintenance once for all workers"""
+    try:
+        from .settings import DATABASE_URL
+        from .database import init_db, engine
+        from .main import run_startup_maintenance
+    except ImportError:
+        from settings import DATABASE_URL
+        from database import init_db, engine
+        from main import run_startup_maintenance
+
+    init_db()
+    if DATABASE_URL.startswith("sqlite"):
+        # Readers don't block the writer (persists in the database file)
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    run_startup_maintenance()
+    engine.dispose()
+
+    os.environ["AUTO_MIGRATE"] = "false"
+    os.environ["STARTUP_MAINTENANCE"] = "false"
+    print("✅ Deployment prepared - workers skip migrations and startup maintenance")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the API with several worker processes")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--prepare-only", action="store_true", help="migrate and run startup maintenance, then exit")
+    args = parser.parse_args()
+
+    configure_workers(args.workers)
+
+    if args.prepare_only:
+        prepare_deployment()
+        sys.exit(0)
+
+    import uvicorn
+
+    if args.workers <= 1:
+        # One process: the app's own startup migrates and runs maintenance
+        uvicorn.run("main:app", host=args.host, port=args.port)
+    else:
+        prepare_deployment()
+        # Workers are spawned fresh and read the environment set above
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
@@ -0,0 +1,46 @@
+"""
+Settings shared across modules, read from the environment once.
+
+.env is loaded here and nowhere else; modules import what they need from this
+module (module-specific tunables stay next to the code they tune and are read
+after this module has been imported).
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def env_flag(name: str, default: str = "false") -> bool:
+    """Boolean environment variable ("true" in any case is true)"""
+    return os.getenv(name, default).lower() == "true"
+
+
+# Demo mode: template messages, console "sends", local enrichment
+DEMO_MODE = env_flag("DEMO_MODE", "true")
+
+# AI calls can run (e.g. against the local LLM stand-in) while sends stay in demo mode
+LLM_DEMO_MODE = env_flag("LLM_DEMO_MODE", str(DEMO_MODE))
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./solisa.db")
+
+# Create/upgrade tables when the app starts (turn off when migrations run as a separate step)
+AUTO_MIGRATE = env_flag("AUTO_MIGRATE", "true")
+
+# Backfills and recovery of work interrupted by the last shutdown at startup
+# (the multi-worker entry points run them once before starting workers)
+STARTUP_MAINTENANCE = env_flag("STARTUP_MAINTENANCE", "true")
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+# Groq/OpenAI-compatible endpoint (defaults to api.groq.com)
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+
+TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
+TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
+
+SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
+SENDGRID_FROM_EMAIL = os.getenv("SENDGRID_FROM_EMAIL", "alex@solisa.com")
+
+CALENDLY_LINK = os.getenv("CALENDLY_LINK", "https://calendly.com/solisa-demo/30min")
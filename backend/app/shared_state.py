@@ -0,0 +1,346 @@
+"""
+Caches, leases and rate limiters with pluggable backends.
+
+STATE_BACKEND picks where the state lives:
+  - memory: in this process (the default - right for a single worker)
+  - sqlite: a SQLite file shared by every worker on the host (STATE_PATH), so
+    caches are shared, a lease is held by one worker at a time and rate
+    limits apply across workers
+
+    cache = get_cache("enrichment")
+    cache.set("person:ana@example.com", {"job_title": "Owner"}, ttl_seconds=3600)
+
+    lease = get_lease("followup-scheduler")
+    if lease.acquire(ttl_seconds=90):
+        ...  # only one worker gets here until the lease expires or is released
+
+Values in the sqlite backend are pickled, so they come back with the same types
+as in the memory backend. Leases expire on their own, so a worker that dies
+while holding one only blocks the others until its TTL runs out.
+"""
+import os
+import time
+import uuid
+import itertools
+import pickle
+import sqlite3
+import threading
+
+STATE_BACKENDS = ("memory", "sqlite")
+
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+
+# Shared state file for the sqlite backend (local disk - every worker must see the same file)
+STATE_PATH = os.getenv("STATE_PATH", "./solisa_state.db")
+
+# Every this many writes to the sqlite cache, expired rows are deleted (reads skip them either way)
+CACHE_PURGE_EVERY = int(os.getenv("STATE_CACHE_PURGE_EVERY", "500"))
+
+# Tokens a worker takes from a shared rate limit per transaction (capped at the bucket size)
+RATE_LIMIT_BATCH = int(os.getenv("STATE_RATE_LIMIT_BATCH", "10"))
+
+if STATE_BACKEND not in STATE_BACKENDS:
+    raise ValueError(f"STATE_BACKEND must be one of {STATE_BACKENDS}, got {STATE_BACKEND!r}")
+
+# True when state is shared between worker processes
+SHARED = STATE_BACKEND != "memory"
+
+_MISSING = object()
+
+
+class RateLimiter:
+    """
+    Token bucket shared by send threads: at most `rate` acquisitions per second,
+    with bursts up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate or self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class MemoryCache:
+    """TTL cache in this process"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            return default
+
+    def set(self, key: str, value, ttl_seconds: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_memory_leases = {}
+_memory_leases_lock = threading.Lock()
+
+
+class MemoryLease:
+    """Lease held by one Lease object (thread) of this process at a time"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.owner = uuid.uuid4().hex
+
+    def acquire(self, ttl_seconds: float) -> bool:
+        """Take or renew the lease; False if someone else holds it"""
+        now = time.monotonic()
+        with _memory_leases_lock:
+            holder = _memory_leases.get(self.name)
+            if holder and holder[0] != self.owner and holder[1] > now:
+                return False
+            _memory_leases[self.name] = (self.owner, now + ttl_seconds)
+            return True
+
+    def release(self):
+        with _memory_leases_lock:
+            holder = _memory_leases.get(self.name)
+            if holder and holder[0] == self.owner:
+                del _memory_leases[self.name]
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS cache (namespace TEXT, key TEXT, value BLOB, expires_at REAL, PRIMARY KEY (namespace, key))",
+    "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)",
+    "CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT, expires_at REAL)",
+    "CREATE TABLE IF NOT EXISTS rate_limits (name TEXT PRIMARY KEY, tokens REAL, updated_at REAL)",
+)
+
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
+
+def _connect(path: str = None) -> sqlite3.Connection:
+    """
+    New connection to the state file (autocommit - writes use BEGIN IMMEDIATE).
+
+    Connections are opened per operation, so nothing is shared across threads
+    or inherited by forked workers.
+    """
+    path = path or STATE_PATH
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    if path not in _schema_ready:
+        with _schema_lock:
+            if path not in _schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                _schema_ready.add(path)
+    return conn
+
+
+def purge_expired_cache(path: str = None) -> int:
+    """
+    Delete expired cache rows from the state file (every namespace).
+
+    Returns:
+        Number of rows deleted
+    """
+    conn = _connect(path)
+    try:
+        return conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
+    finally:
+        conn.close()
+
+
+_cache_writes = itertools.count(1)
+
+
+class SqliteCache:
+    """TTL cache in the shared state file (one namespace per cache)"""
+
+    def __init__(self, namespace: str, path: str = None):
+        self.namespace = namespace
+        self.path = path
+
+    def get(self, key: str, default=None):
+        conn = _connect(self.path)
+        try:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.namespace, key, time.time())
+            ).fetchone()
+        finally:
+            conn.close()
+        return pickle.loads(row[0]) if row else default
+
+    def set(self, key: str, value, ttl_seconds: float):
+        conn = _connect(self.path)
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, pickle.dumps(value), time.time() + ttl_seconds)
+            )
+        finally:
+            conn.close()
+
+        # Expired rows are never read again; clear them out now and then so the file doesn't grow
+        if CACHE_PURGE_EVERY > 0 and next(_cache_writes) % CACHE_PURGE_EVERY == 0:
+            purge_expired_cache(self.path)
+
+    def delete(self, key: str):
+        conn = _connect(self.path)
+        try:
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+        finally:
+            conn.close()
+
+    def clear(self):
+        conn = _connect(self.path)
+        try:
+            conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+        finally:
+            conn.close()
+
+
+class SqliteLease:
+    """Lease held by one worker process (and one Lease object in it) at a time"""
+
+    def __init__(self, name: str, path: str = None):
+        self.name = name
+        self.path = path
+        self._token = uuid.uuid4().hex
+
+    @property
+    def owner(self) -> str:
+        # The pid keeps objects created before a fork from sharing an owner
+        return f"{os.getpid()}:{self._token}"
+
+    def acquire(self, ttl_seconds: float) -> bool:
+        """Take or renew the lease; False if another owner holds it"""
+        now = time.time()
+        conn = _connect(self.path)
+        try:
+            cursor = conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                (self.name, self.owner, now + ttl_seconds, now)
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def release(self):
+        conn = _connect(self.path)
+        try:
+            conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (self.name, self.owner))
+        finally:
+            conn.close()
+
+
+class SqliteRateLimiter:
+    """
+    Token bucket in the shared state file: `rate` acquisitions per second across all workers.
+
+    Tokens are taken from the bucket up to RATE_LIMIT_BATCH at a time and handed
+    out locally, so most acquisitions don't touch the file. Tokens left unused
+    for a second go back unused rather than allowing a late burst.
+    """
+
+    # Local tokens older than this are dropped
+    RESERVE_SECONDS = 1.0
+
+    def __init__(self, name: str, rate: float, burst: int = None, path: str = None):
+        self.name = name
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.batch = max(1, min(RATE_LIMIT_BATCH, self.capacity))
+        self.path = path
+        self._reserved = 0
+        self._reserved_at = 0.0
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Reserve up to `batch` tokens from the shared bucket; seconds to wait if none are left"""
+        conn = _connect(self.path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated_at FROM rate_limits WHERE name = ?", (self.name,)).fetchone()
+            tokens = self.capacity if row is None else min(self.capacity, row[0] + (now - row[1]) * self.rate)
+            taken = min(self.batch, int(tokens))
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (self.name, tokens - taken, now)
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        if not taken:
+            return (1 - tokens) / self.rate
+        self._reserved = taken
+        self._reserved_at = time.monotonic()
+        return 0
+
+    def acquire(self):
+        if not self.rate or self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                if self._reserved and time.monotonic() - self._reserved_at > self.RESERVE_SECONDS:
+                    self._reserved = 0
+                wait = 0 if self._reserved else self._take()
+                if not wait:
+                    self._reserved -= 1
+                    return
+            time.sleep(wait)
+
+
+_memory_caches = {}
+
+
+def get_cache(namespace: str):
+    """Cache for a namespace on the configured backend"""
+    if SHARED:
+        return SqliteCache(namespace)
+    return _memory_caches.setdefault(namespace, MemoryCache())
+
+
+def get_lease(name: str):
+    """A new lease handle (its own owner) for a named lease on the configured backend"""
+    if SHARED:
+        return SqliteLease(name)
+    return MemoryLease(name)
+
+
+def get_rate_limiter(name: str, rate: float, burst: int = None):
+    """Rate limiter on the configured backend (shared limiters with the same name share one bucket)"""
+    if SHARED:
+        return SqliteRateLimiter(name, rate, burst)
+    return RateLimiter(rate, burst)
@@ -0,0 +1,260 @@
+"""
+Vectorized synthetic lead generation for load tests and demo datasets.
+
+Draws the same fields as enrich_lead (from the same LIFE_STAGES, PAIN_POINTS,
+PROVIDERS and AGE_RANGES tables) for N leads at once with NumPy, reproducibly
+from a seed, and streams them out as CSV, Arrow or straight into the database.
+
+    python synthetic_leads.py --n 1000000 --seed 42 --format csv --out leads.csv
+    python synthetic_leads.py --n 100000 --seed 42 --format db
+"""
+import os
+import csv
+import json
+import argparse
+from datetime import datetime
+import numpy as np
+from sqlalchemy import insert
+
+try:
+    from .enrichment import LIFE_STAGES, PAIN_POINTS, PROVIDERS, AGE_RANGES
+    from .lead_dedup import name_block_key
+except ImportError:
+    from enrichment import LIFE_STAGES, PAIN_POINTS, PROVIDERS, AGE_RANGES
+    from lead_dedup import name_block_key
+
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda",
+    "David", "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+    "Thomas", "Sarah", "Carlos", "Karen", "Daniel", "Maria", "Wei", "Aisha",
+    "Matthew", "Emily", "Anthony", "Priya", "Mark", "Sofia", "Omar", "Grace"
+]
+
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas",
+    "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White",
+    "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson", "Nguyen", "Patel"
+]
+
+MONTH_NAMES = np.array([
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+])
+
+INSURANCE_TYPES = list(LIFE_STAGES)
+
+# Rows generated and written per batch
+DEFAULT_BATCH_SIZE = 100_000
+
+# Leads are spread over this many days before as_of (drives anniversaries)
+CREATED_AT_SPREAD_DAYS = 3 * 365
+
+
+def _table(options_by_type: dict) -> tuple:
+    """Per-insurance-type option lists as a padded 2D array plus per-row counts"""
+    rows = [options_by_type[t] for t in INSURANCE_TYPES]
+    width = max(len(r) for r in rows)
+    table = np.array([r + [""] * (width - len(r)) for r in rows], dtype=object)
+    counts = np.array([len(r) for r in rows])
+    return table, counts
+
+
+LIFE_STAGE_TABLE, LIFE_STAGE_COUNTS = _table(LIFE_STAGES)
+PAIN_POINT_TABLE, PAIN_POINT_COUNTS = _table(PAIN_POINTS)
+PROVIDER_TABLE, PROVIDER_COUNTS = _table(PROVIDERS)
+
+# Blocking keys per last name are computed once, not per row
+NAME_KEYS = np.array([[name_block_key(f"{f} {l}") for l in LAST_NAMES] for f in FIRST_NAMES], dtype=object)
+
+
+def _pick(rng, table, counts, type_idx):
+    """One option per row from that row's insurance type list"""
+    option_idx = (rng.random(len(type_idx)) * counts[type_idx]).astype(np.int64)
+    return table[type_idx, option_idx], option_idx
+
+
+def generate_enriched_batch(rng, n: int, as_of: datetime, start_id: int = 0) -> dict:
+    """
+    Generate n enriched leads as columns (field name -> array of length n).
+
+    Args:
+        rng: numpy Generator (carries the seed across batches)
+        n: Number of leads
+        as_of: Reference date for renewal and created_at dates
+        start_id: Offset for the unique email/phone sequence
+
+    Returns:
+        Dict of column arrays matching the Lead model fields
+    """
+    seq = np.arange(start_id, start_id + n)
+    type_idx = rng.integers(0, len(INSURANCE_TYPES), n)
+    first_idx = rng.integers(0, len(FIRST_NAMES), n)
+    last_idx = rng.integers(0, len(LAST_NAMES), n)
+
+    first = np.array(FIRST_NAMES, dtype=object)[first_idx]
+    last = np.array(LAST_NAMES, dtype=object)[last_idx]
+    full_name = first + " " + last
+
+    seq_str = seq.astype(str).astype(object)
+    email = np.char.lower((first + "." + last).astype(str)).astype(object) + seq_str + "@example.com"
+    phone = "+1555" + np.char.zfill((seq % 10_000_000).astype(str), 7).astype(object)
+
+    life_stage, _ = _pick(rng, LIFE_STAGE_TABLE, LIFE_STAGE_COUNTS, type_idx)
+    provider, _ = _pick(rng, PROVIDER_TABLE, PROVIDER_COUNTS, type_idx)
+    age_range = np.array(AGE_RANGES, dtype=object)[rng.integers(0, len(AGE_RANGES), n)]
+
+    # Two distinct pain points: draw the second from the remaining k-1 and skip past the first
+    counts = PAIN_POINT_COUNTS[type_idx]
+    pain_a = (rng.random(n) * counts).astype(np.int64)
+    pain_b = (rng.random(n) * (counts - 1)).astype(np.int64)
+    pain_b += pain_b >= pain_a
+    pain_points = np.empty(n, dtype=object)
+    pain_points[:] = list(zip(PAIN_POINT_TABLE[type_idx, pain_a], PAIN_POINT_TABLE[type_idx, pain_b]))
+
+    # Renewal 1-12 months out (30-day months, like enrich_lead), formatted "%B %Y"
+    today = np.datetime64(as_of.date(), "D")
+    renewal = today + rng.integers(1, 13, n) * 30
+    renewal_months = renewal.astype("datetime64[M]").astype(np.int64)
+    renewal_date = MONTH_NAMES[renewal_months % 12].astype(object) + " " + (renewal_months // 12 + 1970).astype(str).astype(object)
+
+    created_at = np.datetime64(as_of, "s") - rng.integers(0, CREATED_AT_SPREAD_DAYS * 86400, n).astype("timedelta64[s]")
+
+    return {
+        "full_name": full_name,
+        "email": email,
+        "email_normalized": email,
+        "phone": phone,
+        "phone_normalized": phone,
+        "name_key": NAME_KEYS[first_idx, last_idx],
+        "insurance_type": np.array(INSURANCE_TYPES, dtype=object)[type_idx],
+        "current_provider": provider,
+        "life_stage": life_stage,
+        "estimated_age_range": age_range,
+        "pain_points": pain_points,
+        "estimated_savings": rng.integers(200, 801, n),
+        "renewal_date": renewal_date,
+        "renewal_on": renewal,
+        "status": np.full(n, "enriched", dtype=object),
+        "created_at": created_at,
+    }
+
+
+def iter_enriched_batches(n: int, seed: int = 0, batch_size: int = DEFAULT_BATCH_SIZE, as_of: datetime = None):
+    """
+    Yield column batches totalling n leads.
+
+    Output is reproducible for the same (n, seed, batch_size, as_of).
+    """
+    rng = np.random.default_rng(seed)
+    as_of = as_of or datetime(2025, 1, 1)
+
+    for start in range(0, n, batch_size):
+        yield generate_enriched_batch(rng, min(batch_size, n - start), as_of, start_id=start)
+
+
+def _rows(batch: dict) -> list:
+    """Column batch -> list of row dicts with plain Python values (for DB inserts)"""
+    columns = {
+        # datetime64[D] -> date, finer units -> datetime
+        name: (values.astype("datetime64[us]").tolist() if values.dtype.kind == "M" and values.dtype != "datetime64[D]" else values.tolist())
+        for name, values in batch.items()
+    }
+    columns["pain_points"] = [list(p) for p in columns["pain_points"]]
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def write_csv(path: str, n: int, seed: int = 0, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Stream n synthetic leads to a CSV file (pain_points as a JSON array)"""
+    written = 0
+    with open(path, "w", newline="") as f:
+        writer = None
+        for batch in iter_enriched_batches(n, seed, batch_size):
+            if writer is None:
+                writer = csv.writer(f)
+                writer.writerow(list(batch))
+            batch["pain_points"] = np.array([json.dumps(list(p)) for p in batch["pain_points"]], dtype=object)
+            batch["created_at"] = np.datetime_as_string(batch["created_at"])
+            batch["renewal_on"] = np.datetime_as_string(batch["renewal_on"])
+            writer.writerows(zip(*batch.values()))
+            written += len(batch["email"])
+    return written
+
+
+def write_arrow(path: str, n: int, seed: int = 0, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Stream n synthetic leads to an Arrow IPC file (requires pyarrow)"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise Exception("pyarrow is not installed. Run: pip install pyarrow")
+
+    written = 0
+    writer = None
+    try:
+        for batch in iter_enriched_batches(n, seed, batch_size):
+            batch["pain_points"] = [list(p) for p in batch["pain_points"]]
+            record_batch = pa.RecordBatch.from_pydict({k: pa.array(v) for k, v in batch.items()})
+            if writer is None:
+                writer = pa.ipc.new_file(path, record_batch.schema)
+            writer.write_batch(record_batch)
+            written += record_batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+def load_into_db(n: int, seed: int = 0, batch_size: int = DEFAULT_BATCH_SIZE, bind=None) -> int:
+    """
+    Insert n synthetic leads with executemany, one transaction per batch.
+
+    Args:
+        bind: Engine to insert into (defaults to the app's engine)
+    """
+    try:
+        from .database import engine, init_db
+        from .models import Lead
+    except ImportError:
+        from database import engine, init_db
+        from models import Lead
+
+    bind = bind or engine
+    if bind is engine:
+        init_db()
+
+    calendly_link = os.getenv("CALENDLY_LINK", "https://calendly.com/solisa-demo/30min")
+
+    inserted = 0
+    for batch in iter_enriched_batches(n, seed, batch_size):
+        rows = _rows(batch)
+        for row in rows:
+            row["calendly_link"] = calendly_link
+            row["updated_at"] = row["created_at"]
+        with bind.begin() as conn:
+            conn.execute(insert(Lead), rows)
+        inserted += len(rows)
+        print(f"💾 Inserted {inserted}/{n} synthetic leads")
+
+    return inserted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic enriched leads")
+    parser.add_argument("--n", type=int, default=10_000, help="number of leads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--format", choices=["csv", "arrow", "db"], default="csv")
+    parser.add_argument("--out", default="synthetic_leads.csv", help="output path for csv/arrow")
+    args = parser.parse_args()
+
+    started = datetime.now()
+    if args.format == "csv":
+        count = write_csv(args.out, args.n, args.seed, args.batch_size)
+    elif args.format == "arrow":
+        count = write_arrow(args.out, args.n, args.seed, args.batch_size)
+    else:
+        count = load_into_db(args.n, args.seed, args.batch_size)
+
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"✅ Generated {count} leads in {elapsed:.1f}s ({count / max(elapsed, 1e-9):,.0f} leads/s)")
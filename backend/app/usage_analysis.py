@@ -0,0 +1,183 @@
+"""
+Vectorized usage pattern analysis.
+
+Scores pay-per-mile, safe-driver and bundle opportunities for many customers
+at once from columnar usage features, and returns a ranked candidate list.
+analyze_usage_patterns uses the same rules for a single customer.
+"""
+import numpy as np
+
+# Average annual mileage of a policyholder (FHWA ~13.5k miles)
+AVERAGE_ANNUAL_MILEAGE = 13_500
+
+# Pay-per-mile: at most this share of the average mileage, saving per mile under average
+LOW_MILEAGE_RATIO = 0.6
+PAY_PER_MILE_SAVINGS_PER_MILE = 0.042
+
+# Safe driver: no claims and at least this many app sessions in 90 days
+SAFE_DRIVER_MIN_SESSIONS = 12
+SAFE_DRIVER_SAVINGS = 120
+
+# Bundle: owns a home and has auto but no home policy with us
+BUNDLE_SAVINGS = 400
+
+# Feature columns (arrays of equal length; None or NaN where unknown)
+FEATURES = ("annual_mileage", "claims_count", "app_sessions_90d", "owns_home", "has_auto", "has_home")
+
+# Pattern definitions, in column order of the score matrix
+PATTERNS = (
+    {
+        "pattern_type": "low_mileage",
+        "recommendation": "pay_per_mile",
+        "confidence": 0.85,
+        "message": "Customer drives significantly less than average - perfect candidate for pay-per-mile"
+    },
+    {
+        "pattern_type": "high_engagement",
+        "recommendation": "safe_driver_discount",
+        "confidence": 0.90,
+        "message": "Excellent driving record and high engagement - eligible for safe driver discount"
+    },
+    {
+        "pattern_type": "bundle_opportunity",
+        "recommendation": "home_auto_bundle",
+        "confidence": 0.75,
+        "message": "Customer owns home but only has auto insurance - bundle opportunity"
+    },
+)
+
+# Features each pattern's rule reads - a customer missing any of them doesn't qualify
+PATTERN_INPUTS = (
+    ("annual_mileage", "has_auto"),
+    ("claims_count", "app_sessions_90d", "has_auto"),
+    ("owns_home", "has_auto", "has_home"),
+)
+
+STANDARD_PATTERN = {
+    "pattern_type": "standard",
+    "current_usage": "Average",
+    "recommendation": None,
+    "potential_savings": 0,
+    "confidence": 0.5,
+    "message": "Standard usage pattern"
+}
+
+CONFIDENCES = np.array([p["confidence"] for p in PATTERNS])
+
+
+def pattern_savings(features: dict) -> np.ndarray:
+    """
+    Potential yearly savings per customer and pattern (0 where the customer doesn't qualify).
+
+    Args:
+        features: Dict of FEATURES name -> array (booleans may be 0/1, None or NaN if unknown)
+
+    Returns:
+        (n, len(PATTERNS)) float array
+    """
+    columns = {name: np.asarray(features[name], dtype=np.float64) for name in FEATURES}
+    known = {name: ~np.isnan(values) for name, values in columns.items()}
+
+    mileage = columns["annual_mileage"]
+    claims = columns["claims_count"]
+    sessions = columns["app_sessions_90d"]
+    owns_home = columns["owns_home"] == 1
+    has_auto = columns["has_auto"] == 1
+    has_home = columns["has_home"] == 1
+
+    qualifies = (
+        has_auto & (mileage <= AVERAGE_ANNUAL_MILEAGE * LOW_MILEAGE_RATIO),
+        has_auto & (claims == 0) & (sessions >= SAFE_DRIVER_MIN_SESSIONS),
+        has_auto & owns_home & ~has_home,
+    )
+    amounts = (
+        np.round((AVERAGE_ANNUAL_MILEAGE - mileage) * PAY_PER_MILE_SAVINGS_PER_MILE),
+        SAFE_DRIVER_SAVINGS,
+        BUNDLE_SAVINGS,
+    )
+
+    savings = np.zeros((mileage.shape[0], len(PATTERNS)))
+    for i, inputs in enumerate(PATTERN_INPUTS):
+        rule = qualifies[i] & np.logical_and.reduce([known[name] for name in inputs])
+        savings[:, i] = np.where(rule, amounts[i], 0)
+
+    return savings
+
+
+def best_patterns(features: dict) -> tuple:
+    """
+    Best pattern per customer, by expected savings (savings x confidence).
+
+    Returns:
+        (pattern index or -1, potential savings, score) arrays
+    """
+    savings = pattern_savings(features)
+    expected = savings * CONFIDENCES
+
+    best = expected.argmax(axis=1)
+    rows = np.arange(savings.shape[0])
+    score = expected[rows, best]
+    best = np.where(score > 0, best, -1)
+
+    return best, np.where(best >= 0, savings[rows, best], 0), score
+
+
+def rank_usage_candidates(lead_ids, features: dict, top_n: int = None) -> list:
+    """
+    Ranked upsell/plan-switch candidates across a book of customers.
+
+    Args:
+        lead_ids: Array of lead IDs aligned with the feature arrays
+        features: Dict of FEATURES name -> array
+        top_n: Only return the best N candidates (None for all)
+
+    Returns:
+        List of candidate dicts, highest expected savings first
+    """
+    lead_ids = np.asarray(lead_ids)
+    best, savings, score = best_patterns(features)
+
+    candidates = np.flatnonzero(best >= 0)
+    if top_n is not None and top_n < candidates.size:
+        # Partial selection, then sort only the winners
+        candidates = candidates[np.argpartition(-score[candidates], top_n - 1)[:top_n]]
+    candidates = candidates[np.lexsort((lead_ids[candidates], -score[candidates]))]
+
+    mileage = np.asarray(features["annual_mileage"], dtype=np.float64)
+
+    return [
+        {
+            "lead_id": int(lead_ids[i]),
+            **_pattern_result(int(best[i]), float(savings[i]), float(mileage[i])),
+            "score": round(float(score[i]), 2),
+        }
+        for i in candidates
+    ]
+
+
+def analyze_usage(features: dict) -> dict:
+    """Usage analysis for a single customer (scalar features; missing ones skip the rules that need them)"""
+    columns = {name: np.asarray([features.get(name)], dtype=np.float64) for name in FEATURES}
+    best, savings, _ = best_patterns(columns)
+    if best[0] < 0:
+        return dict(STANDARD_PATTERN)
+    return _pattern_result(int(best[0]), float(savings[0]), float(columns["annual_mileage"][0]))
+
+
+def _pattern_result(index: int, savings: float, mileage: float) -> dict:
+    pattern = PATTERNS[index]
+    if pattern["pattern_type"] == "low_mileage":
+        current_usage = f"{round(100 * (1 - mileage / AVERAGE_ANNUAL_MILEAGE))}% below average"
+    elif pattern["pattern_type"] == "high_engagement":
+        current_usage = "Uses app regularly, no claims"
+    else:
+        current_usage = "Auto only, owns home"
+
+    return {
+        "pattern_type": pattern["pattern_type"],
+        "current_usage": current_usage,
+        "recommendation": pattern["recommendation"],
+        "potential_savings": int(savings),
+        "confidence": pattern["confidence"],
+        "message": pattern["message"]
+    }
@@ -0,0 +1,210 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+
+try:
+    from .database import SessionLocal
+    from .models import WebhookEvent
+    from .lead_resolution import find_leads_by_emails, normalize_email
+    from .shared_state import get_lease
+except ImportError:
+    from database import SessionLocal
+    from models import WebhookEvent
+    from lead_resolution import find_leads_by_emails, normalize_email
+    from shared_state import get_lease
+
+# Events applied per transaction
+INBOX_BATCH_SIZE = int(os.getenv("WEBHOOK_INBOX_BATCH_SIZE", "500"))
+
+# Only one consumer (across workers with a shared state backend) drains the inbox at
+# a time; other triggers return immediately. The lease is renewed every batch and
+# lapses after this long if its holder dies.
+INBOX_LEASE_SECONDS = float(os.getenv("WEBHOOK_INBOX_LEASE_SECONDS", "120"))
+
+# Set on every new delivery so a running drain knows to look again before exiting
+_new_events = threading.Event()
+
+
+def webhook_event_key(source: str, body: dict) -> str:
+    """
+    Stable dedup key for a webhook delivery.
+
+    Calendly invitee payloads carry a unique invitee URI; otherwise the key is a
+    hash of the canonical JSON body, so identical redeliveries collapse.
+    """
+    event_type = body.get("event")
+    uri = (body.get("payload") or {}).get("uri")
+    if uri:
+        return f"{source}:{event_type}:{uri}"
+
+    digest = hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{source}:{digest}"
+
+
+def record_webhook_event(db, source: str, body: dict) -> tuple:
+    """
+    Append a webhook delivery to the inbox.
+
+    Returns:
+        (event, duplicate) - duplicate is True if this delivery was already recorded
+    """
+    event_key = webhook_event_key(source, body)
+    event = WebhookEvent(
+        source=source,
+        event_type=body.get("event"),
+        event_key=event_key,
+        email=(body.get("payload") or {}).get("email"),
+        payload=body,
+        status="pending"
+    )
+
+    db.add(event)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        existing = db.query(WebhookEvent).filter(WebhookEvent.event_key == event_key).first()
+        return existing, True
+
+    _new_events.set()
+    return event, False
+
+
+def _apply_calendly_event(event, leads_by_email: dict, now: datetime):
+    """Apply one Calendly event to its lead (the payload is read before anything is changed)"""
+    if not event.email:
+        event.status = "ignored"
+        event.result = "No email in webhook payload"
+        return
+
+    lead = leads_by_email.get(normalize_email(event.email))
+
+    if event.event_type == "invitee.created":
+        if not lead:
+            # Lead not found - might be a new prospect
+            event.status = "ignored"
+            event.result = f"No lead found for email {event.email}"
+            print(f"⚠️  Calendly Webhook: No lead found for {event.email}")
+            return
+
+        start_time = (((event.payload or {}).get("payload") or {}).get("scheduled_event") or {}).get("start_time")
+
+        lead.booking_confirmed = True
+        lead.booking_confirmed_at = event.received_at or now
+        lead.status = "booked"
+        event.status = "processed"
+        event.lead_id = lead.id
+        event.result = f"Lead {lead.full_name} marked as booked"
+
+        print(f"✅ Calendly Webhook: Lead {lead.full_name} ({event.email}) booked meeting! Event Time: {start_time}")
+
+    elif event.event_type == "invitee.canceled":
+        if not lead:
+            event.status = "ignored"
+            event.result = f"No lead found for email {event.email}"
+            return
+
+        lead.booking_confirmed = False
+        lead.booking_confirmed_at = None
+        lead.status = "contacted"
+        event.status = "processed"
+        event.lead_id = lead.id
+        event.result = f"Lead {lead.full_name} booking canceled"
+
+        print(f"❌ Calendly Webhook: Lead {lead.full_name} canceled meeting")
+
+    else:
+        event.status = "ignored"
+        event.result = f"Unhandled event type {event.event_type}"
+
+
+def apply_calendly_events(db, batch_size: int = INBOX_BATCH_SIZE) -> int:
+    """
+    Apply one batch of pending Calendly events.
+
+    Leads for the whole batch are resolved with a single IN query, events are
+    applied in arrival order (so per-email ordering holds) and everything is
+    committed once. Re-applying an event is harmless: it only sets booking state.
+    An event that can't be applied (e.g. a malformed payload) is marked failed
+    with its error, and the rest of the batch still goes through.
+
+    Returns:
+        Number of events handled in this batch
+    """
+    events = db.query(WebhookEvent).filter(
+        WebhookEvent.source == "calendly",
+        WebhookEvent.status == "pending"
+    ).order_by(WebhookEvent.id.asc()).limit(batch_size).all()
+
+    if not events:
+        return 0
+
+    leads_by_email = find_leads_by_emails(db, {e.email for e in events if e.email})
+
+    now = datetime.utcnow()
+    for event in events:
+        event.processed_at = now
+        try:
+            _apply_calendly_event(event, leads_by_email, now)
+        except Exception as e:
+            event.status = "failed"
+            event.result = f"{type(e).__name__}: {e}"
+            print(f"❌ Calendly Webhook: event {event.id} failed: {e}")
+
+    db.commit()
+
+    return len(events)
+
+
+def has_pending_calendly_events(db) -> bool:
+    """Whether any Calendly event is waiting to be applied"""
+    return db.query(WebhookEvent.id).filter(
+        WebhookEvent.source == "calendly",
+        WebhookEvent.status == "pending"
+    ).first() is not None
+
+
+def drain_calendly_inbox(session_factory=SessionLocal) -> int:
+    """
+    Apply pending Calendly events batch by batch until the inbox is empty.
+
+    Safe to trigger after every delivery: if another drain is already running,
+    this returns immediately and that drain picks the new events up. A drain
+    in another worker can't see this process's new-event signal, so the inbox
+    is checked once more after the lease is released.
+
+    Returns:
+        Number of events handled (0 if another drain was running)
+    """
+    handled = 0
+    lease = get_lease("calendly-inbox")
+
+    while lease.acquire(INBOX_LEASE_SECONDS):
+        db = session_factory()
+        try:
+            while True:
+                _new_events.clear()
+                count = apply_calendly_events(db)
+                handled += count
+                if count < INBOX_BATCH_SIZE and not _new_events.is_set():
+                    break
+                lease.acquire(INBOX_LEASE_SECONDS)
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Error processing Calendly inbox: {e}")
+            return handled
+        finally:
+            db.close()
+            lease.release()
+
+        db = session_factory()
+        try:
+            if not has_pending_calendly_events(db):
+                return handled
+        finally:
+            db.close()
+
+    return handled
@@ -2,9 +2,13 @@ import os
 import requests
 import base64
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
 
-load_dotenv()
+try:
+    from . import settings  # noqa: F401 - loads .env
+    from .metrics import span
+except ImportError:
+    import settings  # noqa: F401
+    from metrics import span
 
 ZOOM_ACCOUNT_ID = os.getenv("ZOOM_ACCOUNT_ID")
 ZOOM_CLIENT_ID = os.getenv("ZOOM_CLIENT_ID")
@@ -28,7 +32,8 @@ def get_zoom_access_token():
         "Authorization": f"Basic {encoded_credentials}"
     }
     
-    response = requests.post(url, headers=headers)
+    with span("zoom", "oauth_token"):
+        response = requests.post(url, headers=headers)
     response.raise_for_status()
     
     return response.json()["access_token"]
@@ -53,7 +58,8 @@ def get_user_meetings(user_id="me", days_back=7):
         "to": to_date.strftime("%Y-%m-%d")
     }
     
-    response = requests.get(url, headers=headers, params=params)
+    with span("zoom", "list_recordings"):
+        response = requests.get(url, headers=headers, params=params)
     response.raise_for_status()
     
     return response.json()
@@ -71,7 +77,8 @@ def get_meeting_transcript(meeting_id):
         "Authorization": f"Bearer {token}"
     }
     
-    response = requests.get(url, headers=headers)
+    with span("zoom", "meeting_recordings"):
+        response = requests.get(url, headers=headers)
     response.raise_for_status()
     
     data = response.json()
@@ -87,10 +94,11 @@ def get_meeting_transcript(meeting_id):
         raise Exception("No transcript found for this meeting")
     
     # Download transcript
-    transcript_response = requests.get(
-        transcript_url,
-        headers=headers
-    )
+    with span("zoom", "download_transcript"):
+        transcript_response = requests.get(
+            transcript_url,
+            headers=headers
+        )
     transcript_response.raise_for_status()
     
     return transcript_response.text
@@ -0,0 +1,415 @@
+"""
+Latency and throughput of every API endpoint on a seeded synthetic book.
+
+Seeds a SQLite database with N synthetic leads (synthetic_leads) plus
+touchpoints, follow-up actions, life events, occasions and policy health
+records, then drives each endpoint of main.py through an in-process ASGI
+client in DEMO_MODE (template messages, console "sends", local enrichment).
+Reports requests/s, p50/p95/p99 latency and SQL queries per request as JSON.
+
+    python benchmarks/bench_endpoints.py --leads 10000 --requests 50
+    python benchmarks/bench_endpoints.py --leads 100000 --db /tmp/bench.db --out results.json
+    python benchmarks/bench_endpoints.py --baseline baseline.json --save-baseline
+    python benchmarks/bench_endpoints.py --llm-url http://127.0.0.1:8090   # AI paths via llm_standin.py
+
+With --baseline, endpoints whose p95 grew by more than --tolerance (and by at
+least --min-delta-ms) are listed as regressions and the exit code is 1.
+Baselines are machine-specific, so record one on the machine that compares.
+Seeding is skipped when --db already holds leads, so large books can be reused.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import contextlib
+from datetime import datetime, timedelta
+import numpy as np
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+# Share of seeded leads with related records
+TOUCHED_SHARE = 0.5  # two touchpoints and a pending follow-up action each
+LIFE_EVENT_SHARE = 0.1
+OCCASION_SHARE = 0.1
+HEALTH_SHARE = 0.2
+
+# Rows per executemany when seeding related tables
+SEED_BATCH_SIZE = 50_000
+
+TRANSCRIPTS = [
+    "Agent: Hi, following up on your quote.\nCustomer: Sounds good, what are the next steps?",
+    "Agent: Did you get a chance to review?\nCustomer: It's a bit too expensive for us right now.",
+    "Agent: Any questions on coverage?\nCustomer: I need to talk to my spouse first.",
+]
+INTENTS = ["interested", "objecting", "browsing", "ready"]
+LIFE_EVENT_TYPES = ["new_baby", "home_purchase", "teen_driver", "job_change"]
+OCCASION_TYPES = ["policy_anniversary", "birthday", "policy_renewal", "holiday_season"]
+CHURN_RISKS = np.array(["low", "medium", "high"], dtype=object)
+
+
+def configure_environment(db_path: str, llm_url: str = None):
+    """
+    Point the app at the benchmark database and stub external providers (before importing it).
+
+    Args:
+        llm_url: Base URL of an LLM stand-in; AI paths then make real calls to it
+                 instead of returning demo output (sends stay in demo mode)
+    """
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["DEMO_MODE"] = "true"
+    os.environ["ENRICHMENT_PROVIDER"] = "local"
+    os.environ["LOCAL_ENRICHMENT_LATENCY_MS"] = "0"
+    os.environ["FOLLOWUP_SCHEDULER_ENABLED"] = "false"
+    os.environ["QUERY_DEBUG"] = "true"
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    if llm_url:
+        os.environ["LLM_DEMO_MODE"] = "false"
+        os.environ["GROQ_BASE_URL"] = llm_url
+
+
+def _insert_batches(conn, table, rows):
+    from sqlalchemy import insert
+    for start in range(0, len(rows), SEED_BATCH_SIZE):
+        conn.execute(insert(table), rows[start:start + SEED_BATCH_SIZE])
+
+
+def seed_related(engine, n_leads: int, seed: int, as_of: datetime) -> dict:
+    """
+    Touchpoints, pending follow-up actions, life events, occasions and health
+    records for random subsets of leads 1..n_leads.
+
+    Returns:
+        Dict of table name -> rows inserted
+    """
+    from models import Touchpoint, FollowUpAction, LifeEvent, Occasion, PolicyHealth
+
+    rng = np.random.default_rng(seed + 1)
+    lead_ids = np.arange(1, n_leads + 1)
+
+    def sample(share):
+        return np.sort(rng.choice(lead_ids, max(1, int(n_leads * share)), replace=False)).tolist()
+
+    def days_ago(count, max_days):
+        return [as_of - timedelta(days=int(d)) for d in rng.integers(1, max_days, count)]
+
+    touched = sample(TOUCHED_SHARE)
+    touchpoint_leads = [lead_id for lead_id in touched for _ in range(2)]
+    transcript_idx = rng.integers(0, len(TRANSCRIPTS), len(touchpoint_leads))
+    intent_idx = rng.integers(0, len(INTENTS), len(touchpoint_leads))
+    touchpoints = [
+        {"id": i + 1, "lead_id": lead_id, "type": "call", "direction": "outbound",
+         "content": TRANSCRIPTS[t], "sentiment": "neutral", "intent": INTENTS[intent],
+         "objections": [], "key_points": [], "urgency": "medium", "created_at": created_at}
+        for i, (lead_id, t, intent, created_at)
+        in enumerate(zip(touchpoint_leads, transcript_idx, intent_idx, days_ago(len(touchpoint_leads), 60)))
+    ]
+    actions = [
+        {"lead_id": tp["lead_id"], "touchpoint_id": tp["id"], "action_type": "email" if i % 2 else "sms",
+         "priority": "high" if i % 3 == 0 else "medium", "content": "Checking in on your quote.",
+         "reasoning": "Follow up after call", "timing": "1day", "status": "pending", "created_at": tp["created_at"]}
+        for i, tp in enumerate(touchpoints[1::2])
+    ]
+
+    event_leads = sample(LIFE_EVENT_SHARE)
+    life_events = [
+        {"lead_id": lead_id, "event_type": LIFE_EVENT_TYPES[i % len(LIFE_EVENT_TYPES)], "event_date": created_at,
+         "source": "manual", "opportunity_type": "upsell", "recommended_product": "umbrella", "estimated_value": 40,
+         "action_taken": True, "action_type": "sms", "action_content": "Congrats!", "outcome": "pending",
+         "created_at": created_at, "updated_at": created_at}
+        for i, (lead_id, created_at) in enumerate(zip(event_leads, days_ago(len(event_leads), 90)))
+    ]
+
+    occasion_leads = sample(OCCASION_SHARE)
+    occasions = [
+        {"lead_id": lead_id, "occasion_type": OCCASION_TYPES[i % len(OCCASION_TYPES)], "occasion_date": created_at,
+         "offer_type": "loyalty_discount", "offer_value": 50, "offer_description": "Loyalty discount",
+         "action_taken": True, "action_type": "sms", "action_content": "Happy anniversary!", "outcome": "pending",
+         "created_at": created_at, "updated_at": created_at}
+        for i, (lead_id, created_at) in enumerate(zip(occasion_leads, days_ago(len(occasion_leads), 90)))
+    ]
+
+    health_leads = sample(HEALTH_SHARE)
+    scores = rng.integers(20, 100, len(health_leads))
+    health = [
+        {"lead_id": lead_id, "health_score": int(score), "churn_risk": CHURN_RISKS[0 if score >= 70 else 1 if score >= 40 else 2],
+         "churn_probability": int(100 - score), "engagement_score": int(score), "satisfaction_score": int(score),
+         "usage_score": int(score), "payment_score": int(score), "retention_actions": [], "reasoning": "Seeded",
+         "priority": "low" if score >= 70 else "high", "calculated_at": calculated_at}
+        for lead_id, score, calculated_at in zip(health_leads, scores, days_ago(len(health_leads), 30))
+    ]
+
+    counts = {}
+    with engine.begin() as conn:
+        for model, rows in ((Touchpoint, touchpoints), (FollowUpAction, actions), (LifeEvent, life_events),
+                            (Occasion, occasions), (PolicyHealth, health)):
+            _insert_batches(conn, model, rows)
+            counts[model.__tablename__] = len(rows)
+    return counts
+
+
+def seed_database(n_leads: int, seed: int) -> dict:
+    """Seed an empty benchmark database; an already seeded one is reused as is"""
+    from sqlalchemy import select, func
+    from database import engine, init_db
+    from models import Lead
+    from synthetic_leads import load_into_db
+
+    init_db()
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count(Lead.id))).scalar()
+    if existing:
+        print(f"♻️  Reusing benchmark database with {existing} leads")
+        return {"leads": existing, "reused": True}
+
+    as_of = datetime(2025, 1, 1)
+    counts = {"leads": load_into_db(n_leads, seed, bind=engine)}
+    counts.update(seed_related(engine, n_leads, seed, as_of))
+    return counts
+
+
+def pending_ids(model, limit: int) -> list:
+    """IDs of seeded rows still awaiting action/response, oldest first"""
+    from sqlalchemy import select
+    from database import engine
+
+    status = model.status if hasattr(model, "status") else model.outcome
+    with engine.connect() as conn:
+        return list(conn.execute(select(model.id).where(status == "pending").order_by(model.id).limit(limit)).scalars())
+
+
+def build_scenario(n_requests: int, n_heavy: int, n_leads: int, seed: int) -> list:
+    """
+    Requests to drive, per endpoint, in dependency order (e.g. campaigns are
+    created before they are paused, run and re-scored).
+
+    Returns:
+        ([(name, count, make_request)], campaign ID list) with make_request(i) -> (method, path, json)
+    """
+    from models import FollowUpAction, LifeEvent, Occasion
+
+    rng = np.random.default_rng(seed + 2)
+    leads = rng.integers(1, n_leads + 1, max(n_requests, n_heavy) * 4).tolist()
+    actions = pending_ids(FollowUpAction, n_requests * 11)
+    events = pending_ids(LifeEvent, n_requests)
+    occasions = pending_ids(Occasion, n_requests)
+    campaigns = []  # filled by the POST /api/campaigns responses
+    run_id = int(time.time())
+
+    def lead(i):
+        return leads[i % len(leads)]
+
+    def campaign(i):
+        return campaigns[i % len(campaigns)]
+
+    return [
+        ("GET /", n_requests, lambda i: ("GET", "/", None)),
+        ("POST /api/leads", n_requests, lambda i: ("POST", "/api/leads", {
+            "full_name": f"Bench Lead{i}", "email": f"bench{run_id}.{i}@example.org",
+            "phone": f"+1444{run_id % 1000:03d}{i:04d}", "insurance_type": "Auto"})),
+        ("GET /api/leads", n_heavy, lambda i: ("GET", "/api/leads", None)),
+        ("GET /api/leads/{lead_id}", n_requests, lambda i: ("GET", f"/api/leads/{lead(i)}", None)),
+        ("POST /api/leads/{lead_id}/book", n_requests, lambda i: ("POST", f"/api/leads/{lead(i)}/book", None)),
+        ("GET /api/stats", n_requests, lambda i: ("GET", "/api/stats", None)),
+        ("POST /api/webhooks/calendly", n_requests, lambda i: ("POST", "/api/webhooks/calendly", {
+            "event": "invitee.created",
+            "payload": {"email": f"bench{run_id}.{i}@example.org", "name": f"Bench Lead{i}",
+                        "uri": f"https://api.calendly.com/invitees/bench-{run_id}-{i}"}})),
+        ("POST /api/leads/{lead_id}/touchpoint", n_requests, lambda i: ("POST", f"/api/leads/{lead(i)}/touchpoint", {
+            "type": "call", "direction": "outbound", "content": TRANSCRIPTS[i % len(TRANSCRIPTS)]})),
+        ("GET /api/leads/{lead_id}/touchpoints", n_requests, lambda i: ("GET", f"/api/leads/{lead(i)}/touchpoints", None)),
+        ("GET /api/leads/{lead_id}/actions", n_requests, lambda i: ("GET", f"/api/leads/{lead(i)}/actions", None)),
+        ("GET /api/analytics/intent-trajectories", n_heavy,
+         lambda i: ("GET", "/api/analytics/intent-trajectories?refresh=true", None)),
+        ("POST /api/followup/{action_id}/execute", min(n_requests, len(actions)),
+         lambda i: ("POST", f"/api/followup/{actions[i]}/execute", None)),
+        ("POST /api/followup/execute-bulk", max(0, min(n_requests, (len(actions) - n_requests) // 10)),
+         lambda i: ("POST", "/api/followup/execute-bulk", {
+             "action_ids": actions[n_requests + i * 10:n_requests + (i + 1) * 10]})),
+        ("GET /api/followup/scheduler", n_requests, lambda i: ("GET", "/api/followup/scheduler", None)),
+        ("POST /api/leads/{lead_id}/life-event", n_requests, lambda i: ("POST", f"/api/leads/{lead(i)}/life-event", {
+            "event_type": LIFE_EVENT_TYPES[i % len(LIFE_EVENT_TYPES)]})),
+        ("GET /api/leads/{lead_id}/life-events", n_requests, lambda i: ("GET", f"/api/leads/{lead(i)}/life-events", None)),
+        ("GET /api/life-events", n_heavy, lambda i: ("GET", "/api/life-events", None)),
+        ("GET /api/leads/{lead_id}/policy-health", n_requests,
+         lambda i: ("GET", f"/api/leads/{lead(i)}/policy-health", None)),
+        ("GET /api/leads/{lead_id}/policy-health/trend", n_requests,
+         lambda i: ("GET", f"/api/leads/{lead(i)}/policy-health/trend", None)),
+        ("GET /api/retention/worklist", n_requests,
+         lambda i: ("GET", f"/api/retention/worklist?churn_risk=high,medium&sort=priority&offset={(i % 5) * 100}", None)),
+        ("POST /api/life-events/{event_id}/respond", len(events), lambda i: ("POST", f"/api/life-events/{events[i]}/respond", {
+            "response_text": "Yes, please send me the details"})),
+        ("POST /api/leads/{lead_id}/occasion", n_requests, lambda i: ("POST", f"/api/leads/{lead(i)}/occasion", {
+            "occasion_type": OCCASION_TYPES[i % len(OCCASION_TYPES)]})),
+        ("GET /api/leads/{lead_id}/occasions", n_requests, lambda i: ("GET", f"/api/leads/{lead(i)}/occasions", None)),
+        ("GET /api/leads/{lead_id}/360", n_requests, lambda i: ("GET", f"/api/leads/{lead(i)}/360", None)),
+        ("GET /api/occasions", n_heavy, lambda i: ("GET", "/api/occasions", None)),
+        ("GET /api/occasions/upcoming", n_requests, lambda i: ("GET", "/api/occasions/upcoming", None)),
+        ("POST /api/occasions/{occasion_id}/respond", len(occasions),
+         lambda i: ("POST", f"/api/occasions/{occasions[i]}/respond", {"response_text": "Thanks, sounds great"})),
+        ("GET /api/leads/{lead_id}/detect-occasions", n_requests,
+         lambda i: ("GET", f"/api/leads/{lead(i)}/detect-occasions", None)),
+        ("POST /api/campaigns", n_requests, lambda i: ("POST", "/api/campaigns", {
+            "name": f"Bench campaign {i}", "occasion_type": "holiday_season", "start": False, "send_rate": 10_000,
+            "lead_ids": [lead(i * 20 + k) for k in range(20)]})),
+        ("GET /api/campaigns", n_requests, lambda i: ("GET", "/api/campaigns", None)),
+        ("GET /api/campaigns/{campaign_id}", n_requests, lambda i: ("GET", f"/api/campaigns/{campaign(i)}", None)),
+        ("POST /api/campaigns/{campaign_id}/pause", n_requests,
+         lambda i: ("POST", f"/api/campaigns/{campaign(i)}/pause", None)),
+        ("POST /api/campaigns/{campaign_id}/run", n_requests,
+         lambda i: ("POST", f"/api/campaigns/{campaign(i)}/run", None)),
+        ("POST /api/campaigns/{campaign_id}/recalculate-health", n_requests,
+         lambda i: ("POST", f"/api/campaigns/{campaign(i)}/recalculate-health", None)),
+        ("GET /metrics", n_requests, lambda i: ("GET", "/metrics", None)),
+    ], campaigns
+
+
+def percentile_summary(latencies: list, queries: list, errors: int) -> dict:
+    seconds = np.asarray(latencies)
+    p50, p95, p99 = np.percentile(seconds * 1000, [50, 95, 99]) if seconds.size else (None, None, None)
+    return {
+        "requests": int(seconds.size),
+        "errors": errors,
+        "throughput_rps": round(seconds.size / seconds.sum(), 1) if seconds.size else None,
+        "mean_ms": round(float(seconds.mean() * 1000), 3) if seconds.size else None,
+        "p50_ms": round(float(p50), 3) if seconds.size else None,
+        "p95_ms": round(float(p95), 3) if seconds.size else None,
+        "p99_ms": round(float(p99), 3) if seconds.size else None,
+        "queries_per_request": round(float(np.mean(queries)), 1) if queries else None,
+    }
+
+
+async def drive_endpoints(scenario: list, campaigns: list, warmup: int) -> dict:
+    """Issue each endpoint's requests one at a time and summarize their latencies"""
+    import httpx
+    from main import app
+
+    results = {}
+    quiet = open(os.devnull, "w")  # demo-mode sends print every message
+    transport = httpx.ASGITransport(app=app)
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name, count, make_request in scenario:
+                if count <= 0:
+                    continue
+                latencies, queries, errors, failures = [], [], 0, []
+                # Only reads are warmed up - writes consume their pools (pending actions, draft campaigns)
+                skip = warmup if name.startswith("GET ") else 0
+                for i in range(count + skip):
+                    method, path, body = make_request(i % count)
+                    started = time.perf_counter()
+                    with contextlib.redirect_stdout(quiet):
+                        response = await client.request(method, path, json=body)
+                    elapsed = time.perf_counter() - started
+
+                    if name == "POST /api/campaigns" and response.status_code == 200:
+                        campaigns.append(response.json()["campaign"]["id"])
+                    if i < skip:
+                        continue
+                    latencies.append(elapsed)
+                    if "x-db-query-count" in response.headers:
+                        queries.append(int(response.headers["x-db-query-count"]))
+                    if response.status_code >= 400:
+                        errors += 1
+                        failures.append(f"{response.status_code} {path}: {response.text[:200]}")
+
+                results[name] = percentile_summary(latencies, queries, errors)
+                status = f"{errors} errors (first: {failures[0]})" if errors else "ok"
+                print(f"⏱️  {name}: p50 {results[name]['p50_ms']} ms, p95 {results[name]['p95_ms']} ms - {status}")
+    finally:
+        await app.router.shutdown()
+        quiet.close()
+
+    return results
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    """
+    Endpoints whose p95 regressed against the baseline.
+
+    Returns:
+        List of dicts with the endpoint, baseline/current p95 and their ratio
+    """
+    regressions = []
+    for name, current in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before or not before.get("p95_ms") or current["p95_ms"] is None:
+            continue
+        ratio = current["p95_ms"] / before["p95_ms"]
+        if ratio > 1 + tolerance and current["p95_ms"] - before["p95_ms"] >= min_delta_ms:
+            regressions.append({
+                "endpoint": name,
+                "baseline_p95_ms": before["p95_ms"],
+                "p95_ms": current["p95_ms"],
+                "ratio": round(ratio, 2),
+            })
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every API endpoint on a seeded synthetic book")
+    parser.add_argument("--leads", type=int, default=10_000, help="leads to seed (e.g. 10000, 100000, 1000000)")
+    parser.add_argument("--requests", type=int, default=50, help="timed requests per endpoint")
+    parser.add_argument("--heavy-requests", type=int, default=5, help="timed requests per whole-book endpoint")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed requests per read endpoint")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--llm-url", default=None, help="LLM stand-in base URL (see llm_standin.py)")
+    parser.add_argument("--db", default=None, help="SQLite file (seeded if empty; a temp file by default)")
+    parser.add_argument("--out", default=None, help="write the JSON report here (stdout otherwise)")
+    parser.add_argument("--baseline", default=None, help="baseline report to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run's report to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p95 increase")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore p95 increases smaller than this")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="solisa-bench-"), "bench.db")
+    configure_environment(db_path, args.llm_url)
+
+    started = time.perf_counter()
+    seeded = seed_database(args.leads, args.seed)
+    seed_s = time.perf_counter() - started
+    print(f"🌱 Seeded {seeded} in {seed_s:.1f}s ({db_path})")
+
+    scenario, campaigns = build_scenario(args.requests, args.heavy_requests, seeded["leads"], args.seed)
+    endpoints = asyncio.run(drive_endpoints(scenario, campaigns, args.warmup))
+
+    report = {
+        "meta": {
+            "leads": seeded["leads"],
+            "seeded": seeded,
+            "requests": args.requests,
+            "heavy_requests": args.heavy_requests,
+            "seed": args.seed,
+            "llm_url": args.llm_url,
+            "python": sys.version.split()[0],
+            "generated_at": datetime.utcnow().isoformat(),
+        },
+        "endpoints": endpoints,
+    }
+
+    regressions = []
+    if args.baseline and os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance, args.min_delta_ms)
+        report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(output)
+        print(f"💾 Saved baseline to {args.baseline}")
+
+    for regression in regressions:
+        print(f"⚠️  Regression: {regression['endpoint']} p95 {regression['baseline_p95_ms']} -> "
+              f"{regression['p95_ms']} ms (x{regression['ratio']})")
+    sys.exit(1 if regressions else 0)
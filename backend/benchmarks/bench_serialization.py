@@ -0,0 +1,166 @@
+"""
+ORM vs. fast-path serialization of the list endpoints.
+
+For /api/leads, /api/life-events and /api/occasions, builds the response body
+both ways on a seeded book (bench_endpoints.seed_database):
+
+  - orm: model objects -> to_dict() -> response_model validation and
+    serialization (what FastAPI does for /api/leads) -> JSONResponse
+  - fast: Core select mappings -> FastJSONResponse (serialization.py), with
+    orjson and with the standard library fallback
+
+and checks that the bodies are byte-identical. Reports the median time, SQL
+queries per build and the speedup as JSON, and exits 1 if any body differs.
+
+    python benchmarks/bench_serialization.py --leads 10000 --runs 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import contextlib
+from datetime import datetime
+from typing import List
+
+from bench_endpoints import configure_environment, seed_database
+
+
+def orm_bodies() -> dict:
+    """Endpoint -> body builder for the ORM path the list endpoints used before"""
+    from pydantic import TypeAdapter
+    from fastapi.responses import JSONResponse
+    from main import LeadResponse
+    from models import Lead, LifeEvent, Occasion
+
+    leads_adapter = TypeAdapter(List[LeadResponse])
+
+    def leads(db):
+        leads = db.query(Lead).order_by(Lead.created_at.desc()).all()
+        content = [lead.to_dict() for lead in leads]
+        # FastAPI validates against response_model and serializes in JSON mode
+        content = leads_adapter.dump_python(leads_adapter.validate_python(content), mode="json", by_alias=True)
+        return JSONResponse(content).body
+
+    def with_leads(model, key):
+        def build(db):
+            enriched = []
+            for item in db.query(model).order_by(model.created_at.desc()).all():
+                item_dict = item.to_dict()
+                lead = db.query(Lead).filter(Lead.id == item.lead_id).first()
+                if lead:
+                    item_dict['lead_name'] = lead.full_name
+                    item_dict['lead_email'] = lead.email
+                    item_dict['lead_phone'] = lead.phone
+                enriched.append(item_dict)
+            return JSONResponse({key: enriched}).body
+        return build
+
+    return {
+        "GET /api/leads": leads,
+        "GET /api/life-events": with_leads(LifeEvent, "life_events"),
+        "GET /api/occasions": with_leads(Occasion, "occasions"),
+    }
+
+
+def fast_bodies() -> dict:
+    """Endpoint -> body builder for the fast path"""
+    from serialization import FastJSONResponse, lead_list, life_event_list, occasion_list
+
+    return {
+        "GET /api/leads": lambda db: FastJSONResponse(lead_list(db)).body,
+        "GET /api/life-events": lambda db: FastJSONResponse({"life_events": life_event_list(db)}).body,
+        "GET /api/occasions": lambda db: FastJSONResponse({"occasions": occasion_list(db)}).body,
+    }
+
+
+@contextlib.contextmanager
+def stdlib_json():
+    """Make FastJSONResponse use its json fallback inside the block"""
+    import serialization
+    saved, serialization.orjson = serialization.orjson, None
+    try:
+        yield
+    finally:
+        serialization.orjson = saved
+
+
+def measure(build, runs: int) -> tuple:
+    """(body, median seconds, queries) for a body builder, each run on a fresh session"""
+    from database import SessionLocal
+    from query_accounting import count_queries
+
+    timings = []
+    for _ in range(runs):
+        db = SessionLocal()
+        try:
+            with count_queries() as queries:
+                started = time.perf_counter()
+                body = build(db)
+                timings.append(time.perf_counter() - started)
+        finally:
+            db.close()
+    return body, statistics.median(timings), queries.count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ORM and fast-path serialization of the list endpoints")
+    parser.add_argument("--leads", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=5, help="timed builds per path (median reported)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=None, help="SQLite file (seeded if empty; a temp file by default)")
+    parser.add_argument("--out", default=None, help="write the JSON report here (stdout otherwise)")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="solisa-bench-"), "bench.db")
+    configure_environment(db_path)
+    seeded = seed_database(args.leads, args.seed)
+
+    import serialization
+
+    results, mismatches = {}, []
+    orm, fast = orm_bodies(), fast_bodies()
+    for name in orm:
+        orm_body, orm_s, orm_queries = measure(orm[name], args.runs)
+        fast_body, fast_s, fast_queries = measure(fast[name], args.runs)
+        with stdlib_json():
+            stdlib_body, stdlib_s, _ = measure(fast[name], args.runs)
+
+        for path, body in (("fast", fast_body), ("fast_stdlib", stdlib_body)):
+            if body != orm_body:
+                mismatches.append(f"{name}: {path} body differs from the ORM path")
+
+        results[name] = {
+            "bytes": len(orm_body),
+            "orm_ms": round(orm_s * 1000, 2),
+            "fast_ms": round(fast_s * 1000, 2),
+            "fast_stdlib_ms": round(stdlib_s * 1000, 2),
+            "orm_queries": orm_queries,
+            "fast_queries": fast_queries,
+            "speedup": round(orm_s / fast_s, 1) if fast_s else None,
+            "identical": fast_body == orm_body == stdlib_body,
+        }
+
+    report = {
+        "meta": {
+            "leads": seeded["leads"],
+            "runs": args.runs,
+            "orjson": serialization.orjson is not None,
+            "python": sys.version.split()[0],
+            "generated_at": datetime.utcnow().isoformat(),
+        },
+        "endpoints": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    for mismatch in mismatches:
+        print(f"❌ {mismatch}")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,74 @@
+"""
+Per-message cost of rendering campaign messages.
+
+Compares the registry (render only the selected template) with building the
+full table of f-string messages per call, as the engines used to.
+
+    python benchmarks/bench_templates.py --n 100000
+"""
+import os
+import sys
+import time
+import json
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from message_templates import get_template  # noqa: E402
+
+OCCASIONS = ["policy_anniversary", "birthday", "policy_renewal", "usage_based_savings", "holiday_season"]
+LIFE_EVENTS = ["new_baby", "home_reno", "teen_driver", "job_change"]
+
+
+def table_occasion_message(occasion_type: str, first_name: str, occasion_data: dict) -> dict:
+    """Old approach: every message in the table is formatted, one is returned"""
+    occasion_messages = {
+        key: {"message": get_template(f"occasion.{key}").text.format(
+            first_name=first_name,
+            years=occasion_data.get("years", 2),
+            days_until=occasion_data.get("days_until", 30)
+        ), **get_template(f"occasion.{key}").metadata}
+        for key in OCCASIONS
+    }
+    return occasion_messages.get(occasion_type)
+
+
+def registry_occasion_message(occasion_type: str, first_name: str, occasion_data: dict) -> dict:
+    template = get_template(f"occasion.{occasion_type}", default="occasion.default")
+    return {
+        "message": template.render(
+            first_name=first_name,
+            years=occasion_data.get("years", 2),
+            days_until=occasion_data.get("days_until", 30)
+        ),
+        **template.metadata
+    }
+
+
+def registry_life_event_message(event_type: str, first_name: str) -> str:
+    return get_template(f"life_event.{event_type}", default="life_event.default").render(first_name=first_name)
+
+
+def run(label: str, fn, n: int) -> dict:
+    started = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    elapsed = time.perf_counter() - started
+    return {"case": label, "messages": n, "total_s": round(elapsed, 3), "per_message_us": round(elapsed / n * 1e6, 2)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark campaign message rendering")
+    parser.add_argument("--n", type=int, default=100_000)
+    args = parser.parse_args()
+
+    names = ["Jane", "Carlos", "Priya", "Wei", "Omar"]
+    data = {"years": 3, "days_until": 21}
+
+    results = [
+        run("occasion_full_table", lambda i: table_occasion_message(OCCASIONS[i % 5], names[i % 5], data), args.n),
+        run("occasion_registry", lambda i: registry_occasion_message(OCCASIONS[i % 5], names[i % 5], data), args.n),
+        run("life_event_registry", lambda i: registry_life_event_message(LIFE_EVENTS[i % 4], names[i % 5]), args.n),
+    ]
+
+    print(json.dumps(results, indent=2))
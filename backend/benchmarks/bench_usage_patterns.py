@@ -0,0 +1,68 @@
+"""
+Throughput of the batch usage analyzer on synthetic usage features.
+
+Scores every customer, then ranks the top candidates; a per-customer loop
+over analyze_usage on a sample is included for comparison.
+
+    python benchmarks/bench_usage_patterns.py --n 1000000
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from usage_analysis import rank_usage_candidates, best_patterns, analyze_usage, FEATURES  # noqa: E402
+
+
+def synthetic_features(n: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    has_home = rng.random(n) < 0.35
+    return {
+        "annual_mileage": rng.gamma(4.0, 13_500 / 4.0, n).round(),
+        "claims_count": rng.poisson(0.3, n),
+        "app_sessions_90d": rng.poisson(8, n),
+        "owns_home": has_home | (rng.random(n) < 0.3),
+        "has_auto": rng.random(n) < 0.8,
+        "has_home": has_home,
+    }
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batch usage pattern analysis")
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--top", type=int, default=1000)
+    parser.add_argument("--loop-sample", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    features = synthetic_features(args.n, args.seed)
+    lead_ids = np.arange(1, args.n + 1)
+
+    (best, _, _), score_s = timed(lambda: best_patterns(features))
+    top, top_s = timed(lambda: rank_usage_candidates(lead_ids, features, top_n=args.top))
+    _, all_s = timed(lambda: rank_usage_candidates(lead_ids, features))
+
+    sample = min(args.loop_sample, args.n)
+    _, loop_s = timed(lambda: [analyze_usage({name: features[name][i] for name in FEATURES}) for i in range(sample)])
+
+    results = {
+        "rows": args.n,
+        "candidates": int((best >= 0).sum()),
+        "score_s": round(score_s, 3),
+        "score_rows_per_s": round(args.n / score_s),
+        "rank_top_n_s": round(top_s, 3),
+        "rank_all_s": round(all_s, 3),
+        "per_row_loop_rows_per_s": round(sample / loop_s),
+        "top_candidate": top[0] if top else None,
+    }
+    print(json.dumps(results, indent=2))
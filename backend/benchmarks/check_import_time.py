@@ -0,0 +1,89 @@
+"""
+Import-time budget for the API: cold-imports main in fresh interpreters and fails
+when the import is over budget or has side effects it shouldn't.
+
+Checks that importing main:
+  - takes at most --budget-ms (median of --runs cold starts)
+  - doesn't touch the database (no file created - DDL runs at startup)
+  - doesn't import the Groq, Twilio or SendGrid SDKs (clients are built on first use)
+
+    python benchmarks/check_import_time.py --budget-ms 1500
+
+Prints the slowest imports (from python -X importtime) and exits 1 on failure.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+# SDKs that must not be imported until a client is needed
+LAZY_MODULES = ("groq", "twilio", "sendgrid")
+
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({"ms": elapsed * 1000, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def cold_import(db_path: str) -> tuple:
+    """Import main in a fresh interpreter; returns (probe result, -X importtime lines)"""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", DEMO_MODE="true")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=APP_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing main failed:\n{result.stderr[-2000:]}")
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    timings = [line for line in result.stderr.splitlines() if line.startswith("import time:")]
+    return probe, timings
+
+
+def slowest_imports(timings: list, top: int) -> list:
+    """(cumulative ms, module) for the slowest top-level-ish imports"""
+    rows = []
+    for line in timings[1:]:
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        if cumulative_us.isdigit():
+            rows.append((int(cumulative_us) / 1000, name))
+    return sorted(rows, reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the cold import time of the API")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="solisa-import-"), "import.db")
+
+    runs = [cold_import(db_path) for _ in range(args.runs)]
+    median_ms = statistics.median(probe["ms"] for probe, _ in runs)
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"import took {median_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if os.path.exists(db_path):
+        failures.append("importing main touched the database")
+    eager = sorted({m for probe, _ in runs for m in probe["loaded"]})
+    if eager:
+        failures.append(f"imported at module load: {', '.join(eager)}")
+
+    print(f"⏱️  Cold import of main: {median_ms:.0f} ms median over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    for cumulative_ms, name in slowest_imports(runs[-1][1], args.top):
+        print(f"   {cumulative_ms:8.1f} ms  {name}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Import budget met")
+    sys.exit(1 if failures else 0)
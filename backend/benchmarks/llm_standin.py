@@ -0,0 +1,274 @@
+"""
+Local Groq/OpenAI-compatible chat completions server for load testing AI paths.
+
+Answers /openai/v1/chat/completions (Groq SDK) and /v1/chat/completions (OpenAI
+SDK) with canned responses per prompt type - touchpoint analysis, follow-up
+actions, policy health, outreach email and SMS - after a configurable latency,
+with optional 429/500 injection, malformed (non-JSON) replies and token
+streaming. Randomness comes from one seeded generator, so a run is repeatable.
+
+    python benchmarks/llm_standin.py --port 8090 --latency-ms 400 --latency-dist lognormal --rate-limit-rate 0.05
+
+Point the engines at it while sends stay in demo mode:
+
+    DEMO_MODE=true LLM_DEMO_MODE=false GROQ_API_KEY=standin GROQ_BASE_URL=http://127.0.0.1:8090 uvicorn main:app
+
+GET /stats returns request counts per prompt type and outcome; POST /stats/reset clears them.
+"""
+import os
+import re
+import json
+import time
+import uuid
+import zlib
+import random
+import asyncio
+import argparse
+import threading
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+
+def classify_prompt(prompt: str) -> str:
+    """Which engine prompt this is (matched on the fixed parts of each template)"""
+    if '"intent": "browsing/interested/ready/objecting/lost"' in prompt:
+        return "touchpoint_analysis"
+    if "Return ONLY the JSON array" in prompt:
+        return "followup_actions"
+    if '"health_score"' in prompt:
+        return "policy_health"
+    if "SUBJECT:" in prompt and "BODY:" in prompt:
+        return "email"
+    if "Generate only the SMS text" in prompt:
+        return "sms"
+    return "generic"
+
+
+def canned_response(prompt_type: str, prompt: str) -> str:
+    """Response text for a prompt type; scores vary with the prompt but are stable for it"""
+    digest = zlib.crc32(prompt.encode())
+
+    if prompt_type == "touchpoint_analysis":
+        return json.dumps({
+            "sentiment": ("positive", "neutral", "negative")[digest % 3],
+            "intent": ("browsing", "interested", "ready", "objecting", "lost")[digest % 5],
+            "objections": ["too expensive"] if digest % 2 else [],
+            "key_points": ["Comparing quotes", "Renewal coming up"],
+            "urgency": ("low", "medium", "high")[digest % 3]
+        })
+
+    if prompt_type == "followup_actions":
+        return json.dumps([
+            {
+                "action_type": "sms",
+                "priority": "high",
+                "content": "Hi! Quick follow-up on your quote - happy to walk through the numbers.",
+                "reasoning": "Keep momentum after the call",
+                "timing": "immediate"
+            },
+            {
+                "action_type": "email",
+                "priority": "medium",
+                "content": "Here's a summary of your options. Book a time here: https://calendly.com/solisa-demo/30min",
+                "reasoning": "Give them something to review",
+                "timing": "1day"
+            }
+        ])
+
+    if prompt_type == "policy_health":
+        score = 30 + digest % 65
+        risk = "low" if score >= 80 else "medium" if score >= 50 else "high"
+        return json.dumps({
+            "health_score": score,
+            "churn_risk": risk,
+            "churn_probability": 100 - score,
+            "days_to_predicted_churn": 30 + score * 3,
+            "engagement_score": score,
+            "satisfaction_score": score,
+            "usage_score": score,
+            "payment_score": 90,
+            "reasoning": "Stand-in score derived from the prompt",
+            "retention_actions": ["Schedule a policy review"],
+            "priority": risk
+        })
+
+    if prompt_type == "email":
+        return ("SUBJECT: Your personalized insurance quote\n"
+                "BODY:\nHi there,\n\nBased on what you shared, you could save on your premium. "
+                "Book a quick call: https://calendly.com/solisa-demo/30min\n\nBest,\nAlex @ Solisa")
+
+    if prompt_type == "sms":
+        return "Hi! You could save on your policy - book 15 min: https://calendly.com/solisa-demo/30min - Alex @ Solisa 👋"
+
+    return "OK"
+
+
+class StandinConfig:
+    """Latency, fault injection and determinism settings"""
+
+    def __init__(self, latency_ms: float = 200, latency_dist: str = "fixed", jitter_ms: float = 50,
+                 token_latency_ms: float = 10, rate_limit_rate: float = 0.0, error_rate: float = 0.0,
+                 malformed_rate: float = 0.0, seed: int = 0):
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_dist must be one of {LATENCY_DISTRIBUTIONS}")
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.jitter_ms = jitter_ms  # uniform: +/- range, normal: std dev, lognormal: sigma x median
+        self.token_latency_ms = token_latency_ms
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self) -> tuple:
+        """Latency in seconds and the outcome for the next request"""
+        with self.lock:
+            if self.latency_dist == "fixed":
+                latency = self.latency_ms
+            elif self.latency_dist == "uniform":
+                latency = self.rng.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+            elif self.latency_dist == "normal":
+                latency = self.rng.gauss(self.latency_ms, self.jitter_ms)
+            else:
+                sigma = self.jitter_ms / self.latency_ms if self.latency_ms else 0
+                latency = self.latency_ms * self.rng.lognormvariate(0, sigma)
+
+            roll = self.rng.random()
+
+        if roll < self.rate_limit_rate:
+            outcome = "rate_limited"
+        elif roll < self.rate_limit_rate + self.error_rate:
+            outcome = "error"
+        elif roll < self.rate_limit_rate + self.error_rate + self.malformed_rate:
+            outcome = "malformed"
+        else:
+            outcome = "ok"
+        return max(latency, 0) / 1000, outcome
+
+
+def _count_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def _completion(model: str, content: str, prompt: str) -> dict:
+    prompt_tokens, completion_tokens = _count_tokens(prompt), _count_tokens(content)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens}
+    }
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason: str = None) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def create_app(config: StandinConfig = None) -> FastAPI:
+    """Stand-in server app (one StandinConfig shared by all requests)"""
+    config = config or StandinConfig()
+    app = FastAPI(title="LLM stand-in")
+    stats = {}
+    stats_lock = threading.Lock()
+
+    def record(prompt_type: str, outcome: str):
+        with stats_lock:
+            stats[(prompt_type, outcome)] = stats.get((prompt_type, outcome), 0) + 1
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "stand-in")
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []) if m.get("role") == "user")
+        prompt_type = classify_prompt(prompt)
+        latency, outcome = config.draw()
+        record(prompt_type, outcome)
+
+        await asyncio.sleep(latency)
+
+        if outcome == "rate_limited":
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": "1", "x-ratelimit-remaining-requests": "0"},
+                content={"error": {"message": "Rate limit reached (stand-in)", "type": "requests", "code": "rate_limit_exceeded"}}
+            )
+        if outcome == "error":
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Internal server error (stand-in)", "type": "internal_server_error"}}
+            )
+
+        content = "Sorry, I can't help with that right now." if outcome == "malformed" else canned_response(prompt_type, prompt)
+
+        if not body.get("stream"):
+            return JSONResponse(_completion(model, content, prompt))
+
+        async def stream():
+            completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+            yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+            for token in re.findall(r"\S+\s*", content):
+                await asyncio.sleep(config.token_latency_ms / 1000)
+                yield _chunk(completion_id, model, {"content": token})
+            yield _chunk(completion_id, model, {}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    app.add_api_route("/openai/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+
+    @app.get("/stats")
+    def get_stats():
+        with stats_lock:
+            by_type = {}
+            for (prompt_type, outcome), count in sorted(stats.items()):
+                by_type.setdefault(prompt_type, {})[outcome] = count
+        return {"requests": sum(stats.values()), "by_prompt_type": by_type}
+
+    @app.post("/stats/reset")
+    def reset_stats():
+        with stats_lock:
+            stats.clear()
+        return {"reset": True}
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Groq/OpenAI-compatible LLM stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("LLM_STANDIN_PORT", "8090")))
+    parser.add_argument("--latency-ms", type=float, default=200, help="fixed/mean/median response latency")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="spread of the latency distribution")
+    parser.add_argument("--token-latency-ms", type=float, default=10, help="delay between streamed tokens")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of replies that are not valid JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(StandinConfig(
+        latency_ms=args.latency_ms,
+        latency_dist=args.latency_dist,
+        jitter_ms=args.jitter_ms,
+        token_latency_ms=args.token_latency_ms,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed
+    )), host=args.host, port=args.port)
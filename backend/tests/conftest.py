@@ -0,0 +1,52 @@
+"""
+Test setup: the app runs in demo mode against a throwaway SQLite database.
+
+    cd backend
+    python -m pytest -q
+
+The environment is set before the app modules are imported (they read it at
+import time); every test starts with empty tables.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='solisa-tests-')}/test.db"
+os.environ["DEMO_MODE"] = "true"
+os.environ["FOLLOWUP_SCHEDULER_ENABLED"] = "false"
+os.environ["STATE_BACKEND"] = "memory"
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, SessionLocal, engine, init_db  # noqa: E402
+
+init_db()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(autouse=True)
+def empty_tables():
+    yield
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
@@ -0,0 +1,130 @@
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from app import campaign_runner
+from app.models import Lead, Occasion, Campaign
+from app.campaign_runner import run_campaign, pause_interrupted_campaigns, render_campaign_rows
+
+
+class Crash(BaseException):
+    """The process dying mid-run (not handled like an ordinary error)"""
+
+
+@pytest.fixture
+def leads(db):
+    rows = [Lead(full_name=f"Lead {i}", email=f"lead{i}@example.com", phone=f"555000{i:04d}", insurance_type="Auto")
+            for i in range(30)]
+    db.add_all(rows)
+    db.commit()
+    return [lead.id for lead in rows]
+
+
+@pytest.fixture
+def sends(monkeypatch):
+    sent = Counter()
+
+    def record(channel, content, lead_data, reasoning=None):
+        sent[lead_data["email"]] += 1
+        return {"success": True}
+
+    monkeypatch.setattr(campaign_runner, "dispatch_followup_action", record)
+    monkeypatch.setattr(campaign_runner, "recalculate_campaign_health", lambda *args, **kwargs: 0)
+    return sent
+
+
+def create_campaign(client) -> int:
+    response = client.post("/api/campaigns", json={"name": "Holidays", "occasion_type": "holiday_season",
+                                                   "send_rate": 0, "start": False})
+    assert response.status_code == 200, response.text
+    return response.json()["campaign"]["id"]
+
+
+def occasion_outcomes(db, campaign_id) -> Counter:
+    db.expire_all()
+    return Counter(outcome for (outcome,) in db.query(Occasion.outcome).filter(Occasion.campaign_id == campaign_id))
+
+
+def test_resume_sends_occasions_queued_by_a_stopped_run(client, db, leads, sends):
+    campaign_id = create_campaign(client)
+    campaign = db.get(Campaign, campaign_id)
+    queued = db.query(Lead.id, Lead.full_name, Lead.created_at).order_by(Lead.id).limit(10).all()
+    db.execute(campaign_runner.insert(Occasion), render_campaign_rows(campaign, queued, datetime.utcnow()))
+    campaign.last_lead_id = queued[-1].id
+    campaign.status = "running"
+    db.commit()
+
+    assert pause_interrupted_campaigns(db) == 1
+    state = run_campaign(campaign_id, batch_size=7)
+
+    assert state["status"] == "completed"
+    assert state["processed"] == state["sent"] == 30
+    assert len(sends) == 30 and set(sends.values()) == {1}
+    assert occasion_outcomes(db, campaign_id) == {"pending": 30}
+
+
+def test_a_crash_mid_send_never_messages_anyone_twice(client, db, leads, sends, monkeypatch):
+    campaign_id = create_campaign(client)
+    working = campaign_runner.dispatch_followup_action
+
+    def crash_on_lead_12(channel, content, lead_data, reasoning=None):
+        if lead_data["email"] == "lead12@example.com":
+            raise Crash()
+        return working(channel, content, lead_data, reasoning)
+
+    monkeypatch.setattr(campaign_runner, "dispatch_followup_action", crash_on_lead_12)
+    with pytest.raises(Crash):
+        run_campaign(campaign_id, batch_size=10)
+    monkeypatch.setattr(campaign_runner, "dispatch_followup_action", working)
+
+    assert occasion_outcomes(db, campaign_id)["sending"] == 10
+
+    assert pause_interrupted_campaigns(db) == 1
+    state = run_campaign(campaign_id, batch_size=10)
+
+    outcomes = occasion_outcomes(db, campaign_id)
+    assert state["status"] == "completed"
+    assert max(sends.values()) == 1
+    assert outcomes["interrupted"] == 10 and outcomes["pending"] == 20
+    assert state["processed"] == 30 and state["sent"] == 20 and state["failed"] == 10
+
+
+def test_resuming_a_paused_run_mid_batch_does_not_start_a_second_runner(client, db, leads, sends, monkeypatch):
+    campaign_id = create_campaign(client)
+    working = campaign_runner.dispatch_followup_action
+    responses = []
+
+    def pause_and_resume_on_lead_5(channel, content, lead_data, reasoning=None):
+        if lead_data["email"] == "lead5@example.com":
+            responses.append(client.post(f"/api/campaigns/{campaign_id}/pause"))
+            responses.append(client.post(f"/api/campaigns/{campaign_id}/run"))
+        return working(channel, content, lead_data, reasoning)
+
+    monkeypatch.setattr(campaign_runner, "dispatch_followup_action", pause_and_resume_on_lead_5)
+    state = run_campaign(campaign_id, batch_size=10)
+    monkeypatch.setattr(campaign_runner, "dispatch_followup_action", working)
+
+    assert [response.status_code for response in responses] == [200, 409]
+    assert state["status"] == "paused" and state["processed"] == 10
+
+    assert client.post(f"/api/campaigns/{campaign_id}/run").status_code == 200
+    db.expire_all()
+    campaign = db.get(Campaign, campaign_id)
+    assert campaign.status == "completed"
+    assert campaign.processed == campaign.sent == 30
+    assert len(sends) == 30 and set(sends.values()) == {1}
+
+
+def test_health_pass_is_not_started_twice(client, leads):
+    campaign_id = create_campaign(client)
+    lease = campaign_runner.campaign_health_lease(campaign_id)
+    assert lease.acquire(60)
+    try:
+        response = client.post(f"/api/campaigns/{campaign_id}/recalculate-health")
+        assert response.status_code == 409
+        assert campaign_runner.recalculate_campaign_health(campaign_id) == 0
+    finally:
+        lease.release()
+
+    assert client.post(f"/api/campaigns/{campaign_id}/recalculate-health").status_code == 200
@@ -0,0 +1,23 @@
+import pytest
+
+from app.models import Lead
+from app.enrichment import EnrichmentProvider
+
+
+def test_provider_profile_is_stored_on_the_lead(client, db):
+    response = client.post("/api/leads", json={"full_name": "Ana Lima", "email": "ana@acme.io",
+                                               "phone": "555-222-3333", "insurance_type": "Auto"})
+
+    assert response.status_code == 200, response.text
+    profile = response.json()["profile"]
+    assert profile["company"] == "Acme" and profile["job_title"] and profile["industry"]
+    assert db.get(Lead, response.json()["id"]).profile == profile
+
+
+def test_providers_must_implement_both_lookups():
+    class PersonOnly(EnrichmentProvider):
+        def fetch_person(self, email):
+            return None
+
+    with pytest.raises(TypeError):
+        PersonOnly()
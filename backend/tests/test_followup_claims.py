@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+
+from app.models import Lead, FollowUpAction
+from app.database import SessionLocal
+from app.followup_scheduler import FollowUpScheduler, CLAIM_TIMEOUT_SECONDS
+from app.query_accounting import count_queries
+
+
+def add_actions(db, count: int, status: str = "pending", claimed_at: datetime = None) -> list:
+    lead = Lead(full_name="Ana Lima", email=f"ana{count}{status}@example.com", phone="555-222-3333", insurance_type="Auto")
+    db.add(lead)
+    db.flush()
+    actions = [
+        FollowUpAction(lead_id=lead.id, action_type="sms", priority="medium", content="Checking in",
+                       timing="immediate", status=status, claimed_at=claimed_at)
+        for _ in range(count)
+    ]
+    db.add_all(actions)
+    db.commit()
+    return [action.id for action in actions]
+
+
+def statuses(db, action_ids: list) -> list:
+    db.expire_all()
+    return [db.get(FollowUpAction, action_id).status for action_id in action_ids]
+
+
+def test_rehydrate_releases_claims_left_by_a_dead_worker(db):
+    stale = add_actions(db, 2, "in_progress", datetime.utcnow() - timedelta(seconds=CLAIM_TIMEOUT_SECONDS + 60))
+    live = add_actions(db, 1, "in_progress", datetime.utcnow())
+    scheduler = FollowUpScheduler(session_factory=SessionLocal)
+
+    assert scheduler.rehydrate(quiet=True) == 2
+    results = scheduler.run_due()
+
+    assert sorted(result["action_id"] for result in results) == stale
+    assert statuses(db, stale) == ["completed", "completed"]
+    assert statuses(db, live) == ["in_progress"]
+
+
+def test_leader_picks_up_stale_claims_without_a_restart(db):
+    stale = add_actions(db, 1, "in_progress", datetime.utcnow() - timedelta(seconds=CLAIM_TIMEOUT_SECONDS + 60))
+    scheduler = FollowUpScheduler(session_factory=SessionLocal)
+
+    results = scheduler.run_as_leader()
+    scheduler.stop()
+
+    assert [result["action_id"] for result in results] == stale
+    assert statuses(db, stale) == ["completed"]
+
+
+def test_an_action_is_only_executed_once(db):
+    action_ids = add_actions(db, 3)
+    first, second = FollowUpScheduler(session_factory=SessionLocal), FollowUpScheduler(session_factory=SessionLocal)
+
+    sent = first.execute(action_ids) + second.execute(action_ids)
+
+    assert sorted(result["action_id"] for result in sent) == action_ids
+    assert statuses(db, action_ids) == ["completed"] * 3
+
+
+def test_bulk_execute_skips_actions_that_are_not_pending(client, db):
+    pending = add_actions(db, 2)
+    done = add_actions(db, 1, "completed") + add_actions(db, 1, "in_progress", datetime.utcnow()) + add_actions(db, 1, "failed")
+
+    body = client.post("/api/followup/execute-bulk", json={"action_ids": pending + done + [999999]}).json()
+
+    outcomes = {result["action_id"]: result["success"] for result in body["results"]}
+    assert body["executed"] == 2
+    assert [outcomes[action_id] for action_id in pending] == [True, True]
+    assert not any(outcomes[action_id] for action_id in done + [999999])
+    assert statuses(db, pending + done) == ["completed", "completed", "completed", "in_progress", "failed"]
+
+
+def test_bulk_execute_and_scheduler_send_each_action_once(client, db, monkeypatch):
+    action_ids = add_actions(db, 4)
+    sent = []
+
+    from app import main, followup_scheduler
+
+    def record(jobs):
+        sent.extend(jobs)
+        return [{"success": True} for _ in jobs]
+
+    monkeypatch.setattr(main, "dispatch_followup_actions", record)
+    monkeypatch.setattr(followup_scheduler, "dispatch_followup_actions", record)
+
+    scheduler = FollowUpScheduler(session_factory=SessionLocal)
+    scheduler.execute(action_ids[:2])
+    body = client.post("/api/followup/execute-bulk", json={"action_ids": action_ids}).json()
+    scheduler.execute(action_ids)
+
+    assert len(sent) == 4
+    assert body["executed"] == 2
+    assert statuses(db, action_ids) == ["completed"] * 4
+
+
+def test_failed_sends_are_marked_failed(client, db, monkeypatch):
+    action_ids = add_actions(db, 2)
+
+    from app import main
+
+    monkeypatch.setattr(main, "dispatch_followup_actions", lambda jobs: [{"success": False, "error": "undeliverable"} for _ in jobs])
+    monkeypatch.setattr(main, "dispatch_followup_action", lambda *args: {"success": False, "error": "undeliverable"})
+
+    body = client.post("/api/followup/execute-bulk", json={"action_ids": action_ids[:1]}).json()
+    single = client.post(f"/api/followup/{action_ids[1]}/execute")
+
+    assert body["executed"] == 0 and body["failed"] == 1
+    assert single.json()["action"]["status"] == "failed"
+    assert statuses(db, action_ids) == ["failed", "failed"]
+    assert client.post(f"/api/followup/{action_ids[1]}/execute").status_code == 409
+
+
+def test_bulk_execute_reports_rejected_actions_without_a_query_each(client, db):
+    def rejected_run(count: int) -> int:
+        action_ids = add_actions(db, count, "completed")
+        with count_queries() as queries:
+            body = client.post("/api/followup/execute-bulk", json={"action_ids": action_ids}).json()
+        assert [result["error"] for result in body["results"]] == ["Action is completed, not pending"] * count
+        return queries.count
+
+    assert rejected_run(2) == rejected_run(20)
+
+
+def test_bulk_execute_only_runs_pending_actions(client, db):
+    add_actions(db, 1, "failed")
+
+    assert client.post("/api/followup/execute-bulk", json={"status": "failed"}).status_code == 400
+    assert client.post("/api/followup/execute-bulk", json={}).json()["requested"] == 0
+
+
+def test_execute_releases_the_claim_when_the_lead_is_gone(client, db):
+    action_ids = add_actions(db, 1)
+    db.query(Lead).delete()
+    db.commit()
+
+    response = client.post(f"/api/followup/{action_ids[0]}/execute")
+
+    assert response.status_code == 404
+    assert statuses(db, action_ids) == ["pending"]
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Lead, PolicyHealth, PolicyHealthHistory, LatestPolicyHealth
+from app.health_history import compact_policy_health, health_trend
+
+NOW = datetime(2025, 6, 30, 12)
+TODAY = NOW.date()
+
+
+@pytest.fixture
+def lead_with_history(db):
+    """A lead with 2 scores a day for the last 20 days and 1 a day 120-129 days ago"""
+    lead = Lead(full_name="Ana Lima", email="ana@example.com", phone="555-222-3333", insurance_type="Home")
+    db.add(lead)
+    db.commit()
+
+    records = [(NOW - timedelta(days=day, hours=hour), 50 + day) for day in range(20) for hour in (1, 5)]
+    records += [(NOW - timedelta(days=day), 30) for day in range(120, 130)]
+    db.add_all(PolicyHealth(lead_id=lead.id, health_score=score, churn_risk="medium", priority="high",
+                            calculated_at=calculated_at) for calculated_at, score in records)
+    db.commit()
+    return lead.id, records
+
+
+def history(db, lead_id) -> list:
+    db.expire_all()
+    return db.query(PolicyHealthHistory).filter(PolicyHealthHistory.lead_id == lead_id).all()
+
+
+def test_compaction_keeps_the_latest_records_and_preserves_every_sample(db, lead_with_history):
+    lead_id, records = lead_with_history
+    newest_id = db.query(PolicyHealth.id).filter(PolicyHealth.lead_id == lead_id) \
+        .order_by(PolicyHealth.calculated_at.desc()).first()[0]
+
+    result = compact_policy_health(db, keep_latest=5, daily_days=90, today=TODAY)
+
+    assert result == {"records_compacted": len(records) - 5, "days_rolled_up": 0}
+    kept = [score for (score,) in db.query(PolicyHealth.health_score).filter(PolicyHealth.lead_id == lead_id)]
+    points = history(db, lead_id)
+    assert len(kept) == 5
+    assert sum(point.samples for point in points) == len(records) - 5
+    assert sum(point.health_score * point.samples for point in points) + sum(kept) == \
+        pytest.approx(sum(score for _, score in records))
+    assert {point.granularity for point in points} == {"day", "week"}
+    assert all(point.period_start.weekday() == 0 for point in points if point.granularity == "week")
+    assert db.get(LatestPolicyHealth, lead_id).policy_health_id == newest_id
+
+
+def test_compaction_is_idempotent_and_rolls_aged_days_into_weeks(db, lead_with_history):
+    lead_id, records = lead_with_history
+    compact_policy_health(db, keep_latest=5, daily_days=90, today=TODAY)
+
+    assert compact_policy_health(db, keep_latest=5, daily_days=90, today=TODAY) == \
+        {"records_compacted": 0, "days_rolled_up": 0}
+
+    result = compact_policy_health(db, keep_latest=5, daily_days=90, today=TODAY + timedelta(days=200))
+
+    points = history(db, lead_id)
+    assert result["records_compacted"] == 0 and result["days_rolled_up"] > 0
+    assert {point.granularity for point in points} == {"week"}
+    assert sum(point.samples for point in points) == len(records) - 5
+
+
+def test_trend_joins_compacted_points_and_kept_records_in_order(client, db, lead_with_history):
+    lead_id, records = lead_with_history
+    compact_policy_health(db, keep_latest=5, daily_days=90, today=TODAY)
+
+    response = client.get(f"/api/leads/{lead_id}/policy-health/trend")
+
+    assert response.status_code == 200, response.text
+    points = response.json()["points"]
+    assert [point["granularity"] for point in points[-5:]] == ["record"] * 5
+    assert sum(point["samples"] for point in points) == len(records)
+    assert points == sorted(points, key=lambda point: point["period_start"])
+    assert client.get("/api/leads/999999/policy-health/trend").status_code == 404
+
+
+def test_trend_window_keeps_the_week_it_starts_in(db, lead_with_history):
+    lead_id, records = lead_with_history
+    compact_policy_health(db, keep_latest=5, daily_days=90, today=TODAY)
+    # A Wednesday among the old (weekly) samples - its week starts on the Monday before
+    since = next(calculated_at.date() for calculated_at, _ in records
+                 if calculated_at.weekday() == 2 and (TODAY - calculated_at.date()).days >= 120)
+
+    points = health_trend(db, lead_id, since=since)
+
+    first_week = since - timedelta(days=since.weekday())
+    assert points[0]["granularity"] == "week" and points[0]["period_start"] == first_week.isoformat()
+    assert sum(point["samples"] for point in points) == sum(1 for calculated_at, _ in records if calculated_at.date() >= first_week)
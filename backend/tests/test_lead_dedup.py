@@ -0,0 +1,120 @@
+import threading
+
+from sqlalchemy import func
+
+from app.models import Lead
+from app.lead_dedup import dedup_keys, find_duplicate_lead
+
+
+def add_lead(db, full_name, email, phone, insurance_type="Auto"):
+    data = {"full_name": full_name, "email": email, "phone": phone, "insurance_type": insurance_type}
+    lead = Lead(**data, **dedup_keys(data), status="new")
+    db.add(lead)
+    db.commit()
+    return lead
+
+
+def submission(full_name, email, phone, insurance_type="Auto"):
+    return {"full_name": full_name, "email": email, "phone": phone, "insurance_type": insurance_type}
+
+
+def test_exact_email_found_in_a_large_name_block(db):
+    leads = [add_lead(db, "John Smith", f"john{i}@corp{i}.com", f"555{i:07d}") for i in range(110)]
+
+    match = find_duplicate_lead(db, submission("John Smith", "JOHN105@corp105.com", "555-000-0000"))
+
+    assert match is not None
+    assert match[0].id == leads[105].id and match[1] == "email"
+
+
+def test_resubmitting_an_email_in_a_large_block_does_not_fail(client, db):
+    for i in range(110):
+        add_lead(db, "John Smith", f"john{i}@corp{i}.com", f"555{i:07d}")
+
+    response = client.post("/api/leads", json=submission("John Smith", "john105@corp105.com", "555-000-0105"))
+
+    assert response.status_code == 200, response.text
+    assert db.query(func.count(Lead.id)).scalar() == 110
+
+
+def test_similar_names_on_other_domains_are_not_merged(client, db):
+    for i in range(10):
+        response = client.post("/api/leads", json=submission("John Smith", f"john{i}@corp{i}.com", f"555{i:07d}"))
+        assert response.status_code == 200, response.text
+
+    assert db.query(func.count(Lead.id)).scalar() == 10
+
+
+def test_fuzzy_match_needs_same_domain_and_no_conflicting_phone(db):
+    existing = add_lead(db, "Jonathan Smith", "jonathan.smith@example.com", "555-111-2222")
+
+    same_domain = find_duplicate_lead(db, submission("Jonathon Smith", "jonathon.smith@example.com", None))
+    other_domain = find_duplicate_lead(db, submission("Jonathon Smith", "jonathon.smith@other.com", None))
+    other_phone = find_duplicate_lead(db, submission("Jonathon Smith", "jonathon.smith@example.com", "555-999-8888"))
+
+    assert same_domain and same_domain[0].id == existing.id and same_domain[1] == "fuzzy_name"
+    assert other_domain is None
+    assert other_phone is None
+
+
+def test_household_members_sharing_a_phone_are_not_merged(client, db):
+    john = add_lead(db, "John Smith", "john.smith@gmail.com", "555-123-4567", "Auto")
+
+    response = client.post("/api/leads", json=submission("Jane Smith", "jane.w@yahoo.com", "555-123-4567", "Home"))
+    other_email = find_duplicate_lead(db, submission("Jon Smith", "jon.s@yahoo.com", "555-123-4567", "Auto"))
+    other_type = find_duplicate_lead(db, submission("Jon Smith", None, "555-123-4567", "Home"))
+    same_person = find_duplicate_lead(db, submission("Jon Smith", None, "(555) 123-4567", "Auto"))
+
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] != john.id and response.json()["email"] == "jane.w@yahoo.com"
+    assert other_email is None and other_type is None
+    assert same_person and same_person[0].id == john.id and same_person[1] == "phone"
+
+
+def test_duplicate_response_keeps_the_submitters_contact_details(client, db):
+    existing = add_lead(db, "Jonathan Smith", "jonathan.smith@example.com", "555-111-2222")
+    existing.sms_content = "Hi Jonathan"
+    db.commit()
+
+    response = client.post("/api/leads", json=submission("Jonathon Smith", "jonathon.smith@example.com", ""))
+
+    body = response.json()
+    assert response.status_code == 200, response.text
+    assert body["id"] == existing.id
+    assert (body["full_name"], body["email"], body["phone"]) == ("Jonathon Smith", "jonathon.smith@example.com", "")
+    assert body["sms_content"] is None
+
+
+def test_concurrent_duplicate_submissions_merge(client, db):
+    barrier = threading.Barrier(2)
+    statuses = []
+
+    from app import main
+
+    original = main.find_duplicate_lead
+    calls = []
+
+    def racing_find(session, lead_data):
+        # Both requests miss the first lookup, as when they arrive together
+        calls.append(1)
+        if len(calls) <= 2:
+            barrier.wait(timeout=10)
+            return None
+        return original(session, lead_data)
+
+    main.find_duplicate_lead = racing_find
+    try:
+        def submit():
+            statuses.append(client.post("/api/leads", json=submission("Ana Lima", "ana@example.com", "555-222-3333")).status_code)
+
+        threads = [threading.Thread(target=submit) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        main.find_duplicate_lead = original
+
+    assert statuses == [200, 200]
+    assert db.query(func.count(Lead.id)).scalar() == 1
+    assert db.query(Lead).one().submission_count == 2
@@ -0,0 +1,55 @@
+from sqlalchemy import insert
+
+from app import lead_resolution
+from app.models import Lead
+from app.lead_resolution import backfill_normalized_emails, renormalize_emails, find_lead_by_email
+
+
+def add_legacy_leads(db, *emails) -> list:
+    """Leads as stored before email_normalized existed"""
+    ids = []
+    for email in emails:
+        result = db.execute(insert(Lead).values(full_name="Jane Doe", email=email, phone="555-123-4567", insurance_type="Auto"))
+        ids.append(result.inserted_primary_key[0])
+    db.commit()
+    return ids
+
+
+def lead_state(db, lead_id) -> tuple:
+    db.expire_all()
+    lead = db.get(Lead, lead_id)
+    return lead.email_normalized, lead.email_duplicate_of
+
+
+def test_backfill_marks_shared_addresses_once(db):
+    first, second, third = add_legacy_leads(db, "Jane@Example.com", "jane@example.com ", "ana@example.com")
+
+    assert backfill_normalized_emails(db) == 2
+    assert backfill_normalized_emails(db) == 0
+
+    assert lead_state(db, first) == ("jane@example.com", None)
+    assert lead_state(db, second) == (None, first)
+    assert lead_state(db, third) == ("ana@example.com", None)
+
+
+def test_changing_plus_tag_stripping_renormalizes_stored_rows(client, db, monkeypatch):
+    plain, tagged = add_legacy_leads(db, "jane@example.com", "jane+quotes@example.com")
+    backfill_normalized_emails(db)
+    assert lead_state(db, tagged) == ("jane+quotes@example.com", None)
+
+    monkeypatch.setattr(lead_resolution, "EMAIL_STRIP_PLUS_TAGS", True)
+    assert renormalize_emails(db) == 1
+    backfill_normalized_emails(db)
+
+    assert lead_state(db, tagged) == (None, plain)
+    assert find_lead_by_email(db, "Jane+other@example.com").id == plain
+    response = client.post("/api/leads", json={"full_name": "Jane Doe", "email": "jane+new@example.com",
+                                               "phone": "555-123-4567", "insurance_type": "Auto"})
+    assert response.status_code == 200 and response.json()["id"] == plain
+
+    monkeypatch.setattr(lead_resolution, "EMAIL_STRIP_PLUS_TAGS", False)
+    assert renormalize_emails(db) == 1
+    backfill_normalized_emails(db)
+
+    assert lead_state(db, tagged) == ("jane+quotes@example.com", None)
+    assert renormalize_emails(db) == 0
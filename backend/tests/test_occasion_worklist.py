@@ -0,0 +1,65 @@
+from datetime import date, datetime, timedelta
+
+from app import engagement_calendar
+from app.models import Lead, EngagementSchedule
+from app.database import SessionLocal
+from app.followup_scheduler import FollowUpScheduler
+from app.occasions_engine import detect_occasions
+
+
+def add_lead(db, started_days_ago: int, renewal_on: date = None) -> Lead:
+    lead = Lead(full_name="Ana Lima", email=f"ana{started_days_ago}@example.com", phone="555-222-3333",
+                insurance_type="Auto", created_at=datetime.utcnow() - timedelta(days=started_days_ago),
+                renewal_on=renewal_on)
+    db.add(lead)
+    db.commit()
+    return lead
+
+
+def upcoming(client, **params) -> list:
+    response = client.get("/api/occasions/upcoming", params=params)
+    assert response.status_code == 200, response.text
+    return [(item["lead_id"], item["type"], item["days_until"]) for item in response.json()["items"]]
+
+
+def test_worklist_and_detect_occasions_agree_on_first_anniversaries_and_past_renewals(client, db):
+    first_year = add_lead(db, 355)
+    too_new = add_lead(db, 5)
+    lapsed_renewal = add_lead(db, 5, renewal_on=date.today() - timedelta(days=350))
+
+    items = upcoming(client)
+
+    assert (first_year.id, "policy_anniversary", 10) in items
+    assert (lapsed_renewal.id, "policy_renewal", 15) in items
+    assert not any(lead_id == too_new.id for lead_id, _, _ in items)
+    for lead in (first_year, too_new, lapsed_renewal):
+        detected = detect_occasions({"created_at": lead.created_at.isoformat(), "renewal_on": lead.renewal_on})
+        assert sorted((lead.id, o["type"], o["days_until"]) for o in detected) == \
+            sorted(item for item in items if item[0] == lead.id)
+
+
+def test_an_occasion_that_fired_drops_off_the_worklist(client, db):
+    lead = add_lead(db, 355)
+    assert upcoming(client, type="policy_anniversary") == [(lead.id, "policy_anniversary", 10)]
+
+    response = client.post(f"/api/leads/{lead.id}/occasion", json={"occasion_type": "policy_anniversary"})
+    assert response.status_code == 200, response.text
+
+    assert upcoming(client, type="policy_anniversary") == []
+
+
+def test_dates_that_passed_roll_forward_once_a_day_without_the_scheduler(client, db, monkeypatch):
+    lead = add_lead(db, 355)
+    db.query(EngagementSchedule).filter(EngagementSchedule.lead_id == lead.id).update(
+        {"next_date": date.today() - timedelta(days=3)})
+    db.commit()
+
+    # Already advanced today: the stale row stays off the list until tomorrow's first read
+    monkeypatch.setattr(engagement_calendar, "_advanced_on", date.today())
+    assert upcoming(client) == []
+
+    monkeypatch.setattr(engagement_calendar, "_advanced_on", date.today() - timedelta(days=1))
+    assert upcoming(client) == [(lead.id, "policy_anniversary", 10)]
+
+    scheduler = FollowUpScheduler(session_factory=SessionLocal)
+    assert scheduler.advance_engagements() == 0
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from app.models import Lead, Touchpoint, LifeEvent, Occasion
+from app.query_accounting import count_queries
+
+
+def add_leads(db, count: int, history: int = 1) -> list:
+    """Leads with `history` touchpoints, life events and occasions each"""
+    now = datetime.utcnow()
+    leads = [Lead(full_name=f"Lead {i}", email=f"lead{count}-{i}@example.com", phone=f"555000{i:04d}", insurance_type="Auto")
+             for i in range(count)]
+    db.add_all(leads)
+    db.flush()
+    for lead in leads:
+        for _ in range(history):
+            db.add(Touchpoint(lead_id=lead.id, type="call", direction="inbound", content="Asked about rates"))
+            db.add(LifeEvent(lead_id=lead.id, event_type="new_baby", event_date=now))
+            db.add(Occasion(lead_id=lead.id, occasion_type="birthday", occasion_date=now,
+                            action_taken=True, action_type="sms", action_content="Happy birthday!", outcome="pending"))
+    db.commit()
+    return leads
+
+
+def queries_for(client, method: str, url: str, **kwargs) -> int:
+    with count_queries() as queries:
+        response = client.request(method, url, **kwargs)
+    assert response.status_code == 200, response.text
+    return queries.count
+
+
+def test_cross_lead_lists_are_one_query_at_any_size(client, db):
+    add_leads(db, 2)
+    small = {url: queries_for(client, "GET", url) for url in ("/api/life-events", "/api/occasions")}
+    add_leads(db, 20)
+    large = {url: queries_for(client, "GET", url) for url in ("/api/life-events", "/api/occasions")}
+
+    assert small == large == {"/api/life-events": 1, "/api/occasions": 1}
+
+
+def test_occasion_trigger_and_response_do_not_grow_with_lead_history(client, db):
+    def run(history: int) -> tuple:
+        lead = add_leads(db, 1, history)[0]
+        occasion_id = db.query(Occasion.id).filter(Occasion.lead_id == lead.id).first()[0]
+        respond = queries_for(client, "POST", f"/api/occasions/{occasion_id}/respond", json={"response_text": "Yes, thanks!"})
+        trigger = queries_for(client, "POST", f"/api/leads/{lead.id}/occasion", json={"occasion_type": "birthday"})
+        return respond, trigger
+
+    assert run(1) == run(15) == (12, 6)
@@ -0,0 +1,50 @@
+import sqlite3
+
+from app import shared_state
+from app.shared_state import SqliteCache, SqliteRateLimiter, purge_expired_cache
+
+
+def cache_rows(path) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_expired_cache_rows_are_purged_on_write_and_at_startup(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.db")
+    cache = SqliteCache("enrichment", path)
+    for i in range(3):
+        cache.set(f"person:{i}", {"i": i}, ttl_seconds=-1)
+    cache.set("person:live", {"i": 9}, ttl_seconds=60)
+
+    assert cache.get("person:0") is None
+    assert purge_expired_cache(path) == 3
+    assert cache_rows(path) == 1
+
+    monkeypatch.setattr(shared_state, "CACHE_PURGE_EVERY", 2)
+    cache.set("person:a", 1, ttl_seconds=-1)
+    cache.set("person:b", 2, ttl_seconds=-1)
+    cache.set("person:c", 3, ttl_seconds=-1)
+    cache.set("person:d", 4, ttl_seconds=-1)
+    assert cache_rows(path) == 1
+    assert cache.get("person:live") == {"i": 9}
+
+
+def test_shared_rate_limiter_takes_tokens_in_batches(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.db")
+    connects = []
+    connect = shared_state._connect
+
+    def counting_connect(path=None):
+        connects.append(path)
+        return connect(path)
+
+    monkeypatch.setattr(shared_state, "_connect", counting_connect)
+    limiter = SqliteRateLimiter("campaign:1", rate=1000, path=path)
+    for _ in range(50):
+        limiter.acquire()
+
+    assert len(connects) == 50 // shared_state.RATE_LIMIT_BATCH
+
@@ -0,0 +1,29 @@
+import numpy as np
+
+from app.usage_analysis import analyze_usage, rank_usage_candidates
+
+
+def test_rules_with_missing_inputs_are_skipped_not_read_as_zero():
+    # Unknown mileage isn't 0 miles, unknown claims aren't a clean record,
+    # and an unknown home policy isn't "no home policy"
+    assert analyze_usage({"has_auto": True})["pattern_type"] == "standard"
+    assert analyze_usage({"has_auto": True, "app_sessions_90d": 40})["pattern_type"] == "standard"
+    assert analyze_usage({"has_auto": True, "owns_home": True})["pattern_type"] == "standard"
+
+    assert analyze_usage({"has_auto": True, "owns_home": True, "has_home": False})["pattern_type"] == "bundle_opportunity"
+    assert analyze_usage({"has_auto": True, "claims_count": 0, "app_sessions_90d": 40})["pattern_type"] == "high_engagement"
+
+
+def test_batch_ranking_skips_unknown_values():
+    features = {
+        "annual_mileage": [5000, None, np.nan],
+        "claims_count": [1, 0, None],
+        "app_sessions_90d": [0, 40, 40],
+        "owns_home": [0, 0, 1],
+        "has_auto": [1, 1, 1],
+        "has_home": [0, 0, None],
+    }
+
+    ranked = rank_usage_candidates([1, 2, 3], features)
+
+    assert [(c["lead_id"], c["pattern_type"]) for c in ranked] == [(1, "low_mileage"), (2, "high_engagement")]
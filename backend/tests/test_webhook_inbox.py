@@ -0,0 +1,36 @@
+from app.models import Lead, WebhookEvent
+from app.lead_dedup import dedup_keys
+
+
+def add_lead(full_name: str, email: str) -> Lead:
+    contact = {"full_name": full_name, "email": email, "phone": "555-222-3333"}
+    return Lead(**dedup_keys(contact), **contact, insurance_type="Auto")
+
+
+def booking(email: str, uri: str, scheduled_event) -> dict:
+    return {"event": "invitee.created",
+            "payload": {"uri": uri, "email": email, "scheduled_event": scheduled_event}}
+
+
+def test_a_malformed_event_fails_alone_and_the_inbox_keeps_draining(client, db):
+    db.add_all([add_lead("Ana Lima", "ana@example.com"), add_lead("Ben Ortiz", "ben@example.com"),
+                add_lead("Cy Young", "cy@example.com")])
+    db.commit()
+
+    deliveries = [
+        booking("ana@example.com", "invitee/1", None),
+        booking("ben@example.com", "invitee/2", "tomorrow"),
+        booking("cy@example.com", "invitee/3", {"start_time": "2025-07-01T15:00:00Z"}),
+    ]
+    for body in deliveries:
+        assert client.post("/api/webhooks/calendly", json=body).json()["status"] == "received"
+
+    db.expire_all()
+    events = {event.email: event for event in db.query(WebhookEvent)}
+    booked = {lead.email: lead.status == "booked" for lead in db.query(Lead)}
+
+    assert events["ana@example.com"].status == "processed"
+    assert events["ben@example.com"].status == "failed"
+    assert "AttributeError" in events["ben@example.com"].result
+    assert events["cy@example.com"].status == "processed"
+    assert booked == {"ana@example.com": True, "ben@example.com": False, "cy@example.com": True}
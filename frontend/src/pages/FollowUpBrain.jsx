@@ -108,14 +108,20 @@ export default function FollowUpBrain() {
     // Find email action to display
     const emailAction = actionsToExecute.find(a => a.action_type === 'email');
 
-    // Execute each action automatically
-    for (const action of actionsToExecute) {
-      try {
-        await axios.post(`http://localhost:8000/api/followup/${action.id}/execute`);
-        console.log(`✅ Auto-executed ${action.action_type} action`);
-      } catch (error) {
-        console.error(`❌ Error auto-executing ${action.action_type}:`, error);
-      }
+    // Execute all actions automatically in one bulk request
+    try {
+      const response = await axios.post('http://localhost:8000/api/followup/execute-bulk', {
+        action_ids: actionsToExecute.map(action => action.id)
+      });
+      response.data.results.forEach(result => {
+        if (result.success) {
+          console.log(`✅ Auto-executed action ${result.action_id}`);
+        } else {
+          console.error(`❌ Error auto-executing action ${result.action_id}:`, result.error);
+        }
+      });
+    } catch (error) {
+      console.error('❌ Error auto-executing actions:', error);
     }
 
     // Reload actions to show updated status
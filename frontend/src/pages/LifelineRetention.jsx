@@ -9,6 +9,7 @@ export default function LifelineRetention() {
   const [lifeEvents, setLifeEvents] = useState([]);
   const [occasions, setOccasions] = useState([]);
   const [policyHealth, setPolicyHealth] = useState(null);
+  const [latestHealth, setLatestHealth] = useState({}); // lead_id -> latest health from the retention worklist
   const [showEventModal, setShowEventModal] = useState(false);
   const [showResponseModal, setShowResponseModal] = useState(false);
   const [selectedEvent, setSelectedEvent] = useState(null);
@@ -21,6 +22,7 @@ export default function LifelineRetention() {
 
   useEffect(() => {
     loadLeads();
+    loadLatestHealth();
     loadAllLifeEvents();
     loadOccasions();
   }, []);
@@ -41,6 +43,17 @@ export default function LifelineRetention() {
     }
   };
 
+  const loadLatestHealth = async () => {
+    try {
+      const response = await axios.get('http://localhost:8000/api/retention/worklist', {
+        params: { sort: 'score', limit: 1000 }
+      });
+      setLatestHealth(Object.fromEntries(response.data.items.map((item) => [item.lead_id, item])));
+    } catch (error) {
+      console.error('Error loading retention worklist:', error);
+    }
+  };
+
   const loadAllLifeEvents = async () => {
     try {
       const response = await axios.get('http://localhost:8000/api/life-events');
@@ -53,7 +66,12 @@ export default function LifelineRetention() {
   const loadPolicyHealth = async (leadId) => {
     try {
       const response = await axios.get(`http://localhost:8000/api/leads/${leadId}/policy-health`);
-      setPolicyHealth(response.data.policy_health);
+      const health = response.data.policy_health;
+      setPolicyHealth(health);
+      if (health?.id) {
+        // Stored records are the lead's latest - keep its badge current
+        setLatestHealth((current) => ({ ...current, [leadId]: health }));
+      }
     } catch (error) {
       console.error('Error loading policy health:', error);
     }
@@ -266,6 +284,11 @@ export default function LifelineRetention() {
                     <div className="text-xs px-2 py-1 bg-blue-100 text-blue-700 rounded-full font-medium mt-2 inline-block">
                       {lead.insurance_type}
                     </div>
+                    {latestHealth[lead.id] && (
+                      <div className={`text-xs px-2 py-1 rounded-full font-medium mt-2 ml-2 inline-block border ${getChurnRiskColor(latestHealth[lead.id].churn_risk)}`}>
+                        Health {latestHealth[lead.id].health_score}
+                      </div>
+                    )}
                   </button>
                 ))}
               </div>